@@ -0,0 +1,113 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from src.cli import COMMANDS
+from src.pipeline.run_all import STEP_MODULES
+
+BASELINE = Path("benchmarks/baselines/startup.csv")
+
+# Prints the child's peak RSS in KB after the imports. VmHWM restarts at exec; ru_maxrss (the
+# fallback off Linux) also counts the parent's peak inherited through fork
+_RSS = (
+    "import resource\n"
+    "try:\n"
+    "    print([l.split()[1] for l in open('/proc/self/status') if l.startswith('VmHWM')][0])\n"
+    "except OSError:\n"
+    "    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+)
+
+
+def targets(commands: List[str]) -> dict:
+    """
+    Name -> Python code timed in a fresh interpreter:
+    - python: interpreter start alone (the floor)
+    - cli: `src.cli` (what `--help` and dispatch cost)
+    - eager: every step module, i.e. what importing `run_all` cost before steps were loaded lazily
+    - one entry per command: `src.cli` plus the modules that command imports
+    """
+    out = {"python": "pass", "cli": "import src.cli", "eager": "; ".join(f"import {m}" for m in STEP_MODULES.values())}
+    for name in commands:
+        out[name] = "; ".join(["import src.cli"] + [f"import {m}" for m in COMMANDS[name][1]])
+    return out
+
+
+def measure(argv: List[str], repeat: int, rss: bool = True) -> dict:
+    """Median / max wall seconds of `argv` over `repeat` fresh processes (plus peak RSS when printed)."""
+    times, peaks = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        res = subprocess.run(argv, capture_output=True, text=True)
+        times.append(time.perf_counter() - start)
+        if res.returncode != 0:
+            raise RuntimeError(f"{' '.join(argv)} failed:\n{res.stderr}")
+        if rss:
+            peaks.append(int(res.stdout.split()[-1]) / 2**10)
+    return {
+        "calls": repeat, "total_s": statistics.median(times), "max_s": max(times),
+        "peak_rss_mb": max(peaks) if peaks else float("nan"),
+    }
+
+
+def run_startup(commands: List[str], repeat: int = 5, config: Optional[str] = None, run: List[str] = ()):
+    """
+    Startup table (one row per target, `summarize` columns so `compare` applies). `run` commands
+    are also timed end to end with `--config` (e.g. `download`, or a cached `simulate`).
+    """
+    import pandas as pd
+
+    rows = []
+    for name, code in targets(commands).items():
+        rows.append({"path": f"import:{name}", **measure([sys.executable, "-c", f"{code}\n{_RSS}"], repeat)})
+        print(f"[startup] import:{name:<14} {rows[-1]['total_s'] * 1e3:8.1f} ms  {rows[-1]['peak_rss_mb']:7.1f} MB")
+    for name in run:
+        argv = [sys.executable, "-m", "src.cli", name] + (["--config", config] if config else [])
+        rows.append({"path": f"run:{name}", **measure(argv, repeat, rss=False)})
+        print(f"[startup] run:{name:<17} {rows[-1]['total_s'] * 1e3:8.1f} ms")
+    res = pd.DataFrame(rows)
+    res["rows"] = float("nan")
+    return res
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time interpreter start plus imports per CLI command (fresh processes).")
+    parser.add_argument("--commands", nargs="+", default=[c for c in COMMANDS if c != "bench-startup"], choices=list(COMMANDS))
+    parser.add_argument("--repeat", type=int, default=5, help="processes per target (the median is reported)")
+    parser.add_argument("--run", nargs="+", default=[], choices=[c for c in COMMANDS if c not in ("serve", "bench-startup", "score")],
+                        help="also time these commands end to end with --config")
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument("--out", default="reports/benchmarks")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative slowdown flagged")
+    parser.add_argument("--min-seconds", type=float, default=0.02)
+    parser.add_argument("--save-baseline", action="store_true", help=f"store this run as {BASELINE}")
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+    from src.utils_profile import compare, format_report
+
+    res = run_startup(args.commands, args.repeat, args.config, args.run)
+    run_dir = Path(args.out) / "startup" / time.strftime("%Y%m%d-%H%M%S")
+    run_dir.mkdir(parents=True, exist_ok=True)
+    res.to_csv(run_dir / "results.csv", index=False)
+    print(f"[startup] wrote {run_dir / 'results.csv'}")
+
+    regressions = 0
+    if BASELINE.exists():
+        report = compare(res, pd.read_csv(BASELINE), args.threshold, args.min_seconds)
+        report.to_csv(run_dir / "regressions.csv", index=False)
+        regressions = int(report["regression"].sum())
+        print(f"[startup] {regressions} regression(s) vs {BASELINE}")
+        print(format_report(report))
+    if args.save_baseline:
+        BASELINE.parent.mkdir(parents=True, exist_ok=True)
+        res.round(6).to_csv(BASELINE, index=False)
+        print(f"[startup] saved baseline {BASELINE}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
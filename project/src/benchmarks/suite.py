@@ -0,0 +1,236 @@
+import argparse
+import copy
+import json
+import shutil
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+import yaml
+
+from src.benchmarks.synthetic import MarketSpec, write_market
+from src.utils_io import read_artifact
+from src.utils_profile import compare, format_report, profiling, span, summarize
+
+# Universe size x history length per scale
+SCALES: Dict[str, dict] = {
+    "xs": {"tickers": 10, "days": 756},
+    "s": {"tickers": 100, "days": 1260},
+    "m": {"tickers": 1000, "days": 2520},
+    "l": {"tickers": 10000, "days": 2520},
+}
+
+BASELINE_DIR = Path("benchmarks/baselines")
+
+# Step 04 measures the cost of a fit, not the breadth of the grid: one candidate per model
+SEARCH = {
+    "mode": "grid", "cv": "kfold", "cv_splits": 3,
+    "spaces": {
+        "DecisionTree": {"max_depth": [5], "min_samples_leaf": [5]},
+        "RandomForest": {"n_estimators": [100], "max_depth": [10], "min_samples_leaf": [5], "max_features": ["sqrt"]},
+    },
+    "xgb": {"n_estimators": 200},
+}
+
+
+def prepare_data(spec: MarketSpec, raw_dir: Path, cfg: dict) -> dict:
+    """Write the synthetic market unless `raw_dir` already holds the same spec."""
+    marker = raw_dir / "spec.json"
+    if marker.exists() and json.loads(marker.read_text()) == json.loads(json.dumps(asdict(spec))):
+        return {"generated": False}
+    if raw_dir.exists():
+        shutil.rmtree(raw_dir)
+    start = time.perf_counter()
+    res = write_market(spec, raw_dir, cfg["data"]["main_file"], cfg["data"]["meta_file"])
+    marker.write_text(json.dumps(asdict(spec)))
+    return {"generated": True, "seconds": time.perf_counter() - start, "quotes": res["quotes"]}
+
+
+def bench_config(cfg: dict, work_dir: Path, spec: MarketSpec) -> dict:
+    """
+    `cfg` pointed at `work_dir`: no step cache, single split search (`SEARCH`), no walk-forward,
+    split dates at 60% / 80% of the synthetic history. Everything else (storage, features,
+    simulation) is kept, so the benchmark runs what the pipeline runs.
+    """
+    cfg = copy.deepcopy(cfg)
+    cfg["paths"] = {
+        "raw_dir": str(work_dir / "raw"),
+        "interim_dir": str(work_dir / "interim"),
+        "processed_dir": str(work_dir / "processed"),
+        "reports_dir": str(work_dir / "reports"),
+        "figures_dir": str(work_dir / "reports" / "figures"),
+        "backtests_dir": str(work_dir / "reports" / "backtests"),
+    }
+    for p in cfg["paths"].values():
+        Path(p).mkdir(parents=True, exist_ok=True)
+    cfg["cache"] = {"enabled": False}
+    cfg["data"]["streaming"] = {"enabled": False}
+    cfg["features"]["incremental"] = {"enabled": False}
+    cfg["models"]["search"] = copy.deepcopy(SEARCH)
+    cfg["models"]["walk_forward"] = {"enabled": False}
+    dates = pd.bdate_range(end=spec.end, periods=spec.days)
+    cfg["split"] = {
+        "train_end": str(dates[int(len(dates) * 0.6)].date()),
+        "val_end": str(dates[int(len(dates) * 0.8)].date()),
+        "test_end": str(dates[-1].date()),
+    }
+    return cfg
+
+
+def run_steps(cfg: dict, steps: List[int], rows: int):
+    """
+    Pipeline steps in order, one span each (the steps' own sub-stage spans nest below).
+    `rows` (tickers x days) is the throughput unit of every step.
+    """
+    from src.pipeline.run_all import pipeline_steps
+
+    for s in pipeline_steps(cfg):
+        if s["n"] in steps:
+            with span(s["name"], rows=rows):
+                s["run"](cfg)
+
+
+def run_micro(cfg: dict, reference: bool = False):
+    """
+    Individual feature and strategy functions on the artifacts of the step run.
+    - features on `unified_long`: the engine (`compute_features`), step 03's panel path and the
+      cross-sectional features
+    - every registered strategy on the shared market built from `predictions`, and the
+      event-driven SL/TP engine on the market's daily bars
+    - reference: also the original pandas implementations (`add_basic_features`,
+      `add_technical_features`, `sim_long_only_sl_tp`), which are slow at large scales
+    """
+    from src.features.basic import add_basic_features
+    from src.features.cross_section import add_cross_section_features
+    from src.features.engine import compute_features
+    from src.features.technical import add_technical_features
+    from src.simulation.events import panel_bars, sim_sl_tp_events
+    from src.pipeline.step_03_feature_engineering import build_panel_dataset
+    from src.simulation.panel import build_market
+    from src.simulation.registry import STRATEGIES
+    from src.simulation.strategies import sim_long_only_sl_tp
+
+    date_col = cfg["data"]["date_col"]
+    df = read_artifact(cfg, "unified_long")
+    with span("compute_features", rows=len(df)):
+        compute_features(df, date_col)
+    with span("build_panel_dataset", rows=len(df)):
+        build_panel_dataset(df, date_col, np.float32)
+    with span("cross_section", rows=len(df)):
+        add_cross_section_features(df, date_col)
+    if reference:
+        with span("add_basic_features", rows=len(df)):
+            basic = add_basic_features(df.copy(), date_col)
+        with span("add_technical_features", rows=len(df)):
+            add_technical_features(basic, date_col)
+    del df
+
+    sim = cfg["simulation"]
+    preds = read_artifact(cfg, "predictions", columns=[date_col, "ticker", "price", "target_return_1d", "pred_RandomForest"])
+    with span("build_market", rows=len(preds)):
+        market = build_market(preds, "pred_RandomForest")
+    for name, fn in STRATEGIES.items():
+        with span(f"strategy:{name}", rows=len(preds)):
+            fn(market, sim)
+    with span("sim_sl_tp_events", rows=len(preds)):
+        sim_sl_tp_events(
+            panel_bars(market.panel), threshold=sim["thresholds"]["buy_prob"],
+            stop_loss=sim["risk"]["stop_loss"], take_profit=sim["risk"]["take_profit"],
+            fee_bps=sim["costs"]["fee_bps"], max_concurrent=sim["capital"]["max_concurrent_positions"],
+            initial_capital=sim["capital"]["initial"], n_tickers=len(market.panel.tickers),
+        )
+    if reference:
+        with span("sim_long_only_sl_tp", rows=len(preds)):
+            sim_long_only_sl_tp(
+                preds, "pred_RandomForest", threshold=sim["thresholds"]["buy_prob"],
+                stop_loss=sim["risk"]["stop_loss"], take_profit=sim["risk"]["take_profit"],
+                fee_bps=sim["costs"]["fee_bps"], max_concurrent=sim["capital"]["max_concurrent_positions"],
+                initial_capital=sim["capital"]["initial"],
+            )
+
+
+def results_table(events: List[dict]) -> pd.DataFrame:
+    """`summarize` of the spans (records such as per-candidate fit times are left out) + rows/sec."""
+    spans = pd.DataFrame([e for e in events if e["type"] == "span"])
+    res = summarize(spans)
+    res["rows_per_s"] = res["rows"] / res["total_s"]
+    return res
+
+
+def run_scale(
+    cfg: dict, scale: str, work_root: Path, out_root: Path, steps: List[int], micro: bool = True,
+    reference: bool = False, threshold: float = 0.25, min_seconds: float = 0.05, save_baseline: bool = False,
+    spec: Optional[MarketSpec] = None,
+) -> pd.DataFrame:
+    """
+    Generate (or reuse) the scale's market, run the steps and micro benchmarks under the profiler
+    and compare with `benchmarks/baselines/<scale>.csv`.
+    Writes `<out_root>/<scale>/<timestamp>/` (results.csv, profile.jsonl, trace.json, regressions.csv).
+    """
+    spec = spec or MarketSpec(**SCALES[scale])
+    work_dir = work_root / scale
+    bcfg = bench_config(cfg, work_dir, spec)
+    data = prepare_data(spec, Path(bcfg["paths"]["raw_dir"]), bcfg)
+    if data["generated"]:
+        print(f"[bench] {scale}: generated {spec.tickers} tickers x {spec.days} days ({data['quotes']} quotes) in {data['seconds']:.1f}s")
+
+    with profiling() as prof:
+        run_steps(bcfg, steps, spec.tickers * spec.days)
+        if micro:
+            with span("micro"):
+                run_micro(bcfg, reference)
+
+    run_dir = prof.write(out_root / scale / time.strftime("%Y%m%d-%H%M%S"), {"scale": scale, "spec": asdict(spec)})
+    res = results_table(prof.events)
+    res.to_csv(run_dir / "results.csv", index=False)
+
+    baseline = BASELINE_DIR / f"{scale}.csv"
+    if baseline.exists():
+        report = compare(res, pd.read_csv(baseline), threshold, min_seconds)
+        report.to_csv(run_dir / "regressions.csv", index=False)
+        print(f"[bench] {scale}: {int(report['regression'].sum())} regression(s) vs {baseline}")
+        print(format_report(report))
+        res.attrs["regressions"] = int(report["regression"].sum())
+    else:
+        print(f"[bench] {scale}: no baseline at {baseline}")
+    if save_baseline:
+        baseline.parent.mkdir(parents=True, exist_ok=True)
+        res.round(6).to_csv(baseline, index=False)
+        print(f"[bench] {scale}: saved baseline {baseline}")
+    return res
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time steps 02-06 and the feature/strategy functions on synthetic markets.")
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument("--scales", nargs="+", default=["xs", "s"], choices=list(SCALES))
+    parser.add_argument("--steps", type=int, nargs="+", default=[2, 3, 4, 5, 6])
+    parser.add_argument("--no-micro", action="store_true", help="only the pipeline steps")
+    parser.add_argument("--reference", action="store_true", help="also time the original pandas implementations")
+    parser.add_argument("--work-dir", default="data/benchmarks", help="synthetic data and artifacts per scale")
+    parser.add_argument("--out", default="reports/benchmarks")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative slowdown / memory growth flagged")
+    parser.add_argument("--min-seconds", type=float, default=0.05)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as benchmarks/baselines/<scale>.csv")
+    args = parser.parse_args(argv)
+
+    with open(args.config, "r") as f:
+        cfg = yaml.safe_load(f)
+
+    regressions = 0
+    for scale in args.scales:
+        res = run_scale(
+            cfg, scale, Path(args.work_dir), Path(args.out), args.steps, not args.no_micro, args.reference,
+            args.threshold, args.min_seconds, args.save_baseline,
+        )
+        top = res[res["path"].str.count("/") <= 1].sort_values("total_s", ascending=False)
+        print(top[["path", "total_s", "peak_rss_mb", "rows", "rows_per_s"]].to_string(index=False, float_format=lambda v: f"{v:,.3f}"))
+        regressions += res.attrs.get("regressions", 0)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
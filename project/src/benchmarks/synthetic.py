@@ -0,0 +1,139 @@
+import argparse
+import string
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class MarketSpec:
+    """
+    Shape of a synthetic market (defaults give a mid-sized, realistic mess):
+    - tickers / days: universe size and history length (business days ending at `end`)
+    - prices: geometric random walk with one market factor (`beta` loading), per-ticker drift and
+      volatility, and occasional jumps
+    - missing data: late listings and delistings (leading/trailing gaps), trading halts (runs of
+      NaN) and isolated missing quotes
+    - meta: `meta_coverage` of the tickers appear in the meta file (the rest, like crypto in the
+      real data, get no exchange/ETF flags)
+    """
+    tickers: int = 100
+    days: int = 1260
+    end: str = "2020-12-31"
+    seed: int = 0
+    beta: float = 0.6
+    vol_range: tuple = (0.01, 0.04)
+    drift_std: float = 0.0004
+    jump_rate: float = 0.002
+    late_listing: float = 0.10
+    delisting: float = 0.05
+    halt_rate: float = 0.0005
+    halt_days: int = 5
+    missing_rate: float = 0.001
+    meta_coverage: float = 0.9
+    etf_share: float = 0.1
+
+
+def ticker_symbols(n: int) -> list:
+    """n unique upper-case symbols (A..Z, AA..ZZ, AAA..), stable for a given n."""
+    out, width = [], 1
+    letters = np.array(list(string.ascii_uppercase))
+    while len(out) < n:
+        k = min(26 ** width, n - len(out))
+        idx = np.arange(k)
+        digits = [(idx // 26 ** p) % 26 for p in reversed(range(width))]
+        out += ["".join(chars) for chars in zip(*(letters[d] for d in digits))]
+        width += 1
+    return out
+
+
+def make_prices(spec: MarketSpec) -> pd.DataFrame:
+    """Wide price table: `Date` + one column per ticker (NaN where a ticker has no quote)."""
+    rng = np.random.default_rng(spec.seed)
+    n_t, n_d = spec.tickers, spec.days
+    dates = pd.bdate_range(end=spec.end, periods=n_d)
+
+    vol = rng.uniform(*spec.vol_range, size=n_t).astype(np.float32)
+    drift = rng.normal(0.0002, spec.drift_std, size=n_t).astype(np.float32)
+    market = rng.normal(0.0, 1.0, size=(n_d, 1)).astype(np.float32)
+    # Log returns row by row block (dates x tickers); float32 keeps 10k x 2.5k tickers small
+    r = rng.standard_normal((n_d, n_t), dtype=np.float32)
+    r *= np.sqrt(1 - spec.beta ** 2)
+    r += spec.beta * market
+    r *= vol
+    r += drift
+    jumps = rng.random((n_d, n_t), dtype=np.float32) < spec.jump_rate
+    r[jumps] += rng.normal(0.0, 0.1, size=int(jumps.sum())).astype(np.float32)
+
+    prices = np.exp(np.cumsum(r, axis=0, dtype=np.float64)) * rng.uniform(5, 500, size=n_t)
+    del r
+
+    # Late listings / delistings: leading / trailing NaN of random length (up to half the history)
+    late = np.flatnonzero(rng.random(n_t) < spec.late_listing)
+    for t, k in zip(late, rng.integers(1, max(n_d // 2, 2), size=len(late))):
+        prices[:k, t] = np.nan
+    gone = np.flatnonzero(rng.random(n_t) < spec.delisting)
+    for t, k in zip(gone, rng.integers(1, max(n_d // 2, 2), size=len(gone))):
+        prices[n_d - k:, t] = np.nan
+
+    # Trading halts: runs of `halt_days`; isolated missing quotes
+    halts = np.argwhere(rng.random((n_d, n_t)) < spec.halt_rate)
+    for d, t in halts:
+        prices[d:d + spec.halt_days, t] = np.nan
+    prices[rng.random((n_d, n_t)) < spec.missing_rate] = np.nan
+
+    df = pd.DataFrame(prices, columns=ticker_symbols(n_t))
+    df.insert(0, "Date", dates.strftime("%Y-%m-%d"))
+    return df
+
+
+def make_meta(spec: MarketSpec) -> pd.DataFrame:
+    """`symbols_valid_meta.csv` rows for `meta_coverage` of the tickers."""
+    rng = np.random.default_rng(spec.seed + 1)
+    symbols = np.asarray(ticker_symbols(spec.tickers))
+    covered = symbols[rng.random(spec.tickers) < spec.meta_coverage]
+    return pd.DataFrame({
+        "Symbol": covered,
+        "Security Name": [f"{s} Synthetic Corp" for s in covered],
+        "Listing Exchange": rng.choice(["Q", "N", "P", "Z", "A"], p=[0.5, 0.3, 0.12, 0.05, 0.03], size=len(covered)),
+        "ETF": np.where(rng.random(len(covered)) < spec.etf_share, "Y", "N"),
+    })
+
+
+def write_market(spec: MarketSpec, out_dir: Path, main_file: str = "portfolio_data.csv",
+                 meta_file: str = "symbols_valid_meta.csv", chunk_rows: int = 250) -> dict:
+    """
+    Write the price and meta CSVs into `out_dir` (dates in chunks of `chunk_rows`, 4 decimals).
+    Returns the file paths and the number of non-missing prices.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    prices = make_prices(spec)
+    main_path = out_dir / main_file
+    for lo in range(0, len(prices), chunk_rows):
+        prices.iloc[lo:lo + chunk_rows].to_csv(
+            main_path, mode="w" if lo == 0 else "a", header=lo == 0, index=False, float_format="%.4f"
+        )
+    meta_path = out_dir / meta_file
+    make_meta(spec).to_csv(meta_path, index=False)
+    return {"main": main_path, "meta": meta_path, "quotes": int(prices.iloc[:, 1:].notna().to_numpy().sum())}
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Write a synthetic portfolio_data.csv / symbols_valid_meta.csv.")
+    parser.add_argument("--out", default="data/raw")
+    for name, default in asdict(MarketSpec()).items():
+        if isinstance(default, tuple):
+            continue
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(default), default=default)
+    args = vars(parser.parse_args(argv))
+    out = args.pop("out")
+    spec = MarketSpec(**args)
+    res = write_market(spec, out)
+    print(f"[synthetic] {spec.tickers} tickers x {spec.days} days ({res['quotes']} quotes) -> {res['main']}, {res['meta']}")
+
+
+if __name__ == "__main__":
+    main()
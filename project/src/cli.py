@@ -0,0 +1,116 @@
+import argparse
+import sys
+
+# Command -> (pipeline step or None, modules it imports, help). Handlers import their modules
+# when they run, so `download` or `simulate` never load scikit-learn/xgboost/joblib and
+# `--help` loads nothing beyond argparse.
+COMMANDS = {
+    "run": (None, ["src.pipeline.run_all"], "run the pipeline (steps 01-06, cached)"),
+    "download": (1, ["src.pipeline.step_01_download"], "step 01: check / ingest raw files"),
+    "unify": (2, ["src.pipeline.step_02_unify_dataset"], "step 02: wide -> long unified dataset"),
+    "features": (3, ["src.pipeline.step_03_feature_engineering"], "step 03: feature engineering"),
+    "train": (4, ["src.pipeline.step_04_train"], "step 04: train models"),
+    "predict": (5, ["src.pipeline.step_05_predict"], "step 05: score every row with the saved models"),
+    "simulate": (6, ["src.pipeline.step_06_simulate"], "step 06: strategies, KPIs, optional bootstrap/sweep"),
+    "sweep": (None, ["src.pipeline.step_06_simulate"], "parameter sweep only (backtests/sweep.csv)"),
+    "score": (None, ["src.serving.scorer"], "score a file of ticks with the saved models (one shot)"),
+    "serve": (None, ["src.serving.server"], "start the scoring service"),
+    "bench-startup": (None, ["src.benchmarks.startup"], "time interpreter start + imports per command"),
+}
+
+# Commands whose options are parsed by the tool they start
+PASSTHROUGH = ("serve", "bench-startup")
+
+
+def _load_config(path: str) -> dict:
+    import yaml
+
+    with open(path, "r") as f:
+        return yaml.safe_load(f)
+
+
+def _run(args):
+    from src.pipeline.run_all import main
+
+    main(args.config, args.from_step, args.only, args.force, args.profile, args.profile_sample_ms)
+
+
+def _step(args):
+    from src.pipeline.run_all import main
+
+    main(args.config, only=[COMMANDS[args.command][0]], force=args.force, profile=args.profile,
+         sample_ms=args.profile_sample_ms)
+
+
+def _sweep(args):
+    from src.pipeline.step_06_simulate import sweep
+
+    sweep(_load_config(args.config))
+
+
+def _score(args):
+    """Ticks (ticker, Date, price) in, one row of `pred_*` per ticker out; the feature state is not saved."""
+    import pandas as pd
+    from src.serving.scorer import Scorer
+
+    cfg = _load_config(args.config)
+    ticks = pd.read_csv(sys.stdin if args.ticks == "-" else args.ticks)
+    result = Scorer.from_config(cfg).score(ticks)
+    out = pd.DataFrame([{"ticker": t, **r} for t, r in result.items()])
+    out.to_csv(sys.stdout if args.out == "-" else args.out, index=False)
+
+
+def _serve(args):
+    from src.serving.server import main
+
+    return main(args.args)
+
+
+def _bench_startup(args):
+    from src.benchmarks.startup import main
+
+    return main(args.args)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Pipeline steps and tools.")
+    sub = parser.add_subparsers(dest="command", required=True, metavar="command")
+    for name, (_, _, help_) in COMMANDS.items():
+        p = sub.add_parser(name, help=help_, description=help_)
+        if name in PASSTHROUGH:
+            # Options go to the tool's own parser (`... serve -- --help` shows them)
+            p.set_defaults(handler=_serve if name == "serve" else _bench_startup)
+            continue
+        p.add_argument("--config", default="config/config.yaml")
+        if name == "score":
+            p.add_argument("--ticks", required=True, help="CSV with ticker, Date and price columns ('-' = stdin)")
+            p.add_argument("--out", default="-", help="output CSV ('-' = stdout)")
+            p.set_defaults(handler=_score)
+            continue
+        if name == "sweep":
+            p.set_defaults(handler=_sweep)
+            continue
+        p.add_argument("--force", action="store_true", help="ignore the step cache")
+        p.add_argument("--profile", action="store_true", help="record spans/RSS to reports/profiles/<run>/")
+        p.add_argument("--profile-sample-ms", type=float, help="also sample Python stacks every N ms")
+        if name == "run":
+            p.add_argument("--from-step", type=int, default=1, help="skip steps before this one (1-6)")
+            p.add_argument("--only", type=int, nargs="+", help="run only these steps, e.g. --only 4 5")
+            p.set_defaults(handler=_run)
+        else:
+            p.set_defaults(handler=_step)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+    if args.command in PASSTHROUGH:
+        args.args = [a for a in rest if a != "--"]
+    elif rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
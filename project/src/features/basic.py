@@ -2,7 +2,10 @@ import pandas as pd
 import numpy as np
 
 def _groupwise_pct_change(df: pd.DataFrame, by: str, col: str, periods: int = 1) -> pd.Series:
-    return df.groupby(by)[col].pct_change(periods=periods)
+    # Returns over forward-filled prices (pandas' pct_change default before 3.0), spelled out so
+    # every pandas version gives the same values
+    filled = df.groupby(by)[col].ffill()
+    return filled / filled.groupby(df[by]).shift(periods) - 1
 
 def _groupwise_shift(df: pd.DataFrame, by: str, col: str, periods: int = 1) -> pd.Series:
     return df.groupby(by)[col].shift(periods)
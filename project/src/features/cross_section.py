@@ -0,0 +1,240 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from src.features.engine import ffill, group_layout, pct_change, shift
+from src.utils_panel import CompactPanel
+
+# Per-ticker inputs ranked / standardized against each date's universe (same formulas as the engine)
+CS_RANK = ["ret_1d", "mom_5d", "mom_20d"]
+CS_ZSCORE = ["ret_1d", "mom_20d"]
+CS_GROUP_REL = ["ret_1d", "mom_20d"]
+DEFAULT_GROUP_BY = ["Listing Exchange", "ETF"]
+# Rows of a ticker's history the inputs look back over (the longest momentum)
+CS_LOOKBACK = max(int(c[len("mom_"):-1]) for c in CS_RANK + CS_ZSCORE + CS_GROUP_REL if c.startswith("mom_"))
+
+
+def cross_section_names() -> List[str]:
+    return (
+        [f"cs_rank_{c}" for c in CS_RANK]
+        + [f"cs_z_{c}" for c in CS_ZSCORE]
+        + [f"cs_grp_rel_{c}" for c in CS_GROUP_REL]
+    )
+
+
+# ---------------------------------------------------------------------------
+# Kernels (1-D arrays in any row order; `day` = integer date code per row)
+# ---------------------------------------------------------------------------
+
+def date_blocks(day: np.ndarray, n_dates: int, block_rows: int = 1 << 20):
+    """
+    Rows grouped by date: (order, bounds, blocks).
+    - order: row indices sorted by date (one stable sort); rows of date d are order[bounds[d]:bounds[d + 1]]
+    - blocks: (lo, hi) ranges of `order` of about `block_rows` rows that never split a date
+    """
+    order = np.argsort(day, kind="stable")
+    bounds = np.searchsorted(day[order], np.arange(n_dates + 1))
+    cuts = bounds[np.searchsorted(bounds, np.arange(block_rows, len(day), block_rows))]
+    edges = np.unique(np.concatenate([[0], cuts, [len(day)]]))
+    return order, bounds, list(zip(edges[:-1].tolist(), edges[1:].tolist()))
+
+
+def rank_pct(values: np.ndarray, day: np.ndarray, blocks) -> np.ndarray:
+    """
+    Per-date percentile rank, as `groupby(day).rank(pct=True)` (ties get their average rank;
+    NaN stays NaN and is not counted). Each date block becomes a (dates x members) matrix that
+    is sorted row-wise in one call; ranks follow from run lengths of equal values.
+    """
+    order, bounds, ranges = blocks
+    out = np.full(len(values), np.nan)
+    for lo, hi in ranges:
+        if hi == lo:
+            continue
+        rows = order[lo:hi]
+        d0, d1 = int(day[rows[0]]), int(day[rows[-1]]) + 1
+        counts = np.diff(bounds[d0:d1 + 1])
+        r = day[rows] - d0
+        c = np.arange(hi - lo) - np.repeat(bounds[d0:d1] - lo, counts)
+        mat = np.full((d1 - d0, int(counts.max())), np.nan)
+        mat[r, c] = values[rows]
+
+        srt = np.argsort(mat, axis=1)           # NaN last in every row
+        v = np.take_along_axis(mat, srt, axis=1)
+        j = np.broadcast_to(np.arange(mat.shape[1]), mat.shape)
+        # Runs of equal values share the mean of their first and last position
+        new_run = np.ones(mat.shape, dtype=bool)
+        new_run[:, 1:] = v[:, 1:] != v[:, :-1]
+        first = np.maximum.accumulate(np.where(new_run, j, 0), axis=1)
+        run_end = np.ones(mat.shape, dtype=bool)
+        run_end[:, :-1] = new_run[:, 1:]
+        last = np.minimum.accumulate(np.where(run_end, j, mat.shape[1])[:, ::-1], axis=1)[:, ::-1]
+        valid = (~np.isnan(mat)).sum(axis=1, keepdims=True)
+        pct = np.empty_like(mat)
+        # Dates without a valid value divide by 0; those cells are NaN and masked below
+        with np.errstate(divide="ignore", invalid="ignore"):
+            np.put_along_axis(pct, srt, ((first + last) / 2.0 + 1.0) / valid, axis=1)
+        out[rows] = np.where(np.isnan(mat), np.nan, pct)[r, c]
+    return out
+
+
+def _group_mean(values: np.ndarray, key: np.ndarray, n_keys: int):
+    """(mean per key over non-NaN values, count per key)."""
+    ok = ~np.isnan(values)
+    total = np.bincount(key[ok], weights=values[ok], minlength=n_keys)
+    count = np.bincount(key[ok], minlength=n_keys)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return total / count, count
+
+
+def zscore(values: np.ndarray, day: np.ndarray, n_dates: int) -> np.ndarray:
+    """
+    (x - date mean) / date std (ddof=1), two passes of `bincount` over the dates.
+    Dates with a single value or no dispersion give 0 (every value equals the mean).
+    """
+    mean, count = _group_mean(values, day, n_dates)
+    dev = values - mean[day]
+    ok = ~np.isnan(dev)
+    ss = np.bincount(day[ok], weights=dev[ok] * dev[ok], minlength=n_dates)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        std = np.sqrt(ss / (count - 1))
+    std = np.where((count > 1) & (std > 0), std, np.nan)[day]
+    return np.where(np.isnan(std), np.where(ok, 0.0, np.nan), dev / std)
+
+
+def group_relative(values: np.ndarray, day: np.ndarray, group: np.ndarray, n_groups: int) -> np.ndarray:
+    """x minus the mean of its (date, group) peers, itself included."""
+    key = day.astype(np.int64) * n_groups + group
+    mean, _ = _group_mean(values, key, int(day.max() + 1) * n_groups if len(day) else 0)
+    return values - mean[key]
+
+
+def iter_cross_section(
+    price: np.ndarray,
+    starts: np.ndarray,
+    pos: np.ndarray,
+    day: np.ndarray,
+    group: np.ndarray,
+    n_dates: int,
+    block_rows: int = 1 << 20,
+) -> Iterator[Tuple[str, np.ndarray]]:
+    """
+    (name, column) of every cross-sectional feature, one at a time, for rows in (ticker, date)
+    order (`starts`/`pos` as in the engine). Inputs are recomputed from `price` with the engine's
+    kernels, so `cs_*` columns see the same returns and momentum as the per-ticker features.
+    - group: integer group code per row (e.g. exchange x ETF flag), for `cs_grp_rel_*`
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inputs = {"ret_1d": pct_change(ffill(price, starts), 1, pos)}
+        for c in dict.fromkeys(CS_RANK + CS_ZSCORE + CS_GROUP_REL):
+            if c == "ret_1d":
+                continue
+            inputs[c] = price / shift(price, int(c[len("mom_"):-1]), pos) - 1
+
+    blocks = date_blocks(day, n_dates, block_rows)
+    n_groups = int(group.max()) + 1 if len(group) else 1
+    for c in CS_RANK:
+        yield f"cs_rank_{c}", rank_pct(inputs[c], day, blocks)
+    for c in CS_ZSCORE:
+        yield f"cs_z_{c}", zscore(inputs[c], day, n_dates)
+    for c in CS_GROUP_REL:
+        yield f"cs_grp_rel_{c}", group_relative(inputs[c], day, group, n_groups)
+
+
+def cross_section_columns(*args, **kwargs) -> Dict[str, np.ndarray]:
+    """`iter_cross_section` as a dict."""
+    return dict(iter_cross_section(*args, **kwargs))
+
+
+# ---------------------------------------------------------------------------
+# Builders
+# ---------------------------------------------------------------------------
+
+def _group_codes(per_ticker: pd.DataFrame, group_by: Sequence[str]) -> np.ndarray:
+    """One code per distinct combination of `group_by` values (missing values form their own group)."""
+    cols = [c for c in group_by if c in per_ticker.columns]
+    if not cols or per_ticker.empty:
+        return np.zeros(len(per_ticker), dtype=np.int64)
+    keys = per_ticker[cols].astype(object).fillna("<none>").astype(str).agg("|".join, axis=1)
+    return pd.factorize(keys, sort=True)[0].astype(np.int64)
+
+
+def _panel_inputs(panel: CompactPanel, group_by: Optional[Sequence[str]], block_rows: int):
+    starts, _, pos = panel.layout()
+    group = _group_codes(panel.meta, DEFAULT_GROUP_BY if group_by is None else group_by)[panel.ticker]
+    return panel.column("price"), starts, pos, panel.day, group, len(panel.dates), block_rows
+
+
+def panel_cross_section(panel: CompactPanel, group_by: Optional[Sequence[str]] = None, block_rows: int = 1 << 20):
+    """`cross_section_columns` of a `CompactPanel` (rows in panel order; groups from `panel.meta`)."""
+    return cross_section_columns(*_panel_inputs(panel, group_by, block_rows))
+
+
+def with_cross_section(panel: CompactPanel, group_by: Optional[Sequence[str]] = None, block_rows: int = 1 << 20) -> CompactPanel:
+    """`panel` with the `cs_*` columns added in its feature block (filled one column at a time)."""
+    out = panel.with_empty(dict.fromkeys(cross_section_names(), np.float64))
+    for c, v in iter_cross_section(*_panel_inputs(panel, group_by, block_rows)):
+        out.column(c)[:] = v
+    return out
+
+
+def add_cross_section_features(
+    df: pd.DataFrame, date_col: str = "Date", group_by: Optional[Sequence[str]] = None, block_rows: int = 1 << 20,
+) -> pd.DataFrame:
+    """
+    `df` (long: date, ticker, price and the `group_by` meta) with the `cs_*` columns added.
+    Row order and index are kept; the columns only depend on the whole frame, so they can be
+    added before the frame is split by ticker (sharded build) or filtered to new rows (incremental).
+    """
+    group_by = DEFAULT_GROUP_BY if group_by is None else list(group_by)
+    t_codes = pd.factorize(df["ticker"], sort=True)[0]
+    d_codes = pd.factorize(pd.to_datetime(df[date_col]), sort=True)[0]
+    order = np.lexsort((d_codes, t_codes))
+    starts, _, pos = group_layout(t_codes[order])
+    first = order[starts]
+    per_ticker = pd.DataFrame({c: df[c].to_numpy()[first] for c in group_by if c in df.columns})
+    group = np.repeat(_group_codes(per_ticker, group_by), np.diff(np.append(starts, len(order))))
+    df = df.drop(columns=[c for c in cross_section_names() if c in df.columns])
+    for c, v in iter_cross_section(
+        df["price"].to_numpy(dtype=np.float64)[order], starts, pos, d_codes[order].astype(np.int64), group,
+        int(d_codes.max()) + 1 if len(d_codes) else 0, block_rows,
+    ):
+        out = np.empty(len(df))
+        out[order] = v
+        df[c] = out
+    return df
+
+
+def cross_section_rows(
+    df: pd.DataFrame, rows: pd.Index, date_col: str = "Date", group_by: Optional[Sequence[str]] = None,
+    block_rows: int = 1 << 20,
+) -> pd.DataFrame:
+    """
+    `add_cross_section_features(df).loc[rows]`, computed on the part of `df` those rows depend on:
+    every row of their dates (the universe they are ranked against) and, per ticker, the
+    `CS_LOOKBACK` rows before its first such date plus its last quoted price before it (what the
+    forward fill behind `ret_1d` reads). An incremental update of the latest dates costs
+    O(new dates x tickers + lookback), not a pass over the whole history.
+    """
+    t_codes = pd.factorize(df["ticker"], sort=True)[0]
+    d_codes = pd.factorize(pd.to_datetime(df[date_col]), sort=True)[0]
+    on_date = np.zeros(int(d_codes.max()) + 1 if len(d_codes) else 0, dtype=bool)
+    on_date[d_codes[df.index.get_indexer(rows)]] = True
+
+    order = np.lexsort((d_codes, t_codes))
+    ticker = t_codes[order]
+    starts, lengths, pos = group_layout(ticker)
+    needed = on_date[d_codes[order]]
+    first_needed = lengths.copy()               # = lengths: no row of the ticker is needed
+    np.minimum.at(first_needed, np.repeat(np.arange(len(starts)), lengths)[needed], pos[needed])
+
+    # Position of each ticker's last quoted price before its first needed row (-1 if none)
+    quote = np.where(np.isnan(df["price"].to_numpy(dtype=np.float64)[order]), -1, np.arange(len(order)))
+    last_quote = np.maximum.accumulate(quote) if len(quote) else quote
+    before = starts + first_needed - 1
+    quoted = np.where(first_needed > 0, last_quote[np.maximum(before, 0)] - starts, -1)
+    keep_from = np.maximum(first_needed - CS_LOOKBACK, 0)
+    keep_from = np.where(quoted >= 0, np.minimum(keep_from, quoted), keep_from)
+    keep = (pos >= np.repeat(keep_from, lengths)) & (np.repeat(first_needed, lengths) < np.repeat(lengths, lengths))
+
+    part = df.iloc[np.sort(order[keep])]
+    return add_cross_section_features(part, date_col, group_by, block_rows).loc[rows]
+
@@ -0,0 +1,237 @@
+import pandas as pd
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except Exception:
+    HAS_NUMBA = False
+
+# Indicator configuration (same windows as add_basic_features / add_technical_features)
+RET_LAGS = [1, 2, 3, 5, 10]
+RET_WINDOWS = [5, 10, 20]
+MOM_PERIODS = [5, 10, 20]
+RANGE_WINDOW = 252
+MA_WINDOWS = [5, 10, 20, 50]
+MACD_SPANS = (12, 26, 9)
+RSI_WINDOW = 14
+BB_WINDOW = 20
+
+
+# ---------------------------------------------------------------------------
+# Group layout: rows sorted by (ticker, date), one contiguous slice per ticker
+# ---------------------------------------------------------------------------
+
+def group_layout(keys: np.ndarray):
+    """
+    For keys sorted so that each group is contiguous, return:
+    - starts: first row of each group
+    - lengths: rows per group
+    - pos: position of every row inside its group (0 = first row of the ticker)
+    """
+    n = len(keys)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    is_start = np.ones(n, dtype=bool)
+    is_start[1:] = keys[1:] != keys[:-1]
+    starts = np.flatnonzero(is_start)
+    lengths = np.diff(np.append(starts, n))
+    pos = np.arange(n) - np.repeat(starts, lengths)
+    return starts, lengths, pos
+
+
+# ---------------------------------------------------------------------------
+# Kernels (1-D arrays in group-contiguous order; `pos` masks group boundaries)
+# ---------------------------------------------------------------------------
+
+def shift(x: np.ndarray, periods: int, pos: np.ndarray) -> np.ndarray:
+    out = np.full_like(x, np.nan)
+    out[periods:] = x[:-periods]
+    out[pos < periods] = np.nan
+    return out
+
+
+def ffill(x: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs inside each group (leading NaNs stay NaN)."""
+    idx = np.where(np.isnan(x), 0, np.arange(len(x)))
+    idx[starts] = starts
+    return x[np.maximum.accumulate(idx)]
+
+
+def pct_change(filled: np.ndarray, periods: int, pos: np.ndarray) -> np.ndarray:
+    """Grouped pct_change on forward-filled prices (pandas' default fill_method before 3.0, as in `add_basic_features`)."""
+    return filled / shift(filled, periods, pos) - 1
+
+
+def rolling_sum(x: np.ndarray, window: int, pos: np.ndarray) -> np.ndarray:
+    """Full-window rolling sum; NaN if the window is incomplete or contains NaN."""
+    out = np.full_like(x, np.nan)
+    if len(x) >= window:
+        out[window - 1:] = sliding_window_view(x, window).sum(axis=-1)
+    out[pos < window - 1] = np.nan
+    return out
+
+
+def rolling_mean(x: np.ndarray, window: int, pos: np.ndarray) -> np.ndarray:
+    return rolling_sum(x, window, pos) / window
+
+
+def rolling_std(x: np.ndarray, window: int, pos: np.ndarray, chunk: int = 1 << 20) -> np.ndarray:
+    """Sample std (ddof=1), two-pass around each window mean; chunked to bound temporaries."""
+    out = np.full_like(x, np.nan)
+    if len(x) >= window:
+        view = sliding_window_view(x, window)
+        for s in range(0, len(view), chunk):
+            block = view[s:s + chunk]
+            dev = block - (block.sum(axis=-1) / window)[:, None]
+            out[window - 1 + s:window - 1 + s + len(block)] = np.sqrt((dev * dev).sum(axis=-1) / (window - 1))
+    out[pos < window - 1] = np.nan
+    return out
+
+
+def rolling_extreme(x: np.ndarray, window: int, pos: np.ndarray, fn=np.maximum) -> np.ndarray:
+    """
+    Rolling max/min in O(n) (van Herk / Gil-Werman): prefix/suffix extremes per block of `window`.
+    NaN anywhere in the window gives NaN, matching `rolling(window).max()` with full min_periods.
+    """
+    n = len(x)
+    out = np.full_like(x, np.nan)
+    if n >= window:
+        n_blocks = -(-n // window)
+        padded = np.full(n_blocks * window, np.nan)
+        padded[:n] = x
+        blocks = padded.reshape(n_blocks, window)
+        prefix = fn.accumulate(blocks, axis=1).ravel()
+        suffix = fn.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+        ends = np.arange(window - 1, n)
+        out[window - 1:] = fn(suffix[ends - window + 1], prefix[ends])
+    out[pos < window - 1] = np.nan
+    return out
+
+
+def _ema_alpha(span: int) -> float:
+    # Same arithmetic as pandas (span -> com -> alpha) so the weights are bit-identical
+    com = (span - 1) / 2.0
+    return 1.0 / (1.0 + com)
+
+
+def ema_init(n_groups: int):
+    """Fresh EMA state per group: (weighted, old_wt, nobs)."""
+    return np.full(n_groups, np.nan), np.ones(n_groups), np.zeros(n_groups, dtype=np.int64)
+
+
+def _ema_columns(mat: np.ndarray, lengths: np.ndarray, alpha: float, weighted, old_wt, nobs) -> np.ndarray:
+    """
+    `ewm(adjust=False).mean()` along each row of a (groups x max_len) matrix, stepping
+    through time once for all groups. Replicates pandas' recurrence, including NaN gaps.
+    """
+    factor = 1.0 - alpha
+    out = np.full_like(mat, np.nan)
+    for k in range(mat.shape[1]):
+        cur = mat[:, k]
+        obs = cur == cur
+        nobs += obs
+        have = (weighted == weighted) & (k < lengths)
+        old_wt[have] *= factor
+        upd = have & obs
+        mixed = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+        np.copyto(weighted, mixed, where=upd & (weighted != cur))
+        old_wt[upd] = 1.0
+        np.copyto(weighted, cur, where=~have & obs)
+        out[:, k] = np.where(nobs >= 1, weighted, np.nan)
+    return out
+
+
+if HAS_NUMBA:
+    @njit(cache=True)
+    def _ema_slices(x, starts, lengths, alpha, weighted0, old_wt0, nobs0):
+        factor = 1.0 - alpha
+        out = np.empty_like(x)
+        for g in range(len(starts)):
+            weighted = weighted0[g]
+            old_wt = old_wt0[g]
+            nobs = nobs0[g]
+            for i in range(starts[g], starts[g] + lengths[g]):
+                cur = x[i]
+                obs = cur == cur
+                nobs += obs
+                if weighted == weighted:
+                    old_wt *= factor
+                    if obs:
+                        if weighted != cur:
+                            weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                        old_wt = 1.0
+                elif obs:
+                    weighted = cur
+                out[i] = weighted if nobs >= 1 else np.nan
+            weighted0[g] = weighted
+            old_wt0[g] = old_wt
+            nobs0[g] = nobs
+        return out
+
+
+def ema(x: np.ndarray, span: int, starts: np.ndarray, lengths: np.ndarray, state=None) -> np.ndarray:
+    """
+    Grouped `ewm(span, adjust=False).mean()`; compiled with numba when installed.
+    `state` (see `ema_init`) resumes each group from a previous run and is updated in place.
+    """
+    alpha = _ema_alpha(span)
+    weighted, old_wt, nobs = state if state is not None else ema_init(len(starts))
+    if HAS_NUMBA:
+        return _ema_slices(x, starts, lengths, alpha, weighted, old_wt, nobs)
+    mat = np.full((len(starts), int(lengths.max()) if len(lengths) else 0), np.nan)
+    group = np.repeat(np.arange(len(starts)), lengths)
+    local = np.arange(len(x)) - np.repeat(starts, lengths)
+    mat[group, local] = x
+    return _ema_columns(mat, lengths, alpha, weighted, old_wt, nobs)[group, local]
+
+
+def rsi(price: np.ndarray, window: int, pos: np.ndarray) -> np.ndarray:
+    delta = price - shift(price, 1, pos)
+    up = np.clip(delta, 0, None)
+    down = -np.clip(delta, None, 0)
+    gain = rolling_mean(up, window, pos)
+    loss = rolling_mean(down, window, pos)
+    rs = gain / np.where(loss == 0, np.nan, loss)
+    return 100 - (100 / (1 + rs))
+
+
+# ---------------------------------------------------------------------------
+# Feature builder
+# ---------------------------------------------------------------------------
+
+def compute_features(df: pd.DataFrame, date_col: str = "Date", features=None) -> pd.DataFrame:
+    """
+    Single-pass equivalent of `add_technical_features(add_basic_features(df))`:
+    - sorts once by (ticker, date) and derives group boundaries once
+    - evaluates every indicator with array kernels over contiguous per-ticker slices
+    Same columns, order and values (up to floating-point rounding in rolling sums).
+    `features` restricts the columns to those names (see `src.features.registry`).
+    """
+    df = df.copy()
+    df[date_col] = pd.to_datetime(df[date_col])
+    df = df.sort_values(["ticker", date_col])
+
+    codes = pd.factorize(df["ticker"])[0]
+    starts, lengths, pos = group_layout(codes)
+    price = df["price"].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cols = _feature_columns(price, starts, lengths, pos, features=features)
+
+    features = pd.DataFrame(cols, index=df.index)
+    df = df.drop(columns=[c for c in features.columns if c in df.columns])
+    return pd.concat([df, features], axis=1)
+
+
+def _feature_columns(price, starts, lengths, pos, filled=None, ema_fn=None, features=None, extra=()) -> dict:
+    """
+    Indicator columns for group-contiguous `price`, evaluated through the feature graph
+    (`src.features.registry`): only `features` (default: all) and the nodes they depend on.
+    - filled: forward-filled prices (computed here unless given)
+    - ema_fn(x, span, key): EMA hook; defaults to a fresh grouped EMA
+    - extra: nodes returned in addition to `features` (e.g. "ret_1d" for the target)
+    """
+    from src.features.registry import compute  # the registry is built on this module's kernels
+
+    return compute(features, price, starts, lengths, pos, filled=filled, ema_fn=ema_fn, extra=extra)
@@ -0,0 +1,188 @@
+import pandas as pd
+import numpy as np
+from src.features.engine import (
+    RANGE_WINDOW,
+    _feature_columns,
+    ema,
+    ema_init,
+    ffill,
+    group_layout,
+)
+
+# Rows of history kept per ticker: covers the longest lookback (252-day range window).
+# EMA/MACD recurrences do not need history, they resume from their stored state.
+TAIL = RANGE_WINDOW
+
+
+def init_state(features=None) -> dict:
+    """
+    Empty per-ticker rolling state (arrays aligned with `tickers`):
+    - features: registered features computed for this state (None = all), fixed for its lifetime
+      because EMA state only exists for the EMAs those features need
+    - n_seen: rows processed so far; last_date: latest processed date
+    - tail_price / tail_filled: last TAIL raw / forward-filled prices (left-padded with NaN)
+    - ema: {key: (weighted, old_wt, nobs)} for every EMA the engine computes
+    - pending: each ticker's latest feature row, which gets its target once the next day arrives
+    """
+    return {
+        "features": None if features is None else list(features),
+        "tickers": [],
+        "n_seen": np.zeros(0, dtype=np.int64),
+        "last_date": np.zeros(0, dtype="datetime64[ns]"),
+        "tail_price": np.full((0, TAIL), np.nan),
+        "tail_filled": np.full((0, TAIL), np.nan),
+        "ema": {},
+        "pending": None,
+    }
+
+
+def _grow(state: dict, new_tickers: list):
+    """Register tickers seen for the first time with empty history."""
+    k = len(new_tickers)
+    if not k:
+        return
+    state["tickers"] = list(state["tickers"]) + list(new_tickers)
+    state["n_seen"] = np.concatenate([state["n_seen"], np.zeros(k, dtype=np.int64)])
+    state["last_date"] = np.concatenate([state["last_date"], np.full(k, np.datetime64("NaT"), dtype="datetime64[ns]")])
+    state["tail_price"] = np.vstack([state["tail_price"], np.full((k, TAIL), np.nan)])
+    state["tail_filled"] = np.vstack([state["tail_filled"], np.full((k, TAIL), np.nan)])
+    for key, arrays in state["ema"].items():
+        state["ema"][key] = tuple(np.concatenate([a, b]) for a, b in zip(arrays, ema_init(k)))
+
+
+def new_rows(state: dict, df: pd.DataFrame, date_col: str = "Date") -> pd.DataFrame:
+    """Rows of `df` dated after each ticker's last processed date (all rows for new tickers)."""
+    dates = pd.to_datetime(df[date_col])
+    last = pd.Series(state["last_date"], index=state["tickers"], dtype="datetime64[ns]")
+    cutoff = df["ticker"].astype(object).map(last)
+    return df[cutoff.isna() | (dates > cutoff)]
+
+
+def _layout(state: dict, ticker_ids: np.ndarray, new_starts: np.ndarray, counts: np.ndarray, new_price: np.ndarray):
+    """
+    Lay out [stored tail | new rows] per touched ticker, contiguous, as the engine kernels expect.
+    Returns price, filled, starts, lengths, pos (position in the ticker's full history),
+    is_new (row comes from `new_price`) and tail_len.
+    """
+    tail_len = np.minimum(state["n_seen"][ticker_ids], TAIL)
+    lengths = tail_len + counts
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+    total = int(lengths.sum())
+    price = np.empty(total)
+    filled = np.empty(total)
+    is_new = np.ones(total, dtype=bool)
+    for g, t in enumerate(ticker_ids):
+        tl, s, e = tail_len[g], starts[g], starts[g] + lengths[g]
+        price[s:s + tl] = state["tail_price"][t, TAIL - tl:]
+        filled[s:s + tl] = state["tail_filled"][t, TAIL - tl:]
+        price[s + tl:e] = new_price[new_starts[g]:new_starts[g] + counts[g]]
+        filled[s + tl:e] = price[s + tl:e]
+        is_new[s:s + tl] = False
+    filled = ffill(filled, starts)
+    pos = np.arange(total) - np.repeat(starts, lengths) + np.repeat(state["n_seen"][ticker_ids] - tail_len, lengths)
+    return price, filled, starts, lengths, pos, is_new, tail_len
+
+
+def _ema_hook(state: dict, ticker_ids, new_starts, counts, is_new, commit: bool):
+    """`ema_fn` for `_feature_columns`: EMAs over the new rows only, resumed from the stored state."""
+    def _resume_ema(x, span, key):
+        stored = state["ema"].get(key)
+        if stored is None:
+            stored = ema_init(len(state["tickers"]))
+            if commit:
+                state["ema"][key] = stored
+        resumed = tuple(a[ticker_ids] for a in stored)
+        out = np.full(len(x), np.nan)
+        out[is_new] = ema(np.ascontiguousarray(x[is_new]), span, new_starts, counts, resumed)
+        if commit:
+            for a, fresh in zip(stored, resumed):
+                a[ticker_ids] = fresh
+        return out
+    return _resume_ema
+
+
+def peek(state: dict, ticker_ids: np.ndarray, price: np.ndarray) -> dict:
+    """
+    Features of one provisional new row per ticker (`ticker_ids` index `state["tickers"]`), e.g.
+    an intraday price, without touching `state`. Same layout, kernels and EMA state as `extend`,
+    so the values are exactly what `extend` would produce if the row were committed.
+    Returns {feature: array aligned with ticker_ids}.
+    """
+    ticker_ids = np.asarray(ticker_ids, dtype=np.int64)
+    k = len(ticker_ids)
+    new_starts, counts = np.arange(k, dtype=np.int64), np.ones(k, dtype=np.int64)
+    arrays = _layout(state, ticker_ids, new_starts, counts, np.asarray(price, dtype=float))
+    price_l, filled, starts, lengths, pos, is_new, _ = arrays
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ema_fn = _ema_hook(state, ticker_ids, new_starts, counts, is_new, commit=False)
+        cols = _feature_columns(price_l, starts, lengths, pos, filled=filled, ema_fn=ema_fn, features=state.get("features"))
+    return {c: v[is_new] for c, v in cols.items()}
+
+
+def extend(state: dict, df_new: pd.DataFrame, date_col: str = "Date") -> pd.DataFrame:
+    """
+    Extend the dataset with rows newer than anything in `state` (updated in place).
+    Work is O(new rows + TAIL per touched ticker): windows read the stored tails and EMAs
+    resume from their stored state, so history is never recomputed.
+    Returns labelled rows: each touched ticker's pending row plus its new rows except the
+    latest, with the state's feature columns and `target_return_1d` (next-day pct_change).
+    The latest row per ticker becomes the new pending row.
+    """
+    df_new = df_new.copy()
+    df_new[date_col] = pd.to_datetime(df_new[date_col])
+    df_new = df_new.sort_values(["ticker", date_col])
+
+    known = set(state["tickers"])
+    _grow(state, [t for t in pd.unique(df_new["ticker"]) if t not in known])
+    index = {t: i for i, t in enumerate(state["tickers"])}
+    # Tickers may be categorical (as read from parquet): map the values, not the categories
+    ids = df_new["ticker"].astype(object).map(index).to_numpy(dtype=np.int64)
+    new_starts, counts, _ = group_layout(ids)
+    ticker_ids = ids[new_starts]
+    new_price = df_new["price"].to_numpy(dtype=float)
+
+    price, filled, starts, lengths, pos, is_new, tail_len = _layout(state, ticker_ids, new_starts, counts, new_price)
+    total = len(price)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ema_fn = _ema_hook(state, ticker_ids, new_starts, counts, is_new, commit=True)
+        cols = _feature_columns(price, starts, lengths, pos, filled=filled, ema_fn=ema_fn, features=state.get("features"))
+        # Next-day return of every row whose next row is known (same formula as step_03)
+        target = np.full(total, np.nan)
+        target[:-1] = filled[1:] / filled[:-1] - 1
+
+    ends = starts + lengths
+    labelled = is_new.copy()
+    labelled[ends - 1] = False                      # latest row per ticker -> pending
+    has_pending = tail_len > 0
+    labelled_tail = (starts + tail_len - 1)[has_pending]
+
+    # Roll tails forward
+    for g, t in enumerate(ticker_ids):
+        keep = min(lengths[g], TAIL)
+        state["tail_price"][t] = np.nan
+        state["tail_filled"][t] = np.nan
+        state["tail_price"][t, TAIL - keep:] = price[ends[g] - keep:ends[g]]
+        state["tail_filled"][t, TAIL - keep:] = filled[ends[g] - keep:ends[g]]
+    state["n_seen"][ticker_ids] += counts
+    state["last_date"][ticker_ids] = df_new[date_col].to_numpy()[new_starts + counts - 1]
+
+    features = pd.DataFrame({c: v[is_new] for c, v in cols.items()}, index=df_new.index)
+    rows = pd.concat([df_new.drop(columns=[c for c in features.columns if c in df_new.columns]), features], axis=1)
+    rows["target_return_1d"] = target[is_new]
+
+    # Previous pending rows now get their target; the latest rows become pending
+    pending = state["pending"]
+    if pending is not None and has_pending.any():
+        prev = pending.set_index("ticker").loc[[state["tickers"][t] for t in ticker_ids[has_pending]]].reset_index()
+        prev["target_return_1d"] = target[labelled_tail]
+        out = pd.concat([prev[rows.columns], rows[labelled[is_new]]], ignore_index=True)
+    else:
+        out = rows[labelled[is_new]].reset_index(drop=True)
+
+    latest = rows[~labelled[is_new]].drop(columns="target_return_1d")
+    if pending is not None:
+        latest = pd.concat([pending[~pending["ticker"].isin(latest["ticker"])], latest], ignore_index=True)
+    state["pending"] = latest.reset_index(drop=True)
+
+    return out.sort_values(["ticker", date_col]).reset_index(drop=True)
@@ -0,0 +1,238 @@
+import numpy as np
+from contextlib import ExitStack
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from src.features.engine import (
+    BB_WINDOW,
+    MA_WINDOWS,
+    MACD_SPANS,
+    MOM_PERIODS,
+    RANGE_WINDOW,
+    RET_LAGS,
+    RET_WINDOWS,
+    RSI_WINDOW,
+    ema,
+    ffill,
+    pct_change,
+    rolling_extreme,
+    rolling_mean,
+    rolling_std,
+    rsi,
+    shift,
+)
+from src.utils_profile import span
+
+# Names used in older configs -> registered names
+ALIASES = {
+    "return_1d": "ret_1d",
+    "log_return_1d": "log_ret_1d",
+    "vol_5": "ret_std_5",
+    "vol_10": "ret_std_10",
+    "vol_20": "ret_std_20",
+    "return_1d_x_rsi_14": "ret_1d_x_rsi_14",
+}
+
+# Config groups listing features (registered names, or columns the input frame already has, e.g. dow/month)
+GROUPS = ["basic", "technical", "calendar", "interaction"]
+
+
+@dataclass(frozen=True)
+class Feature:
+    """
+    One node of the feature graph.
+    - inputs: nodes whose values `fn` receives (in this order), after `price`
+    - window: rows of history this node itself needs; `warmup` adds up windows along its inputs
+    - group: profiling span the node is computed in; public=False for shared intermediates
+      (forward-filled prices, lagged prices, EMA 12/26, std 20) that are not dataset columns
+    """
+    name: str
+    inputs: Tuple[str, ...]
+    window: int
+    fn: Callable
+    group: Optional[str] = None
+    public: bool = True
+
+
+# name -> Feature, in registration order (every node is registered after its inputs)
+FEATURES: Dict[str, Feature] = {}
+
+
+class Context:
+    """Per-call arrays the node functions read: group layout, pre-filled prices, EMA hook."""
+
+    def __init__(self, price, starts, lengths, pos, filled=None, ema_fn=None):
+        self.price, self.starts, self.lengths, self.pos = price, starts, lengths, pos
+        self.filled = filled
+        self.ema_fn = ema_fn
+
+    def ema(self, x: np.ndarray, span_: int, key: str) -> np.ndarray:
+        if self.ema_fn is not None:
+            return self.ema_fn(x, span_, key)
+        return ema(x, span_, self.starts, self.lengths)
+
+
+def register(name: str, inputs: Sequence[str] = (), window: int = 0, group: Optional[str] = None, public: bool = True):
+    """Decorator adding `fn(ctx, *input_values)` to the graph under `name`."""
+    def wrap(fn):
+        missing = [i for i in inputs if i not in FEATURES]
+        if missing:
+            raise ValueError(f"Feature '{name}' depends on unregistered {missing}")
+        FEATURES[name] = Feature(name, tuple(inputs), window, fn, group, public)
+        return fn
+    return wrap
+
+
+def canonical(name: str) -> str:
+    return ALIASES.get(name, name)
+
+
+@lru_cache(maxsize=None)
+def warmup(name: str) -> int:
+    """Leading rows per ticker for which `name` is undefined (its window plus its inputs' warm-up)."""
+    f = FEATURES[canonical(name)]
+    return f.window + max((warmup(i) for i in f.inputs), default=0)
+
+
+def public_features() -> List[str]:
+    return [n for n, f in FEATURES.items() if f.public]
+
+
+def resolve(names: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Every node needed for `names` (default: all public features), dependencies included, in
+    evaluation order. Unknown names raise ValueError.
+    """
+    wanted = public_features() if names is None else [canonical(n) for n in names]
+    unknown = [n for n in wanted if n not in FEATURES]
+    if unknown:
+        raise ValueError(f"Unknown feature(s) {unknown}. Registered: {public_features()}")
+    needed, stack = set(), list(wanted)
+    while stack:
+        n = stack.pop()
+        if n not in needed:
+            needed.add(n)
+            stack.extend(FEATURES[n].inputs)
+    return [n for n in FEATURES if n in needed]
+
+
+def select(names: Optional[Iterable[str]] = None) -> List[str]:
+    """Requested public features, canonical and in registration order (the dataset column order)."""
+    if names is None:
+        return public_features()
+    wanted = {canonical(n) for n in names}
+    return [n for n in resolve(wanted) if n in wanted]
+
+
+def compute(
+    names: Optional[Iterable[str]], price, starts, lengths, pos, filled=None, ema_fn=None, extra: Sequence[str] = (),
+) -> Dict[str, np.ndarray]:
+    """
+    Columns `names` (default: all public features) for group-contiguous `price`, each
+    intermediate computed once. `extra` nodes (e.g. "ret_1d" for the target) are evaluated too
+    and returned after the requested columns.
+    - filled: forward-filled prices (computed here unless given)
+    - ema_fn(x, span, key): EMA hook; defaults to a fresh grouped EMA
+    """
+    out_names = select(names)
+    ctx = Context(price, starts, lengths, pos, filled, ema_fn)
+    values: Dict[str, np.ndarray] = {}
+    with ExitStack() as stack:
+        current = None
+        for n in resolve(out_names + [canonical(e) for e in extra]):
+            f = FEATURES[n]
+            if f.group != current:
+                stack.close()
+                if f.group is not None:
+                    stack.enter_context(span(f.group, rows=len(price)))
+                current = f.group
+            values[n] = f.fn(ctx, *(values[i] for i in f.inputs))
+    return {n: values[n] for n in dict.fromkeys(out_names + [canonical(e) for e in extra])}
+
+
+def listed_features(cfg: dict) -> Tuple[Optional[List[str]], List[str]]:
+    """
+    (registered features to compute, input columns to keep) from the `features` config.
+    - `select: all` (or no lists): (None, []), i.e. every registered feature and every input column
+    - `select: listed`: the names under `basic`/`technical`/`calendar`/`interaction`; registered
+      names (or their old aliases) are computed, any other name must be a column of the input
+    """
+    fcfg = cfg.get("features", {})
+    names = [n for g in GROUPS for n in (fcfg.get(g) or [])]
+    if fcfg.get("select", "all") == "all" or not names:
+        return None, []
+    names = list(dict.fromkeys(canonical(n) for n in names))
+    return [n for n in names if n in FEATURES], [n for n in names if n not in FEATURES]
+
+
+# ---------------------------------------------------------------------------
+# Registered features (same formulas, order and spans as add_basic/add_technical_features)
+# ---------------------------------------------------------------------------
+
+def _price_lag(p: int, group: str):
+    """Hidden node `price_lag_<p>` (prices p rows back), shared by the features that divide by it."""
+    if f"price_lag_{p}" not in FEATURES:
+        register(f"price_lag_{p}", window=p, group=group, public=False)(lambda ctx: shift(ctx.price, p, ctx.pos))
+    return f"price_lag_{p}"
+
+
+register("filled", public=False)(lambda ctx: ffill(ctx.price, ctx.starts) if ctx.filled is None else ctx.filled)
+
+# --- basic ---
+register("ret_1d", ["filled"], window=1, group="returns")(lambda ctx, filled: pct_change(filled, 1, ctx.pos))
+register("log_ret_1d", [_price_lag(1, "returns")], group="returns")(
+    lambda ctx, prev: np.log((ctx.price + 1e-12) / (prev + 1e-12))
+)
+for _p in RET_LAGS:
+    if _p == 1:
+        register("ret_lag_1d", ["ret_1d"], group="returns")(lambda ctx, ret: ret)
+    else:
+        register(f"ret_lag_{_p}d", ["filled"], window=_p, group="returns")(
+            lambda ctx, filled, p=_p: pct_change(filled, p, ctx.pos)
+        )
+for _w in RET_WINDOWS:
+    register(f"ret_mean_{_w}", ["ret_1d"], window=_w - 1, group="returns")(
+        lambda ctx, ret, w=_w: rolling_mean(ret, w, ctx.pos)
+    )
+    register(f"ret_std_{_w}", ["ret_1d"], window=_w - 1, group="returns")(
+        lambda ctx, ret, w=_w: rolling_std(ret, w, ctx.pos)
+    )
+for _p in MOM_PERIODS:
+    register(f"mom_{_p}d", [_price_lag(_p, "momentum")], group="momentum")(lambda ctx, prev: ctx.price / prev - 1)
+    register(f"roc_{_p}d", [f"price_lag_{_p}"], group="momentum")(lambda ctx, prev: (ctx.price - prev) / prev)
+register(f"roll_max_{RANGE_WINDOW}", window=RANGE_WINDOW - 1, group="range_52w")(
+    lambda ctx: rolling_extreme(ctx.price, RANGE_WINDOW, ctx.pos, np.maximum)
+)
+register(f"roll_min_{RANGE_WINDOW}", window=RANGE_WINDOW - 1, group="range_52w")(
+    lambda ctx: rolling_extreme(ctx.price, RANGE_WINDOW, ctx.pos, np.minimum)
+)
+register("pct_from_52w_high", [f"roll_max_{RANGE_WINDOW}"], group="range_52w")(lambda ctx, hi: (ctx.price / hi) - 1.0)
+register("pct_from_52w_low", [f"roll_min_{RANGE_WINDOW}"], group="range_52w")(lambda ctx, lo: (ctx.price / lo) - 1.0)
+register("ret_x_mom10", ["ret_1d", "mom_10d"])(lambda ctx, ret, mom: ret * mom)
+
+# --- technical ---
+for _w in MA_WINDOWS:
+    register(f"sma_{_w}", window=_w - 1, group="moving_averages")(lambda ctx, w=_w: rolling_mean(ctx.price, w, ctx.pos))
+    register(f"ema_{_w}", group="moving_averages")(lambda ctx, w=_w: ctx.ema(ctx.price, w, f"ema_{w}"))
+_fast, _slow, _signal = MACD_SPANS
+for _s in (_fast, _slow):
+    if f"ema_{_s}" not in FEATURES:
+        register(f"ema_{_s}", group="macd", public=False)(lambda ctx, s=_s: ctx.ema(ctx.price, s, f"ema_{s}"))
+register("macd", [f"ema_{_fast}", f"ema_{_slow}"], group="macd")(lambda ctx, fast, slow: fast - slow)
+register("macd_signal", ["macd"], group="macd")(lambda ctx, macd: ctx.ema(macd, _signal, "macd_signal"))
+register("macd_hist", ["macd", "macd_signal"], group="macd")(lambda ctx, macd, sig: macd - sig)
+register(f"rsi_{RSI_WINDOW}", window=RSI_WINDOW, group="rsi")(lambda ctx: rsi(ctx.price, RSI_WINDOW, ctx.pos))
+
+register(f"std_{BB_WINDOW}", window=BB_WINDOW - 1, group="bollinger", public=False)(
+    lambda ctx: rolling_std(ctx.price, BB_WINDOW, ctx.pos)
+)
+_sma, _std = f"sma_{BB_WINDOW}", f"std_{BB_WINDOW}"
+register(f"bb_upper_{BB_WINDOW}", [_sma, _std], group="bollinger")(lambda ctx, sma, std: sma + 2 * std)
+register(f"bb_lower_{BB_WINDOW}", [_sma, _std], group="bollinger")(lambda ctx, sma, std: sma - 2 * std)
+register(f"bb_width_{BB_WINDOW}", [f"bb_upper_{BB_WINDOW}", f"bb_lower_{BB_WINDOW}", _sma], group="bollinger")(
+    lambda ctx, upper, lower, sma: (upper - lower) / np.where(sma == 0, np.nan, sma)
+)
+register(f"zscore_{BB_WINDOW}", [_sma, _std], group="bollinger")(
+    lambda ctx, sma, std: (ctx.price - sma) / np.where(std == 0, np.nan, std)
+)
+register(f"ret_1d_x_rsi_{RSI_WINDOW}", ["ret_1d", f"rsi_{RSI_WINDOW}"])(lambda ctx, ret, r: ret * r)
@@ -0,0 +1,134 @@
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Callable, List, Tuple
+from src.utils_io import _storage, artifact_path, write_artifact
+
+
+def shard_bounds(keys: np.ndarray, n_shards: int) -> List[Tuple[int, int]]:
+    """
+    Split rows sorted by `keys` into up to `n_shards` contiguous [lo, hi) ranges of similar
+    row count, never cutting through a key (ticker).
+    """
+    n = len(keys)
+    if not n:
+        return []
+    edges = np.r_[np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]), n]
+    cuts = edges[np.searchsorted(edges, np.arange(1, n_shards) * n / n_shards)]
+    bounds = np.unique(np.r_[0, cuts, n])
+    return [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+
+
+def _share(df: pd.DataFrame, order: np.ndarray):
+    """
+    Copy every column, reordered by `order`, into its own shared-memory block (one column
+    at a time, so the parent never holds a second full copy of the frame).
+    Strings/categoricals travel as integer codes (+ their categories), datetimes as int64.
+    Returns (specs, blocks); specs are small and picklable, blocks must be unlinked by the caller.
+    """
+    specs, blocks = [], []
+    for c in df.columns:
+        s = df[c]
+        kind, extra = "plain", None
+        if isinstance(s.dtype, pd.CategoricalDtype) or s.dtype == "object":
+            kind = "category" if isinstance(s.dtype, pd.CategoricalDtype) else "object"
+            cat = s.astype("category")
+            arr, extra = cat.cat.codes.to_numpy()[order], list(cat.cat.categories)
+        elif pd.api.types.is_datetime64_any_dtype(s.dtype):
+            kind, arr = "datetime", s.to_numpy(dtype="datetime64[ns]").view(np.int64)[order]
+        else:
+            arr = s.to_numpy()[order]
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[:] = arr
+        blocks.append(shm)
+        specs.append((c, shm.name, arr.dtype.str, len(arr), kind, extra))
+    return specs, blocks
+
+
+def _attach(specs, lo: int, hi: int) -> pd.DataFrame:
+    """Rebuild rows [lo, hi) from shared memory; only this slice is copied into the worker."""
+    cols = {}
+    for c, name, dtype, n, kind, extra in specs:
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            arr = np.ndarray((n,), dtype=np.dtype(dtype), buffer=shm.buf)[lo:hi].copy()
+        finally:
+            shm.close()
+        if kind == "datetime":
+            arr = arr.view("datetime64[ns]")
+        elif kind in ("category", "object"):
+            arr = pd.Categorical.from_codes(arr, categories=extra)
+            if kind == "object":
+                arr = np.asarray(arr, dtype=object)
+        cols[c] = arr
+    return pd.DataFrame(cols)
+
+
+def _part_path(cfg: dict, name: str, shard: int) -> Path:
+    path = artifact_path(cfg, name)
+    return path.with_name(f"{path.name}.part{shard:05d}")
+
+
+def _run_shard(fn: Callable, specs, lo: int, hi: int, shard: int, cfg: dict, name: str):
+    df, feature_cols = fn(_attach(specs, lo, hi), cfg["data"]["date_col"])
+    if _storage(cfg)["format"] == "csv":
+        df.to_csv(_part_path(cfg, name, shard), index=False)
+    else:
+        write_artifact(df, cfg, name, append=True, part=shard)
+    return len(df), feature_cols
+
+
+def run_sharded(df: pd.DataFrame, fn: Callable, cfg: dict, name: str, workers: int = 0, shards_per_worker: int = 4):
+    """
+    Apply `fn(df_shard, date_col) -> (df, feature_cols)` per group of whole tickers in a process
+    pool and write every shard straight into artifact `name`.
+    - columns are placed in shared memory once; workers receive only (block names, row range)
+    - shards are contiguous ticker ranges balanced by row count; more shards than workers keeps
+      per-worker memory small and the pool busy
+    - parquet: each worker appends its own files to the dataset, named by shard so they read
+      back in shard order; csv: part files are concatenated in shard order. Either way the
+      artifact reads back in (ticker, date) order, as a single-process run
+    `fn` must be a module-level function (it is sent to workers by reference).
+    Returns (rows written, feature columns).
+    """
+    workers = workers or os.cpu_count() or 1
+    date_col = cfg["data"]["date_col"]
+    # Rows ordered by (ticker, date) without materializing a sorted copy of the frame
+    codes = pd.factorize(df["ticker"], sort=True)[0]
+    order = np.lexsort((pd.to_datetime(df[date_col]).to_numpy(), codes))
+    bounds = shard_bounds(codes[order], workers * shards_per_worker)
+
+    path = artifact_path(cfg, name)
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+    specs, blocks = _share(df, order)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_run_shard, fn, specs, lo, hi, i, cfg, name)
+                for i, (lo, hi) in enumerate(bounds)
+            ]
+            results = [f.result() for f in futures]
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    if _storage(cfg)["format"] == "csv":
+        with open(path, "wb") as out:
+            for i in range(len(bounds)):
+                part = _part_path(cfg, name, i)
+                with open(part, "rb") as f:
+                    if i:
+                        f.readline()  # header
+                    shutil.copyfileobj(f, out)
+                part.unlink()
+
+    return sum(r[0] for r in results), results[0][1] if results else []
@@ -0,0 +1,144 @@
+import asyncio
+import ssl
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+class HTTPStatusError(Exception):
+    def __init__(self, status: int, url: str):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all requests: `rate` per second on average, bursts of up to `burst`.
+    rate <= 0 disables it. Waiters are served in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self.last = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+Conn = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+class ConnectionPool:
+    """
+    Minimal HTTP/1.1 GET client on asyncio streams with keep-alive connection reuse.
+    - at most `max_connections` requests in flight (= open connections) across all hosts
+    - idle connections are kept per (scheme, host, port) and reused; a reused connection the
+      server has closed meanwhile is replaced transparently, once
+    - bodies: Content-Length, chunked, or read-to-close
+    """
+
+    def __init__(self, max_connections: int = 32, timeout: float = 30.0):
+        self.timeout = timeout
+        self.slots = asyncio.Semaphore(max_connections)
+        self.idle: Dict[tuple, List[Conn]] = {}
+        self.opened = 0
+
+    async def _open(self, scheme: str, host: str, port: int) -> Conn:
+        self.opened += 1
+        ctx = ssl.create_default_context() if scheme == "https" else None
+        return await asyncio.open_connection(host, port, ssl=ctx)
+
+    @staticmethod
+    def _close(conn: Conn):
+        conn[1].close()
+
+    async def get(self, url: str) -> Tuple[int, bytes]:
+        """(status, body) of GET `url`."""
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        key = (scheme, parts.hostname, parts.port or (443 if scheme == "https" else 80))
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        request = (
+            f"GET {target} HTTP/1.1\r\nHost: {parts.netloc}\r\nConnection: keep-alive\r\n"
+            "Accept-Encoding: identity\r\n\r\n"
+        ).encode()
+
+        async with self.slots:
+            idle = self.idle.setdefault(key, [])
+            reused = bool(idle)
+            conn = idle.pop() if reused else await asyncio.wait_for(self._open(*key), self.timeout)
+            try:
+                status, body, keep = await asyncio.wait_for(self._exchange(conn, request), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                self._close(conn)
+                if not reused:
+                    raise
+                # The server dropped the idle connection: one fresh attempt
+                conn = await asyncio.wait_for(self._open(*key), self.timeout)
+                try:
+                    status, body, keep = await asyncio.wait_for(self._exchange(conn, request), self.timeout)
+                except BaseException:
+                    self._close(conn)
+                    raise
+            except BaseException:
+                self._close(conn)
+                raise
+            if keep:
+                idle.append(conn)
+            else:
+                self._close(conn)
+            return status, body
+
+    @staticmethod
+    async def _exchange(conn: Conn, request: bytes) -> Tuple[int, bytes, bool]:
+        reader, writer = conn
+        writer.write(request)
+        await writer.drain()
+        line = await reader.readline()
+        if not line:
+            raise asyncio.IncompleteReadError(b"", None)
+        version, status = line.split(None, 2)[:2]
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        keep = version == b"HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body, keep = await reader.read(), False
+        return int(status), body, keep
+
+    async def close(self):
+        for conns in self.idle.values():
+            for conn in conns:
+                self._close(conn)
+        self.idle.clear()
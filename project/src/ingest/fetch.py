@@ -0,0 +1,282 @@
+import asyncio
+import io
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+import numpy as np
+import pandas as pd
+from src.ingest.client import ConnectionPool, HTTPStatusError, RateLimiter
+
+# Statuses worth retrying (throttling, transient server errors); others fail the ticker at once
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+
+Span = Tuple[np.datetime64, np.datetime64]   # inclusive [start, end], datetime64[D]
+
+
+def _day(value) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(value).date(), "D")
+
+
+def _parse_prices(data: bytes) -> pd.DataFrame:
+    """`Date,price` CSV -> (Date datetime64, price float64), rows without a price dropped."""
+    if not data.strip():
+        return pd.DataFrame({"Date": pd.to_datetime([]), "price": pd.Series(dtype=float)})
+    df = pd.read_csv(io.BytesIO(data), usecols=["Date", "price"], float_precision="round_trip")
+    df["Date"] = pd.to_datetime(df["Date"])
+    df["price"] = df["price"].astype(float)
+    return df.dropna(subset=["price"])
+
+
+# ---------------------------------------------------------------------------
+# Sources: per-ticker price history for a date range (None = ticker unknown to the source)
+# ---------------------------------------------------------------------------
+
+class HttpSource:
+    """
+    Price histories over HTTP. `url` is a template with {ticker}, {start} and {end}
+    (YYYY-MM-DD, inclusive) answering a `Date,price` CSV; 404 means no such ticker.
+    Requests share one `ConnectionPool` and one `RateLimiter`; failures in `RETRY_STATUS`,
+    timeouts and dropped connections are retried `retries` times with exponential backoff.
+    """
+
+    def __init__(self, url: str, pool: ConnectionPool, limiter: RateLimiter, retries: int = 4, backoff_s: float = 0.5):
+        self.url = url
+        self.pool = pool
+        self.limiter = limiter
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.requests = 0
+        self.retried = 0
+
+    async def get(self, url: str) -> Optional[bytes]:
+        for attempt in range(self.retries + 1):
+            await self.limiter.acquire()
+            self.requests += 1
+            try:
+                status, body = await self.pool.get(url)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                error = e
+            else:
+                if status == 200:
+                    return body
+                if status == 404:
+                    return None
+                error = HTTPStatusError(status, url)
+                if status not in RETRY_STATUS:
+                    raise error
+            if attempt == self.retries:
+                raise error
+            self.retried += 1
+            await asyncio.sleep(self.backoff_s * 2 ** attempt)
+
+    async def prices(self, ticker: str, start: np.datetime64, end: np.datetime64) -> Optional[pd.DataFrame]:
+        body = await self.get(self.url.format(ticker=quote(ticker, safe=""), start=start, end=end))
+        return None if body is None else _parse_prices(body)
+
+
+class MirrorSource:
+    """Price histories from a directory of `<ticker>.csv` files (`Date,price`), e.g. a synced mirror."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory.removeprefix("file://"))
+
+    def _read(self, ticker: str, start: np.datetime64, end: np.datetime64) -> Optional[pd.DataFrame]:
+        path = self.directory / f"{quote(ticker, safe='')}.csv"
+        if not path.exists():
+            return None
+        df = _parse_prices(path.read_bytes())
+        days = df["Date"].to_numpy().astype("datetime64[D]")
+        return df[(days >= start) & (days <= end)]
+
+    async def prices(self, ticker: str, start: np.datetime64, end: np.datetime64) -> Optional[pd.DataFrame]:
+        return await asyncio.to_thread(self._read, ticker, start, end)
+
+
+# ---------------------------------------------------------------------------
+# Checkpoints: one file per ticker plus the date range already fetched for it
+# ---------------------------------------------------------------------------
+
+class History:
+    """
+    Per-ticker price files in `directory` (`<ticker>.csv`, `Date,price`) and `manifest.jsonl`,
+    an append-only log of the range each ticker covers (the last line per ticker wins).
+    A ticker's file is replaced atomically before its manifest line is appended, so an
+    interrupted run resumes where it stopped and at worst refetches one range.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.manifest = self.directory / "manifest.jsonl"
+        self.covered: Dict[str, Span] = {}
+        if self.manifest.exists():
+            for line in self.manifest.read_text().splitlines():
+                if line.strip():
+                    rec = json.loads(line)
+                    self.covered[rec["ticker"]] = (_day(rec["start"]), _day(rec["end"]))
+
+    def path(self, ticker: str) -> Path:
+        return self.directory / f"{quote(ticker, safe='')}.csv"
+
+    def missing(self, ticker: str, start: np.datetime64, end: np.datetime64) -> List[Span]:
+        """Parts of [start, end] outside the ticker's covered range (before it and/or after it)."""
+        if ticker not in self.covered:
+            return [(start, end)] if start <= end else []
+        lo, hi = self.covered[ticker]
+        gaps = []
+        if start < lo:
+            gaps.append((start, min(end, lo - 1)))
+        if end > hi:
+            gaps.append((max(start, hi + 1), end))
+        return gaps
+
+    def load(self, ticker: str) -> pd.DataFrame:
+        path = self.path(ticker)
+        return _parse_prices(path.read_bytes()) if path.exists() else _parse_prices(b"")
+
+    def write(self, ticker: str, frames: List[pd.DataFrame]) -> int:
+        """Merge fetched `frames` into the ticker's file (atomic replace). Returns new rows."""
+        old = self.load(ticker)
+        new = pd.concat([old] + frames, ignore_index=True)
+        new = new.drop_duplicates("Date", keep="last").sort_values("Date")
+        tmp = self.path(ticker).with_suffix(".tmp")
+        new.to_csv(tmp, index=False, date_format="%Y-%m-%d")
+        os.replace(tmp, self.path(ticker))
+        return len(new) - len(old)
+
+    def mark(self, ticker: str, start: np.datetime64, end: np.datetime64):
+        """Extend the ticker's covered range to include [start, end] (after `write` succeeded)."""
+        lo, hi = self.covered.get(ticker, (start, end))
+        self.covered[ticker] = (min(lo, start), max(hi, end))
+        with open(self.manifest, "a") as f:
+            f.write(json.dumps({"ticker": ticker, "start": str(self.covered[ticker][0]), "end": str(self.covered[ticker][1])}) + "\n")
+
+    def compact(self):
+        """Rewrite the manifest with one line per ticker."""
+        tmp = self.manifest.with_suffix(".tmp")
+        tmp.write_text("".join(
+            json.dumps({"ticker": t, "start": str(lo), "end": str(hi)}) + "\n" for t, (lo, hi) in self.covered.items()
+        ))
+        os.replace(tmp, self.manifest)
+
+
+# ---------------------------------------------------------------------------
+# Orchestration
+# ---------------------------------------------------------------------------
+
+async def fetch_all(source, history: History, tickers: List[str], start, end, concurrency: int = 32) -> dict:
+    """
+    Fetch the missing ranges of every ticker concurrently (`concurrency` tickers in flight;
+    the HTTP source additionally caps connections and request rate). A ticker's ranges are
+    saved together once all of them arrived; failed tickers are reported and retried next run.
+    """
+    start, end = _day(start), _day(end)
+    sem = asyncio.Semaphore(concurrency)
+    stats = {"fetched": 0, "rows": 0, "up_to_date": 0, "unknown": [], "failed": {}}
+
+    async def one(ticker: str):
+        gaps = history.missing(ticker, start, end)
+        if not gaps:
+            stats["up_to_date"] += 1
+            return
+        async with sem:
+            try:
+                frames = [await source.prices(ticker, lo, hi) for lo, hi in gaps]
+            except Exception as e:
+                stats["failed"][ticker] = repr(e)
+                return
+        if any(f is None for f in frames):
+            stats["unknown"].append(ticker)
+            return
+        rows = await asyncio.to_thread(history.write, ticker, frames)   # not `+= await`: that reads the total first
+        stats["rows"] += rows
+        history.mark(ticker, start, end)
+        stats["fetched"] += 1
+
+    await asyncio.gather(*(one(t) for t in tickers))
+    return stats
+
+
+def assemble(history: History, tickers: List[str], out_path: Path) -> int:
+    """
+    Write the wide `Date` x ticker price file step 02 reads, from the per-ticker files
+    (tickers in the given order; dates = union of all tickers' dates). Returns rows written.
+    """
+    frames = {t: history.load(t).set_index("Date")["price"] for t in tickers if history.path(t).exists()}
+    wide = pd.DataFrame(frames).sort_index() if frames else pd.DataFrame(columns=tickers)
+    wide.index.name = "Date"
+    tmp = out_path.with_name(out_path.name + ".tmp")
+    wide.to_csv(tmp, date_format="%Y-%m-%d")
+    os.replace(tmp, out_path)
+    return len(wide)
+
+
+async def _fetch_meta(source: str, dest: Path, pool: ConnectionPool, limiter: RateLimiter, retries: int, backoff_s: float):
+    if source.startswith(("http://", "https://")):
+        body = await HttpSource(source, pool, limiter, retries, backoff_s).get(source)
+        if body is None:
+            raise FileNotFoundError(f"Meta source {source} answered 404")
+        dest.write_bytes(body)
+    else:
+        shutil.copyfile(source.removeprefix("file://"), dest)
+
+
+def universe(cfg: dict, meta_path: Path) -> List[str]:
+    """`ingest.tickers`, or every `Symbol` of the meta file."""
+    tickers = cfg.get("ingest", {}).get("tickers")
+    if tickers:
+        return list(tickers)
+    return pd.read_csv(meta_path, usecols=["Symbol"])["Symbol"].dropna().astype(str).tolist()
+
+
+def ingest(cfg: dict) -> dict:
+    """
+    Bring `raw_dir` up to date from `ingest.source`:
+    - the meta file is fetched from `ingest.meta_source` when missing
+    - each ticker's missing date range within [start, end] is fetched concurrently into
+      `raw_dir/history/` (resumable checkpoints)
+    - the wide main file is rewritten when new rows arrived (or it is missing), so step 02's
+      cache only reruns after real updates
+    Returns the fetch statistics.
+    """
+    icfg = cfg["ingest"]
+    raw_dir = Path(cfg["paths"]["raw_dir"])
+    raw_dir.mkdir(parents=True, exist_ok=True)
+    meta_path = raw_dir / cfg["data"]["meta_file"]
+    main_path = raw_dir / cfg["data"]["main_file"]
+    start = icfg.get("start") or "2000-01-01"
+    end = icfg.get("end") or pd.Timestamp.today().normalize()
+    concurrency = int(icfg.get("concurrency", 32))
+    retries, backoff_s = int(icfg.get("retries", 4)), float(icfg.get("backoff_s", 0.5))
+
+    async def _run():
+        pool = ConnectionPool(concurrency, float(icfg.get("timeout_s", 30)))
+        limiter = RateLimiter(float(icfg.get("rate_per_s", 0)))
+        try:
+            if not meta_path.exists() and icfg.get("meta_source"):
+                await _fetch_meta(icfg["meta_source"], meta_path, pool, limiter, retries, backoff_s)
+            tickers = universe(cfg, meta_path)
+            src = icfg["source"]
+            if src.startswith(("http://", "https://")):
+                source = HttpSource(src, pool, limiter, retries, backoff_s)
+            else:
+                source = MirrorSource(src)
+            history = History(raw_dir / "history")
+            begin = time.perf_counter()
+            stats = await fetch_all(source, history, tickers, start, end, concurrency)
+            stats.update(
+                tickers=len(tickers), seconds=time.perf_counter() - begin,
+                requests=getattr(source, "requests", 0), retried=getattr(source, "retried", 0), connections=pool.opened,
+            )
+            history.compact()
+            if stats["rows"] or not main_path.exists():
+                stats["dates"] = assemble(history, tickers, main_path)
+            return stats
+        finally:
+            await pool.close()
+
+    return asyncio.run(_run())
@@ -0,0 +1,94 @@
+import argparse
+import random
+import socketserver
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+import pandas as pd
+
+
+def write_mirror(wide_csv: Path, out_dir: Path, date_col: str = "Date") -> int:
+    """Split a wide `Date` x ticker price file into `<ticker>.csv` files (`Date,price`). Returns tickers."""
+    wide = pd.read_csv(wide_csv, parse_dates=[date_col], index_col=date_col, float_precision="round_trip")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for t in wide.columns:
+        s = wide[t].dropna().rename("price")
+        s.index.name = "Date"
+        s.to_csv(out_dir / f"{quote(str(t), safe='')}.csv", date_format="%Y-%m-%d")
+    return len(wide.columns)
+
+
+def make_handler(directory: Path, meta: Path = None, fail_rate: float = 0.0, delay_ms: float = 0.0):
+    """
+    Offline stand-in for a market-data API, serving a directory of `<ticker>.csv` files:
+    - GET /prices/<ticker>?start=YYYY-MM-DD&end=YYYY-MM-DD  rows of that range (`Date,price`), 404 if unknown
+    - GET /meta  the meta file
+    `fail_rate` answers that share of requests with 503 and `delay_ms` adds latency, to exercise
+    retries and concurrency.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like a real API behind a pool
+        disable_nagle_algorithm = True
+
+        def _send(self, code: int, body: bytes, content_type: str = "text/csv"):
+            self.send_response(code)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if delay_ms:
+                time.sleep(delay_ms / 1e3)
+            if fail_rate and random.random() < fail_rate:
+                return self._send(503, b"unavailable", "text/plain")
+            url = urlsplit(self.path)
+            if url.path == "/meta" and meta is not None:
+                return self._send(200, meta.read_bytes())
+            if not url.path.startswith("/prices/"):
+                return self._send(404, b"not found", "text/plain")
+            path = directory / f"{quote(unquote(url.path[len('/prices/'):]), safe='')}.csv"
+            if not path.exists():
+                return self._send(404, b"unknown ticker", "text/plain")
+            q = {k: v[0] for k, v in parse_qs(url.query).items()}
+            lo, hi = q.get("start", ""), q.get("end", "9999")
+            # Rows are filtered as text (ISO dates sort as strings), so prices go out byte for byte
+            header, *rows = path.read_text().splitlines(keepends=True)
+            self._send(200, (header + "".join(r for r in rows if lo <= r[:10] <= hi)).encode())
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve per-ticker price files over HTTP (offline stand-in for step 01).")
+    parser.add_argument("--dir", required=True, help="directory of <ticker>.csv files (Date,price)")
+    parser.add_argument("--from-wide", help="first split this wide price file (e.g. data/raw/portfolio_data.csv) into --dir")
+    parser.add_argument("--meta", help="meta file served at /meta")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="added latency per request")
+    args = parser.parse_args(argv)
+
+    directory = Path(args.dir)
+    if args.from_wide:
+        print(f"[mirror] wrote {write_mirror(Path(args.from_wide), directory)} tickers to {directory}")
+    socketserver.TCPServer.allow_reuse_address = True
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(directory, Path(args.meta) if args.meta else None, args.fail_rate, args.delay_ms))
+    server.daemon_threads = True
+    print(f"[mirror] serving {directory} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import time
+import pandas as pd
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401 (enables HalvingGridSearchCV)
+from sklearn.model_selection import GridSearchCV, HalvingGridSearchCV, TimeSeriesSplit
+
+# Search spaces used when config.yaml `models.search.spaces` does not override them
+DEFAULT_SPACES = {
+    "DecisionTree": {"max_depth": [3, 5, 7, None], "min_samples_leaf": [1, 5, 10]},
+    "RandomForest": {
+        "n_estimators": [200, 400],
+        "max_depth": [None, 10, 20],
+        "min_samples_leaf": [1, 5],
+        "max_features": ["sqrt", "log2"],
+    },
+}
+
+# Budget per model in halving mode: trees for forests, training rows otherwise
+DEFAULT_RESOURCES = {"RandomForest": "n_estimators", "DecisionTree": "n_samples"}
+
+
+def make_search(name: str, estimator, search_cfg: dict):
+    """
+    Hyper-parameter search for one model, configured by `models.search`:
+    - mode "grid": exhaustive GridSearchCV (previous behaviour)
+    - mode "halving": successive halving; every round keeps the best 1/`factor` candidates
+      and gives them `factor` x more budget (`resource`: "n_estimators" or "n_samples")
+    - cv "kfold" (unshuffled K-fold) or "time" (TimeSeriesSplit); both expect rows in date
+      order, as step 04 passes them from the feature store
+    """
+    space = dict(search_cfg.get("spaces", {}).get(name, DEFAULT_SPACES[name]))
+    splits = search_cfg.get("cv_splits", 3)
+    cv = TimeSeriesSplit(n_splits=splits) if search_cfg.get("cv", "kfold") == "time" else splits
+
+    if search_cfg.get("mode", "grid") != "halving":
+        return GridSearchCV(estimator, space, scoring="roc_auc", cv=cv, n_jobs=-1)
+
+    resource = search_cfg.get("resources", {}).get(name, DEFAULT_RESOURCES.get(name, "n_samples"))
+    kwargs = {}
+    if resource != "n_samples":
+        # The budget parameter is scheduled by the search, so it leaves the grid
+        budget = space.pop(resource, None) or [getattr(estimator, resource)]
+        kwargs = {"max_resources": max(budget), "min_resources": search_cfg.get("min_resources", {}).get(name, min(budget))}
+    return HalvingGridSearchCV(
+        estimator, space, factor=search_cfg.get("factor", 3), resource=resource,
+        scoring="roc_auc", cv=cv, n_jobs=-1, random_state=42, **kwargs,
+    )
+
+
+def timed_fit(search, X, y):
+    """Fit a search and return its wall time in seconds."""
+    start = time.perf_counter()
+    search.fit(X, y)
+    return time.perf_counter() - start
+
+
+def search_report(name: str, search, wall_time: float) -> pd.DataFrame:
+    """One row per evaluated candidate: params, budget, fit time and CV AUC."""
+    res = pd.DataFrame(search.cv_results_)
+    out = pd.DataFrame({
+        "model": name,
+        "params": res["params"].astype(str),
+        "round": res.get("iter", 0),
+        "n_resources": res.get("n_resources", pd.NA),
+        "mean_fit_time": res["mean_fit_time"],
+        "cv_auc": res["mean_test_score"],
+    })
+    out["is_best"] = out.index == search.best_index_
+    out["search_wall_time"] = wall_time
+    return out
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import shutil
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+from src.utils_io import artifact_path, artifact_schema, feature_columns, iter_artifact
+
+STORE_VERSION = 2
+
+
+def store_dir(cfg: dict) -> Path:
+    return Path(cfg["paths"]["processed_dir"]) / "feature_store"
+
+
+def _fingerprint(cfg: dict) -> str:
+    """Size and mtime of every file of `dataset_features` (cheap; changes whenever it is rewritten)."""
+    path = artifact_path(cfg, "dataset_features")
+    files = [path] if path.is_file() else sorted(p for p in path.rglob("*") if p.is_file())
+    stats = [(str(p.relative_to(path.parent)), p.stat().st_size, p.stat().st_mtime_ns) for p in files]
+    return hashlib.sha256(json.dumps(stats).encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class FeatureStore:
+    """
+    Model-ready view of `dataset_features`, memory-mapped read-only from `path`.
+    - X: (rows, features) float32, C-order; y: int8 `target_up`
+    - rows are sorted by (date, ticker), so any date range is a contiguous slice and a
+      zero-copy view of the file, and the matrix does not depend on the order the artifact was
+      written in (full, chunked, sharded or incremental builds give the same store)
+    - dates / ticker (int32 codes into `tickers`) index the rows; `row` is each row's position
+      in the `iter_artifact` stream of `dataset_features`, to put results back in artifact order
+    Worker processes open the same files (or receive the memmaps from joblib by reference),
+    so the matrix is in memory once, shared through the page cache.
+    """
+    path: Path
+    feature_cols: List[str]
+    X: np.ndarray
+    y: np.ndarray
+    dates: np.ndarray
+    ticker: np.ndarray
+    tickers: np.ndarray
+    row: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.y)
+
+    def date_slice(self, after: Optional[str] = None, until: Optional[str] = None) -> slice:
+        """Rows with `after` < date <= `until` (either bound optional)."""
+        lo = 0 if after is None else int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(after)), side="right"))
+        hi = len(self) if until is None else int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(until)), side="right"))
+        return slice(lo, max(lo, hi))
+
+    def frame(self, rows: slice = slice(None)) -> pd.DataFrame:
+        """Zero-copy DataFrame over `X[rows]` (feature names are kept for the models)."""
+        return pd.DataFrame(self.X[rows], columns=self.feature_cols, copy=False)
+
+    @cached_property
+    def position(self) -> np.ndarray:
+        """Inverse of `row`: the store row of every artifact row."""
+        out = np.empty(len(self), dtype=np.int64)
+        out[self.row] = np.arange(len(self))
+        return out
+
+    def to_artifact_order(self, values: np.ndarray) -> np.ndarray:
+        """Per-row `values` (store order) reordered to the `dataset_features` stream order."""
+        return np.asarray(values)[self.position]
+
+
+def _open(path: Path) -> FeatureStore:
+    meta = json.loads((path / "meta.json").read_text())
+    load = lambda name: np.load(path / f"{name}.npy", mmap_mode="r")
+    return FeatureStore(
+        path=path, feature_cols=meta["feature_cols"], X=load("X"), y=load("y"),
+        dates=load("date"), ticker=load("ticker"), tickers=np.asarray(meta["tickers"], dtype=object), row=load("row"),
+    )
+
+
+def build_store(cfg: dict, batch_rows: int = 100_000) -> FeatureStore:
+    """
+    Stream `dataset_features` once into `<processed_dir>/feature_store/`.
+    - pass 1 appends each chunk's float32 features to a raw file and keeps dates, labels and
+      ticker codes (13 bytes per row)
+    - pass 2 writes the (date, ticker)-sorted matrix block by block from the memory-mapped raw file
+    Peak memory is one chunk plus the per-row index arrays, whatever the dataset size.
+    """
+    date_col = cfg["data"]["date_col"]
+    feature_cols = feature_columns(artifact_schema(cfg, "dataset_features"), date_col)
+    path = store_dir(cfg)
+    tmp = path.with_name(path.name + ".tmp")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    tmp.mkdir(parents=True)
+    fingerprint = _fingerprint(cfg)
+
+    dates, labels, codes, tickers = [], [], [], {}
+    with open(tmp / "X.raw", "wb") as raw:
+        for chunk in iter_artifact(cfg, "dataset_features", columns=[date_col, "ticker", "target_up"] + feature_cols, batch_rows=batch_rows):
+            raw.write(np.ascontiguousarray(chunk[feature_cols].to_numpy(dtype=np.float32)).tobytes())
+            dates.append(pd.to_datetime(chunk[date_col]).to_numpy(dtype="datetime64[ns]"))
+            labels.append(chunk["target_up"].to_numpy(dtype=np.int8))
+            uniq, inv = np.unique(chunk["ticker"].astype(str).to_numpy(), return_inverse=True)
+            ids = np.array([tickers.setdefault(t, len(tickers)) for t in uniq], dtype=np.int32)
+            codes.append(ids[inv] if len(uniq) else np.empty(0, dtype=np.int32))
+
+    dates = np.concatenate(dates) if dates else np.empty(0, dtype="datetime64[ns]")
+    # Ticker codes follow first appearance; sort on the ticker names' alphabetical rank instead
+    names = np.array(list(tickers), dtype=object)
+    rank = np.empty(len(names), dtype=np.int64)
+    rank[np.argsort(names)] = np.arange(len(names))
+    order = np.lexsort((rank[np.concatenate(codes)] if codes else np.empty(0, np.int64), dates))
+    n, k = len(order), len(feature_cols)
+    raw = np.memmap(tmp / "X.raw", dtype=np.float32, mode="r", shape=(n, k)) if n else np.empty((0, k), np.float32)
+    X = np.lib.format.open_memmap(tmp / "X.npy", mode="w+", dtype=np.float32, shape=(n, k))
+    for lo in range(0, n, batch_rows):
+        X[lo:lo + batch_rows] = raw[order[lo:lo + batch_rows]]
+    X.flush()
+    del X, raw
+    (tmp / "X.raw").unlink()
+
+    np.save(tmp / "y.npy", (np.concatenate(labels) if labels else np.empty(0, np.int8))[order])
+    np.save(tmp / "date.npy", dates[order])
+    np.save(tmp / "ticker.npy", (np.concatenate(codes) if codes else np.empty(0, np.int32))[order])
+    np.save(tmp / "row.npy", order.astype(np.int64))
+    (tmp / "meta.json").write_text(json.dumps({
+        "version": STORE_VERSION, "source": fingerprint, "rows": n,
+        "feature_cols": feature_cols, "tickers": list(tickers),
+    }))
+
+    if path.exists():
+        shutil.rmtree(path)
+    tmp.rename(path)
+    return _open(path)
+
+
+def open_store(cfg: dict, batch_rows: int = 100_000) -> FeatureStore:
+    """The feature store of the current `dataset_features`, (re)built when missing or stale."""
+    path = store_dir(cfg)
+    meta = path / "meta.json"
+    if meta.exists():
+        info = json.loads(meta.read_text())
+        if info.get("version") == STORE_VERSION and info.get("source") == _fingerprint(cfg):
+            return _open(path)
+    return build_store(cfg, batch_rows)
@@ -0,0 +1,165 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+from src.models.store import FeatureStore
+
+try:
+    from xgboost import XGBClassifier
+    HAS_XGB = True
+except Exception:
+    HAS_XGB = False
+
+MODEL_CLASSES = {"DecisionTree": DecisionTreeClassifier, "RandomForest": RandomForestClassifier}
+if HAS_XGB:
+    MODEL_CLASSES["XGBClassifier"] = XGBClassifier
+
+# Models that can continue from the previous fold instead of refitting from scratch
+WARM_STARTABLE = {"RandomForest", "XGBClassifier"}
+
+
+def fold_schedule(
+    dates: np.ndarray,
+    start: str,
+    refit: str = "MS",
+    window: str = "expanding",
+    window_months: int = 36,
+    min_train_rows: int = 1,
+) -> List[dict]:
+    """
+    Rolling-origin folds over rows sorted by date.
+    - test periods: consecutive `refit` periods (pandas offset, "MS" = monthly) from `start`
+    - train rows: everything before the test period (expanding) or the last `window_months`
+    Each fold holds row bounds: train [lo, hi), test [hi, end). Folds with fewer than
+    `min_train_rows` training rows are dropped.
+    """
+    dates = np.asarray(dates, dtype="datetime64[ns]")
+    if not len(dates):
+        return []
+    edges = pd.date_range(pd.Timestamp(start), pd.Timestamp(dates[-1]), freq=refit)
+    edges = [pd.Timestamp(start)] + [e for e in edges if e > pd.Timestamp(start)]
+    bounds = np.searchsorted(dates, np.array(edges, dtype="datetime64[ns]"), side="left")
+    bounds = np.r_[bounds, len(dates)]
+
+    folds = []
+    for k, test_start in enumerate(edges):
+        hi, end = int(bounds[k]), int(bounds[k + 1])
+        if end <= hi:
+            continue
+        lo = 0
+        if window == "rolling":
+            lo = int(np.searchsorted(dates, np.datetime64(test_start - pd.DateOffset(months=window_months)), side="left"))
+        if hi - lo < min_train_rows:
+            continue
+        folds.append({"fold": len(folds), "test_start": test_start, "lo": lo, "hi": hi, "end": end})
+    return folds
+
+
+def _make_model(name: str, params: dict):
+    kwargs = {"random_state": 42, "n_jobs": 1} if name != "DecisionTree" else {"random_state": 42}
+    if name == "XGBClassifier":
+        kwargs["eval_metric"] = "logloss"
+    return MODEL_CLASSES[name](**{**kwargs, **(params or {})})
+
+
+def _run_folds(name: str, params: dict, folds: List[dict], store_dir: str, warm_trees: int) -> List[dict]:
+    """
+    Fit/predict a chain of folds in one worker. Features are memory-mapped from the feature
+    store at `store_dir`, so every fold (and every worker) slices the same on-disk matrix
+    without copying it.
+    With `warm_trees` > 0, RandomForest adds that many trees per fold to the previous forest and
+    XGBoost continues boosting from the previous booster.
+    """
+    X = np.load(Path(store_dir) / "X.npy", mmap_mode="r")
+    y = np.load(Path(store_dir) / "y.npy", mmap_mode="r")
+    out, model = [], None
+    for f in folds:
+        X_train, y_train = X[f["lo"]:f["hi"]], y[f["lo"]:f["hi"]]
+        if model is not None and warm_trees and name == "RandomForest":
+            model.set_params(n_estimators=model.n_estimators + warm_trees)
+            model.fit(X_train, y_train)
+        elif model is not None and warm_trees and name == "XGBClassifier":
+            model.set_params(n_estimators=warm_trees)
+            model.fit(X_train, y_train, xgb_model=model.get_booster())
+        else:
+            model = _make_model(name, params)
+            if warm_trees and name == "RandomForest":
+                model.set_params(warm_start=True)
+            model.fit(X_train, y_train)
+        proba = model.predict_proba(X[f["hi"]:f["end"]])[:, 1]
+        out.append({**f, "model": name, "proba": proba})
+    return out
+
+
+def walk_forward(
+    df: pd.DataFrame,
+    store: FeatureStore,
+    date_col: str,
+    wf_cfg: dict,
+):
+    """
+    Walk-forward training and out-of-sample prediction.
+    - features and labels come from `store` (float32, rows sorted by date), which workers
+      memory-map instead of receiving pickled frames; `df` is `dataset_features` as read by
+      `read_artifact` and only supplies the output columns
+    - folds run in a process pool; models in WARM_STARTABLE with `warm_start_trees` > 0 run as one
+      sequential chain per model (each fold continues from the previous one)
+    Returns (predictions, folds):
+    - predictions: the rows of `df` covered by a test period, sorted by date, with one
+      `pred_<model>` column of stitched out-of-sample probabilities per model
+    - folds: one row per (model, fold) with train/test sizes and AUC
+    """
+    if len(df) != len(store):
+        raise ValueError(f"Feature store has {len(store)} rows, dataset_features {len(df)}; rebuild the store")
+    df = df.iloc[store.row].reset_index(drop=True)
+    if not np.array_equal(pd.to_datetime(df[date_col]).to_numpy(dtype="datetime64[ns]"), store.dates):
+        raise ValueError("Feature store rows are not aligned with dataset_features; rebuild the store")
+    folds = fold_schedule(
+        store.dates,
+        start=wf_cfg["start"],
+        refit=wf_cfg.get("refit", "MS"),
+        window=wf_cfg.get("window", "expanding"),
+        window_months=wf_cfg.get("window_months", 36),
+        min_train_rows=wf_cfg.get("min_train_rows", 1),
+    )
+    if not folds:
+        raise ValueError(f"No walk-forward folds: no rows on or after {wf_cfg['start']}")
+
+    models: Dict[str, dict] = {
+        name: params for name, params in wf_cfg.get("models", {"RandomForest": {}}).items()
+        if name in MODEL_CLASSES
+    }
+    warm_trees = int(wf_cfg.get("warm_start_trees", 0))
+    workers = wf_cfg.get("workers", 0) or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for name, params in models.items():
+            if warm_trees and name in WARM_STARTABLE:
+                futures.append(pool.submit(_run_folds, name, params, folds, str(store.path), warm_trees))
+            else:
+                futures += [pool.submit(_run_folds, name, params, [f], str(store.path), 0) for f in folds]
+        results = [r for fut in futures for r in fut.result()]
+
+    first, last = folds[0]["hi"], folds[-1]["end"]
+    preds = df.iloc[first:last].copy()
+    rows = []
+    for name in models:
+        proba = np.full(last - first, np.nan)
+        for r in (r for r in results if r["model"] == name):
+            proba[r["hi"] - first:r["end"] - first] = r["proba"]
+            y_test = store.y[r["hi"]:r["end"]]
+            rows.append({
+                "model": name, "fold": r["fold"], "test_start": r["test_start"].date(),
+                "train_rows": r["hi"] - r["lo"], "test_rows": r["end"] - r["hi"],
+                "auc": roc_auc_score(y_test, r["proba"]) if len(np.unique(y_test)) > 1 else float("nan"),
+            })
+        preds[f"pred_{name}"] = proba
+    # Skipped folds (too little history) leave rows without any prediction
+    preds = preds.dropna(subset=[f"pred_{m}" for m in models], how="all").reset_index(drop=True)
+    return preds, pd.DataFrame(rows).sort_values(["model", "fold"]).reset_index(drop=True)
@@ -0,0 +1,141 @@
+import ast
+import hashlib
+import importlib.machinery
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+def _sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _digest(obj) -> str:
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def config_subset(cfg: dict, keys: Iterable[str]) -> dict:
+    """Pick dotted keys (e.g. "data.date_col", "simulation") out of the config; missing keys map to None."""
+    out = {}
+    for key in keys:
+        node = cfg
+        for part in key.split("."):
+            node = node.get(part) if isinstance(node, dict) else None
+        out[key] = node
+    return out
+
+
+def _module_file(name: str) -> Optional[Path]:
+    """
+    Source file of module `name`, located without importing anything (`importlib.util.find_spec`
+    imports the parent package, which would load a step's dependencies just to check the cache).
+    `pkg.mod.attr` (an attribute, not a submodule) gives None.
+    """
+    spec, search = None, None
+    parts = name.split(".")
+    for i in range(len(parts)):
+        if i and search is None:
+            return None
+        try:
+            spec = importlib.machinery.PathFinder.find_spec(".".join(parts[:i + 1]), search)
+        except (ImportError, ValueError):
+            return None
+        if spec is None:
+            return None
+        search = spec.submodule_search_locations
+    return Path(spec.origin) if spec.origin and spec.origin.endswith(".py") else None
+
+
+def plugin_modules(names: Iterable[str]) -> List[str]:
+    """Modules of `package.module:function` entries (e.g. strategy plug-ins in `simulation.strategies`)."""
+    return list(dict.fromkeys(n.split(":", 1)[0] for n in names if ":" in n))
+
+
+def code_digest(module: str, package: str = "src", plugins: Iterable[str] = ()) -> str:
+    """
+    Hash of a module's source and every `package.*` module it imports (transitively).
+    `plugins` (modules outside `package`, loaded by name at run time) are hashed the same way,
+    each following the imports of its own top-level package.
+    Third-party code is not tracked: bump requirements and clear the cache if that matters.
+    """
+    seen: Dict[str, str] = {}
+    todo = [(module, package)] + [(p, p.split(".")[0]) for p in plugins]
+    while todo:
+        name, package = todo.pop()
+        if name in seen:
+            continue
+        path = _module_file(name)
+        if path is None:
+            continue
+        source = path.read_bytes()
+        seen[name] = hashlib.sha256(source).hexdigest()
+        for node in ast.walk(ast.parse(source)):
+            if isinstance(node, ast.Import):
+                names = [a.name for a in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                # `from pkg import mod` may import a submodule; unknown names are ignored
+                names = [node.module] + [f"{node.module}.{a.name}" for a in node.names]
+            else:
+                continue
+            todo += [(n, package) for n in names if n == package or n.startswith(package + ".")]
+    return _digest(seen)
+
+
+class StepCache:
+    """
+    Content-addressed record of completed pipeline steps, stored as JSON.
+    - key: hash of the step's code version, config subsection and input fingerprints
+    - a step is fresh when its key is unchanged and its outputs still match what it wrote
+    - file hashes are memoized by (size, mtime) so unchanged artifacts are not re-read
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        data = json.loads(self.path.read_text()) if self.path.exists() else {}
+        self.steps: Dict[str, dict] = data.get("steps", {})
+        self.files: Dict[str, list] = data.get("files", {})
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.files = {p: v for p, v in self.files.items() if Path(p).exists()}
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"steps": self.steps, "files": self.files}, indent=1, sort_keys=True))
+        tmp.replace(self.path)
+
+    def _file(self, path: Path) -> str:
+        st = path.stat()
+        memo = self.files.get(str(path))
+        if memo and memo[0] == st.st_size and memo[1] == st.st_mtime_ns:
+            return memo[2]
+        sha = _sha256_file(path)
+        self.files[str(path)] = [st.st_size, st.st_mtime_ns, sha]
+        return sha
+
+    def fingerprint(self, path) -> Optional[str]:
+        """Content hash of a file or a directory (e.g. a parquet dataset); None if missing."""
+        path = Path(path)
+        if path.is_file():
+            return self._file(path)
+        if path.is_dir():
+            # Partition folder + content, not file names: parquet part files get random names
+            files = [p for p in path.rglob("*") if p.is_file()]
+            return _digest(sorted([str(p.parent.relative_to(path)), self._file(p)] for p in files))
+        return None
+
+    def fingerprints(self, paths: Iterable) -> Dict[str, Optional[str]]:
+        return {str(p): self.fingerprint(p) for p in paths}
+
+    def key(self, code: str, config: dict, inputs: List) -> str:
+        return _digest({"code": code, "config": config, "inputs": self.fingerprints(inputs)})
+
+    def is_fresh(self, step: str, key: str, outputs: List) -> bool:
+        rec = self.steps.get(step)
+        return bool(rec) and rec["key"] == key and rec["outputs"] == self.fingerprints(outputs)
+
+    def record(self, step: str, key: str, outputs: List):
+        self.steps[step] = {"key": key, "outputs": self.fingerprints(outputs)}
+        self.save()
@@ -1,16 +1,90 @@
 import argparse
+import importlib
+import time
+from contextlib import nullcontext
 from pathlib import Path
 import yaml
 
-from src.pipeline.step_01_download import run as step01
-from src.pipeline.step_02_unify_dataset import run as step02
-from src.pipeline.step_03_feature_engineering import run as step03
-from src.pipeline.step_04_train import run as step04
-from src.pipeline.step_05_predict import run as step05
-from src.pipeline.step_06_simulate import run as step06
+from src.pipeline.cache import StepCache, code_digest, config_subset, plugin_modules
+from src.utils_io import MODEL_NAMES, artifact_path
+from src.utils_profile import format_report, previous_run, profiling, regression_report, span
 
+# Step modules are imported only when the step runs (step 04 alone pulls in scikit-learn/xgboost)
+STEP_MODULES = {
+    1: "src.pipeline.step_01_download",
+    2: "src.pipeline.step_02_unify_dataset",
+    3: "src.pipeline.step_03_feature_engineering",
+    4: "src.pipeline.step_04_train",
+    5: "src.pipeline.step_05_predict",
+    6: "src.pipeline.step_06_simulate",
+}
 
-def main(cfg_path: str):
+
+def load_step(n: int):
+    """`run(cfg)` of step `n`, importing its module (and dependencies) on first use."""
+    return importlib.import_module(STEP_MODULES[n]).run
+
+
+def pipeline_steps(cfg: dict) -> list:
+    """
+    Step table: what each step reads, writes and which config subsections it depends on.
+    `plugins` are modules outside `src` the step loads by name (step 06's strategy plug-ins);
+    their code is part of the cache key. Step 01 only validates raw files and is never cached.
+    `run` imports the step lazily.
+    """
+    raw_dir = Path(cfg["paths"]["raw_dir"])
+    processed_dir = Path(cfg["paths"]["processed_dir"])
+    backtests_dir = Path(cfg["paths"]["backtests_dir"])
+    unified = artifact_path(cfg, "unified_long")
+    features = artifact_path(cfg, "dataset_features")
+    predictions = artifact_path(cfg, "predictions")
+    models = [processed_dir / f"{m}.joblib" for m in MODEL_NAMES]
+    train_outputs = models + [Path(cfg["paths"]["reports_dir"]) / "search_report.csv"]
+    if cfg["models"].get("walk_forward", {}).get("enabled"):
+        # Walk-forward: step 04 writes the out-of-sample predictions itself
+        models = [predictions, Path(cfg["paths"]["reports_dir"]) / "walk_forward_folds.csv"]
+        train_outputs = models
+
+    def step(n, config=None, inputs=(), outputs=(), plugins=()):
+        return {
+            "n": n, "name": f"step_{n:02d}", "run": lambda cfg: load_step(n)(cfg), "module": STEP_MODULES[n],
+            "cached": config is not None, "config": config or [],
+            "inputs": list(inputs), "outputs": list(outputs), "plugins": list(plugins),
+        }
+
+    return [
+        step(1),
+        step(2, ["data", "storage"],
+             [raw_dir / cfg["data"]["main_file"], raw_dir / cfg["data"]["meta_file"]], [unified]),
+        step(3, ["data.date_col", "features", "storage"],
+             [unified], [features, processed_dir / "feature_state.joblib"]),
+        step(4, ["data.date_col", "split", "models", "storage"], [features], train_outputs),
+        step(5, ["data.date_col", "storage", "predict", "models.walk_forward.enabled"], [features] + models, [predictions]),
+        step(6, ["data.date_col", "simulation", "storage"],
+             [predictions], [backtests_dir / f for f in ("summary.csv", "sweep.csv", "bootstrap.csv", "rolling.csv")],
+             plugins=plugin_modules(cfg["simulation"].get("strategies", []))),
+    ]
+
+
+def _write_profile(prof, cfg: dict, cfg_path: str):
+    """Write the run's profile next to earlier ones and report regressions against the latest."""
+    prof_cfg = cfg.get("profiling", {})
+    profile_dir = Path(prof_cfg.get("dir") or Path(cfg["paths"]["reports_dir"]) / "profiles")
+    run_dir = prof.write(profile_dir / time.strftime("%Y%m%d-%H%M%S", time.localtime(prof.started)), {"config": cfg_path})
+    print(f"[run_all] Profile written to {run_dir} (profile.jsonl, trace.json)")
+
+    baseline = previous_run(profile_dir, run_dir)
+    if baseline is None:
+        return
+    report = regression_report(run_dir, baseline, prof_cfg.get("threshold", 0.10), prof_cfg.get("min_seconds", 0.05))
+    print(f"[run_all] Compared with {baseline.name}: {int(report['regression'].sum())} regression(s)")
+    print(format_report(report))
+
+
+def main(
+    cfg_path: str, from_step: int = 1, only: list = None, force: bool = False,
+    profile: bool = False, sample_ms: float = None,
+):
     with open(cfg_path, "r") as f:
         cfg = yaml.safe_load(f)
 
@@ -20,16 +94,41 @@ def main(cfg_path: str):
     Path(cfg["paths"]["figures_dir"]).mkdir(parents=True, exist_ok=True)
     Path(cfg["paths"]["backtests_dir"]).mkdir(parents=True, exist_ok=True)
 
-    step01(cfg)
-    step02(cfg)
-    step03(cfg)
-    step04(cfg)
-    step05(cfg)
-    step06(cfg)
+    cache_cfg = cfg.get("cache", {})
+    cache_path = cache_cfg.get("path") or Path(cfg["paths"]["interim_dir"]) / "pipeline_cache.json"
+    cache = StepCache(cache_path) if cache_cfg.get("enabled", True) else None
+
+    if sample_ms is None:
+        sample_ms = cfg.get("profiling", {}).get("sample_ms", 0)
+    with profiling(sample_ms) if profile else nullcontext() as prof:
+        for s in pipeline_steps(cfg):
+            if (only and s["n"] not in only) or s["n"] < from_step:
+                continue
+            if not s["cached"] or cache is None:
+                with span(s["name"]):
+                    s["run"](cfg)
+                continue
+
+            # Key = code version + config subsection + content of the upstream artifacts
+            key = cache.key(code_digest(s["module"], plugins=s["plugins"]), config_subset(cfg, s["config"]), s["inputs"])
+            if not force and cache.is_fresh(s["name"], key, s["outputs"]):
+                print(f"[run_all] {s['name']} is up to date; skipped.")
+                continue
+            with span(s["name"]):
+                s["run"](cfg)
+            cache.record(s["name"], key, s["outputs"])
+
+    if profile:
+        _write_profile(prof, cfg, cfg_path)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument("--from-step", type=int, default=1, help="skip steps before this one (1-6)")
+    parser.add_argument("--only", type=int, nargs="+", help="run only these steps, e.g. --only 4 5")
+    parser.add_argument("--force", action="store_true", help="ignore the step cache for selected steps")
+    parser.add_argument("--profile", action="store_true", help="record spans/RSS to reports/profiles/<run>/ and compare with the last run")
+    parser.add_argument("--profile-sample-ms", type=float, help="also sample Python stacks every N ms (overrides profiling.sample_ms)")
     args = parser.parse_args()
-    main(args.config)
+    main(args.config, args.from_step, args.only, args.force, args.profile, args.profile_sample_ms)
@@ -1,12 +1,27 @@
 from pathlib import Path
+from src.utils_profile import span
 
 def run(cfg: dict):
     raw_dir = Path(cfg["paths"]["raw_dir"])
+    ingest_cfg = cfg.get("ingest", {})
+    if ingest_cfg.get("enabled"):
+        # Concurrent per-ticker fetch of missing date ranges (see src/ingest/fetch.py)
+        from src.ingest.fetch import ingest
+
+        with span("ingest") as sp:
+            stats = ingest(cfg)
+            sp["rows"] = stats["rows"]
+        print(
+            f"[step_01] {stats['fetched']} tickers updated (+{stats['rows']} rows), {stats['up_to_date']} up to date, "
+            f"{len(stats['unknown'])} unknown, {len(stats['failed'])} failed; {stats['requests']} requests "
+            f"({stats['retried']} retried) on {stats['connections']} connections in {stats['seconds']:.1f}s."
+        )
+        if stats["failed"]:
+            print(f"[step_01] Failed (retried next run): {', '.join(sorted(stats['failed'])[:20])}")
     assert (
         raw_dir / cfg["data"]["main_file"]
     ).exists(), "Missing portfolio_data.csv in data/raw/"
     assert (
         raw_dir / cfg["data"]["meta_file"]
     ).exists(), "Missing symbols_valid_meta.csv in data/raw/"
-    # In offline mode, we just validate presence. For online mode, implement API download here.
     print("[step_01] Raw files are present.")
@@ -1,5 +1,9 @@
 import pandas as pd
 from pathlib import Path
+from typing import Optional
+from src.utils_io import META_COLS, write_artifact
+from src.utils_panel import CompactPanel
+from src.utils_profile import span
 
 
 def wide_to_long(df: pd.DataFrame, date_col: str) -> pd.DataFrame:
@@ -13,23 +17,74 @@ def add_calendar_features(df: pd.DataFrame, date_col: str) -> pd.DataFrame:
     return df
 
 
+def meta_lookup(path: Path) -> pd.DataFrame:
+    """ticker -> meta columns, one row per ticker (first listing wins)."""
+    meta = pd.read_csv(path, usecols=["Symbol"] + META_COLS)
+    return meta.drop_duplicates("Symbol").set_index("Symbol")
+
+
+def stream_unify(cfg: dict, chunk_rows: Optional[int] = None, chunk_cells: int = 1_000_000) -> int:
+    """
+    Streaming variant of `run` for wide files with many tickers.
+    - reads `chunk_rows` dates at a time, melts and tags them, appends them to `unified_long`
+      as numbered parts (read back in file order)
+    - chunk_rows None: as many dates as fit in `chunk_cells` price cells (at least one), so a
+      chunk holds about `chunk_cells` cells whatever the number of tickers
+    - meta columns come from a ticker -> meta lookup built once (no merge of the long frame)
+    Peak memory is one chunk (dates per chunk x tickers cells), independent of the file length.
+    Rows come out date-chunk by date-chunk instead of ticker by ticker; steps sort by (ticker, date).
+    """
+    raw_dir = Path(cfg["paths"]["raw_dir"])
+    date_col = cfg["data"]["date_col"]
+    main_path = raw_dir / cfg["data"]["main_file"]
+
+    try:
+        lookup = meta_lookup(raw_dir / cfg["data"]["meta_file"])
+    except Exception as e:
+        lookup = None
+        print(f"[step_02] Meta merge skipped: {e}")
+
+    # Prices as float64 in every chunk, so chunk-wise dtype inference cannot disagree
+    tickers = [c for c in pd.read_csv(main_path, nrows=0).columns if c != date_col]
+    chunk_rows = chunk_rows or max(1, chunk_cells // max(len(tickers), 1))
+    reader = pd.read_csv(main_path, chunksize=chunk_rows, dtype={t: "float64" for t in tickers})
+
+    n_rows = 0
+    for i, chunk in enumerate(reader):
+        with span("chunk", rows=chunk.size):
+            df_long = add_calendar_features(wide_to_long(chunk, date_col), date_col)
+            if lookup is not None:
+                for c in META_COLS:
+                    df_long[c] = df_long["ticker"].map(lookup[c])
+            write_artifact(df_long, cfg, "unified_long", append=i > 0, part=i)
+        n_rows += len(df_long)
+    return n_rows
+
+
 def run(cfg: dict):
     raw_dir = Path(cfg["paths"]["raw_dir"])
-    interim_dir = Path(cfg["paths"]["interim_dir"])
 
-    df = pd.read_csv(raw_dir / cfg["data"]["main_file"])
-    df_long = wide_to_long(df, cfg["data"]["date_col"])
-    df_long = add_calendar_features(df_long, cfg["data"]["date_col"])
+    streaming = cfg["data"].get("streaming", {})
+    if streaming.get("enabled"):
+        n_rows = stream_unify(cfg, streaming.get("chunk_rows"), streaming.get("chunk_cells", 1_000_000))
+        print(f"[step_02] Streamed {n_rows} rows to unified_long.")
+        return
 
-    # Optional: merge meta for non-crypto tickers if available
+    # Optional: meta for non-crypto tickers if available (one row per ticker)
     try:
-        meta = pd.read_csv(raw_dir / cfg["data"]["meta_file"])
-        meta = meta.rename(columns={"Symbol": "ticker"})
-        df_long = df_long.merge(
-            meta[["ticker", "Listing Exchange", "ETF"]], on="ticker", how="left"
-        )
+        lookup = meta_lookup(raw_dir / cfg["data"]["meta_file"])
     except Exception as e:
+        lookup = None
         print(f"[step_02] Meta merge skipped: {e}")
 
-    df_long.to_csv(interim_dir / "unified_long.csv", index=False)
-    print("[step_02] Saved unified_long.csv")
+    # Compact long panel straight from the wide matrix (no melt, strings stored once per ticker)
+    with span("read_csv"):
+        df = pd.read_csv(raw_dir / cfg["data"]["main_file"])
+    with span("reshape", rows=df.size):
+        panel = CompactPanel.from_wide(df, cfg["data"]["date_col"], meta=lookup)
+    del df
+    print(f"[step_02] {len(panel)} rows x {len(panel.columns)} columns in {panel.nbytes / 1e6:.1f} MB")
+
+    with span("write", rows=len(panel)):
+        path = write_artifact(panel.to_frame(), cfg, "unified_long")
+    print(f"[step_02] Saved {path.name}")
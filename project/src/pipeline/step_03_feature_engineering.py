@@ -1,33 +1,187 @@
+import numpy as np
 import pandas as pd
+import joblib
+from functools import partial
 from pathlib import Path
-from src.features.basic import add_basic_features
-from src.features.technical import add_technical_features
+from typing import List, Optional
+from src.features.cross_section import (
+    add_cross_section_features,
+    cross_section_names,
+    cross_section_rows,
+    with_cross_section,
+)
+from src.features.engine import _feature_columns
+from src.features.incremental import init_state, new_rows, extend
+from src.features.registry import listed_features, select, warmup
+from src.features.sharded import run_sharded
+from src.utils_io import artifact_exists, feature_columns, next_part, read_artifact, write_artifact
+from src.utils_panel import CompactPanel
+from src.utils_profile import span
+
+
+def _finalize(df: pd.DataFrame, date_col: str):
+    df["target_up"] = (df["target_return_1d"] > 0).astype(int)
+
+    # Select feature columns explicitly (exclude leakage, identifiers & meta)
+    # rolling extrema can have long warmups; keep but we'll drop NaNs
+    feature_cols = feature_columns(df.dtypes, date_col)
+
+    # Drop rows with any NaNs in used features or target
+    df = df.dropna(subset=feature_cols + ["target_return_1d", "target_up"]).reset_index(drop=True)
+    return df, feature_cols
+
+
+def build_panel_dataset(
+    df: pd.DataFrame, date_col: str, feature_dtype=np.float64, chunk_rows: int = 1 << 18, cross_section: Optional[dict] = None,
+    features: Optional[List[str]] = None,
+):
+    """
+    Full recompute on a `CompactPanel`: features for every row, next-day target, warm-up and NaN rows dropped.
+    - features: registered features to compute (default: all); only they and the graph nodes
+      they depend on are evaluated, and each ticker's first `warmup(features)` rows are trimmed
+    - features are computed for whole tickers `chunk_rows` rows at a time and written into one
+      preallocated `feature_dtype` block, so float64 temporaries exist for one chunk only
+    - cross_section: `features.cross_section` config; when enabled (and `df` does not carry the
+      `cs_*` columns already), per-date features over the whole universe are added first
+    Returns (panel, feature_cols).
+    """
+    names = select(features)
+    trim = max((warmup(c) for c in names), default=0)
+    with span("encode", rows=len(df)):
+        panel = CompactPanel.from_frame(df, date_col, feature_dtype=feature_dtype)
+    if (cross_section or {}).get("enabled") and not set(cross_section_names()) <= set(panel.columns):
+        with span("cross_section", rows=len(panel)):
+            panel = with_cross_section(panel, cross_section.get("group_by"))
+    price = panel.column("price")
+    out = None
+    for lo, hi in panel.ticker_chunks(chunk_rows):
+        starts, lengths, pos = panel.layout(lo, hi)
+
+        # Feature engineering (feature graph; same values as add_basic/add_technical_features)
+        with span("features", rows=hi - lo), np.errstate(divide="ignore", invalid="ignore"):
+            cols = _feature_columns(price[lo:hi], starts, lengths, pos, features=names, extra=["ret_1d"])
+
+        # Define target: next-day return of price (per ticker). Chunks end on a ticker boundary
+        # and every ticker's first return is NaN, so shifting the chunk is enough
+        ret = cols["ret_1d"] if "ret_1d" in names else cols.pop("ret_1d")
+        target = np.full(hi - lo, np.nan)
+        target[:-1] = ret[1:]
+        cols["target_return_1d"] = target
+        cols["target_up"] = (target > 0).astype(int)
+
+        if out is None:
+            out = panel.with_empty({c: v.dtype for c, v in cols.items()})
+        for c, v in cols.items():
+            out.column(c)[lo:hi] = v
+
+    # Drop each ticker's warm-up rows, then rows with any NaNs in used features or target
+    feature_cols = feature_columns(out.column_dtypes(), date_col)
+    with span("drop_nan", rows=len(out)):
+        keep = out.layout()[2] >= trim
+        for c in feature_cols + ["target_return_1d"]:
+            keep &= ~np.isnan(out.column(c))
+        return out.compress(keep), feature_cols
+
+
+def build_dataset(
+    df: pd.DataFrame, date_col: str, feature_dtype=np.float64, cross_section: Optional[dict] = None,
+    features: Optional[List[str]] = None,
+):
+    """`build_panel_dataset` decoded to a DataFrame."""
+    panel, feature_cols = build_panel_dataset(df, date_col, feature_dtype, cross_section=cross_section, features=features)
+    return panel.to_frame(), feature_cols
+
+
+def select_inputs(df: pd.DataFrame, cfg: dict, date_col: str):
+    """
+    Apply `features.select` to the input frame: with `listed`, numeric input columns that are
+    not listed (e.g. an unlisted `dow`) are dropped and listed ones must exist.
+    Returns (df, registered features to compute; None = all).
+    """
+    features, passthrough = listed_features(cfg)
+    if features is None:
+        return df, None
+    missing = [c for c in passthrough if c not in df.columns]
+    if missing:
+        raise ValueError(f"features lists unknown feature(s) or missing input column(s): {missing}")
+    unlisted = [c for c in feature_columns(df.dtypes, date_col) if c not in passthrough]
+    return df.drop(columns=unlisted), features
+
+
+def _verify(appended: pd.DataFrame, full: pd.DataFrame, date_col: str):
+    """Incremental rows must equal the same (ticker, date) rows of a full recompute, bit for bit."""
+    keys = ["ticker", date_col]
+    expected = full.set_index(keys).reindex(pd.MultiIndex.from_frame(appended[keys]))
+    pd.testing.assert_frame_equal(appended.set_index(keys), expected, check_exact=True)
+
 
 def run(cfg: dict):
-    interim_dir = Path(cfg["paths"]["interim_dir"])
     processed_dir = Path(cfg["paths"]["processed_dir"])
     date_col = cfg["data"]["date_col"]
+    inc = cfg["features"].get("incremental", {})
+    state_path = processed_dir / "feature_state.joblib"
 
-    df = pd.read_csv(interim_dir / "unified_long.csv")
-    df = df.sort_values(["ticker", date_col])
+    with span("read") as sp:
+        df = read_artifact(cfg, "unified_long")
+        sp["rows"] = len(df)
+    df, features = select_inputs(df, cfg, date_col)
 
-    # Feature engineering
-    df = add_basic_features(df, date_col=date_col)
-    df = add_technical_features(df, date_col=date_col)
+    # Per-date features need every ticker of a date: computed on the whole frame before it is
+    # split by ticker (sharded); incremental mode computes them for the new rows' dates only and
+    # the full build adds them itself
+    cross_section = cfg["features"].get("cross_section", {})
+    sharded = cfg["features"].get("sharded", {})
+    if cross_section.get("enabled") and sharded.get("enabled") and not inc.get("enabled"):
+        with span("cross_section", rows=len(df)):
+            df = add_cross_section_features(df, date_col, cross_section.get("group_by"))
 
-    # Define target: next-day return of price (per ticker)
-    df["target_return_1d"] = df.groupby("ticker")["price"].pct_change().shift(-1)
-    df["target_up"] = (df["target_return_1d"] > 0).astype(int)
+    if sharded.get("enabled") and not inc.get("enabled"):
+        # Whole tickers per shard, computed in a process pool and written shard by shard
+        n_rows, feature_cols = run_sharded(
+            df, partial(build_dataset, features=features), cfg, "dataset_features",
+            workers=sharded.get("workers", 0), shards_per_worker=sharded.get("shards_per_worker", 4),
+        )
+        print(f"[step_03] Saved dataset_features ({n_rows} rows) from sharded workers with {len(feature_cols)} feature columns.")
+        return
 
-    # Select feature columns explicitly (exclude leakage & identifiers)
-    exclude_cols = {
-        date_col, "ticker", "price", "target_return_1d", "target_up",
-        # rolling extrema can have long warmups; keep but we'll drop NaNs
-    }
-    feature_cols = [c for c in df.columns if c not in exclude_cols and df[c].dtype != "O"]
+    if not inc.get("enabled"):
+        # Parquet stores features as float32 anyway, so the panel holds them that way from the start
+        parquet = cfg.get("storage", {}).get("format", "parquet") == "parquet"
+        panel, feature_cols = build_panel_dataset(
+            df, date_col, np.float32 if parquet else np.float64, cross_section=cross_section, features=features,
+        )
+        del df
+        with span("write", rows=len(panel)):
+            for i, chunk in enumerate(panel.iter_frames()):
+                write_artifact(chunk, cfg, "dataset_features", append=i > 0, part=i)
+        print(f"[step_03] Saved dataset_features with {len(feature_cols)} feature columns.")
+        return
 
-    # Drop rows with any NaNs in used features or target
-    df = df.dropna(subset=feature_cols + ["target_return_1d", "target_up"]).reset_index(drop=True)
+    # Incremental mode: extend per-ticker rolling state with rows not seen yet
+    resume = state_path.exists() and artifact_exists(cfg, "dataset_features")
+    state = joblib.load(state_path) if resume else init_state(features)
+    if state.get("features") != features:
+        raise ValueError(
+            f"features changed since {state_path} was written (its EMA state only covers the old selection); "
+            "delete it to rebuild dataset_features."
+        )
+    fresh = new_rows(state, df, date_col) if resume else df
+    if fresh.empty:
+        print("[step_03] No new rows; dataset_features is up to date.")
+        return
+    if cross_section.get("enabled"):
+        with span("cross_section", rows=len(fresh)):
+            fresh = cross_section_rows(df, fresh.index, date_col, cross_section.get("group_by"))
+
+    with span("extend", rows=len(fresh)):
+        rows, feature_cols = _finalize(extend(state, fresh, date_col), date_col)
+
+    if inc.get("verify"):
+        full, _ = build_dataset(df, date_col, cross_section=cross_section, features=features)
+        _verify(rows, full, date_col)
+        print(f"[step_03] Verified {len(rows)} incremental rows against a full recompute.")
 
-    df.to_csv(processed_dir / "dataset_features.csv", index=False)
-    print(f"[step_03] Saved dataset_features.csv with {len(feature_cols)} feature columns.")
+    # Numbered after the existing files, so the new rows read back after the history
+    write_artifact(rows, cfg, "dataset_features", append=resume, part=next_part(cfg, "dataset_features"))
+    joblib.dump(state, state_path)
+    print(f"[step_03] {'Appended' if resume else 'Saved'} {len(rows)} rows to dataset_features ({len(feature_cols)} feature columns).")
@@ -2,10 +2,14 @@ import pandas as pd
 from pathlib import Path
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import GridSearchCV
 from sklearn.metrics import roc_auc_score
 import joblib
-from datetime import datetime
+import time
+from src.models.search import make_search, search_report, timed_fit
+from src.models.store import open_store
+from src.models.walk_forward import walk_forward
+from src.utils_io import read_artifact, write_artifact
+from src.utils_profile import record, span
 
 try:
     from xgboost import XGBClassifier
@@ -13,68 +17,131 @@ try:
 except Exception:
     HAS_XGB = False
 
-def _time_split(df: pd.DataFrame, date_col: str, train_end: str, val_end: str):
-    df[date_col] = pd.to_datetime(df[date_col])
-    train = df[df[date_col] <= pd.to_datetime(train_end)]
-    valid = df[(df[date_col] > pd.to_datetime(train_end)) & (df[date_col] <= pd.to_datetime(val_end))]
-    test  = df[df[date_col] > pd.to_datetime(val_end)]
-    return train, valid, test
+def run_walk_forward(cfg: dict):
+    """Rolling-origin refits; writes the stitched out-of-sample `predictions` artifact (replaces step 05)."""
+    reports_dir = Path(cfg["paths"]["reports_dir"])
+    date_col = cfg["data"]["date_col"]
+    wf_cfg = cfg["models"]["walk_forward"]
+
+    store = open_store(cfg)
+    df = read_artifact(cfg, "dataset_features")
+    preds, folds = walk_forward(df, store, date_col, wf_cfg)
+
+    for name, g in folds.groupby("model"):
+        print(f"[step_04] {name} walk-forward: {len(g)} folds, mean fold AUC {g['auc'].mean():.3f}")
+    folds.to_csv(reports_dir / "walk_forward_folds.csv", index=False)
+    path = write_artifact(preds, cfg, "predictions")
+    print(f"[step_04] Saved {path.name} with {len(preds)} out-of-sample rows.")
+
 
 def run(cfg: dict):
-    processed_dir = Path(cfg["paths"]["processed_dir"])
-    df = pd.read_csv(processed_dir / "dataset_features.csv")
+    if cfg["models"].get("walk_forward", {}).get("enabled"):
+        run_walk_forward(cfg)
+        return
 
+    processed_dir = Path(cfg["paths"]["processed_dir"])
     date_col = cfg["data"]["date_col"]
     train_end = cfg["split"]["train_end"]
     val_end   = cfg["split"]["val_end"]
 
-    feature_cols = [c for c in df.columns if c not in [date_col, "ticker", "price", "target_return_1d", "target_up"]]
-    train, valid, test = _time_split(df, date_col, train_end, val_end)
+    # Date-sorted float32 matrix, memory-mapped: each split is a contiguous zero-copy slice, and
+    # search workers receive the memmap by reference instead of a pickled copy each
+    with span("store") as sp:
+        store = open_store(cfg)
+        sp["rows"] = len(store)
+    train = store.date_slice(until=train_end)
+    valid = store.date_slice(after=train_end, until=val_end)
+    test = store.date_slice(after=val_end)
+
+    search_cfg = cfg["models"].get("search", {})
+    rounds = search_cfg.get("xgb", {}).get("early_stopping_rounds") if HAS_XGB else None
+
+    # XGB early stopping picks its number of trees on the first half of the validation dates, so
+    # its Val AUC is scored on the second half only; DT/RF never see validation rows and keep the
+    # whole window (`val_window` in the report gives the dates behind each model's Val AUC)
+    stop = slice(valid.start, valid.start)
+    val_rows = {}
+    if rounds and valid.stop > valid.start:
+        mid = pd.Timestamp(store.dates[(valid.start + valid.stop - 1) // 2])
+        stop = store.date_slice(after=train_end, until=mid)
+        val_rows["XGBClassifier"] = store.date_slice(after=mid, until=val_end)
 
-    X_train, y_train = train[feature_cols], train["target_up"]
-    X_valid, y_valid = valid[feature_cols], valid["target_up"]
-    X_test,  y_test  = test[feature_cols],  test["target_up"]
+    X_train, y_train = store.frame(train), store.y[train]
+    X_stop,  y_stop  = store.frame(stop),  store.y[stop]
+    X_test,  y_test  = store.frame(test),  store.y[test]
 
     models = {}
+    reports = []
 
     # 1) Decision Tree (baseline)
     dt = DecisionTreeClassifier(random_state=42)
-    dt_grid = {"max_depth": [3, 5, 7, None], "min_samples_leaf": [1, 5, 10]}
-    dt_cv = GridSearchCV(dt, dt_grid, scoring="roc_auc", cv=3, n_jobs=-1)
-    dt_cv.fit(X_train, y_train)
+    dt_cv = make_search("DecisionTree", dt, search_cfg)
+    with span("search:DecisionTree", rows=len(X_train)):
+        wall = timed_fit(dt_cv, X_train, y_train)
     models["DecisionTree"] = dt_cv.best_estimator_
-    print(f"[step_04] DecisionTree best params: {dt_cv.best_params_}")
+    reports.append(search_report("DecisionTree", dt_cv, wall))
+    print(f"[step_04] DecisionTree best params: {dt_cv.best_params_} ({len(dt_cv.cv_results_['params'])} candidates, {wall:.1f}s)")
 
     # 2) Random Forest (baseline + tuning)
     rf = RandomForestClassifier(random_state=42, n_jobs=-1)
-    rf_grid = {
-        "n_estimators": [200, 400],
-        "max_depth": [None, 10, 20],
-        "min_samples_leaf": [1, 5],
-        "max_features": ["sqrt", "log2"]
-    }
-    rf_cv = GridSearchCV(rf, rf_grid, scoring="roc_auc", cv=3, n_jobs=-1)
-    rf_cv.fit(X_train, y_train)
+    rf_cv = make_search("RandomForest", rf, search_cfg)
+    with span("search:RandomForest", rows=len(X_train)):
+        wall = timed_fit(rf_cv, X_train, y_train)
     models["RandomForest"] = rf_cv.best_estimator_
-    print(f"[step_04] RandomForest best params: {rf_cv.best_params_}")
+    reports.append(search_report("RandomForest", rf_cv, wall))
+    print(f"[step_04] RandomForest best params: {rf_cv.best_params_} ({len(rf_cv.cv_results_['params'])} candidates, {wall:.1f}s)")
 
-    # 3) XGBoost (advanced)
+    # 3) XGBoost (advanced); early stopping on the early-stopping slice when configured
     if HAS_XGB:
+        # Config values override the defaults (e.g. models.search.xgb.n_estimators)
+        xgb_params = {
+            "n_estimators": 400, "max_depth": 4, "learning_rate": 0.05, "subsample": 0.8, "colsample_bytree": 0.8,
+            **search_cfg.get("xgb", {}),
+        }
+        xgb_params.pop("early_stopping_rounds", None)
+        early_stopping = rounds if len(y_stop) else None
         xgb = XGBClassifier(
-            n_estimators=400, max_depth=4, learning_rate=0.05,
-            subsample=0.8, colsample_bytree=0.8, random_state=42, n_jobs=-1,
-            eval_metric="logloss"
+            **xgb_params, random_state=42, n_jobs=-1,
+            eval_metric="logloss", early_stopping_rounds=early_stopping,
         )
-        xgb.fit(X_train, y_train)
+        start = time.perf_counter()
+        with span("fit:XGBClassifier", rows=len(X_train)):
+            if early_stopping:
+                xgb.fit(X_train, y_train, eval_set=[(X_stop, y_stop)], verbose=False)
+                print(f"[step_04] XGBClassifier stopped at {xgb.best_iteration + 1} trees ({len(y_stop)} early-stopping rows).")
+            else:
+                xgb.fit(X_train, y_train)
+        wall = time.perf_counter() - start
         models["XGBClassifier"] = xgb
-        print("[step_04] Trained XGBClassifier.")
+        reports.append(pd.DataFrame([{
+            "model": "XGBClassifier", "params": str(xgb_params), "round": 0,
+            "n_resources": (xgb.best_iteration + 1) if early_stopping else xgb_params["n_estimators"],
+            "mean_fit_time": wall, "cv_auc": float("nan"), "is_best": True, "search_wall_time": wall,
+        }]))
+        print(f"[step_04] Trained XGBClassifier ({wall:.1f}s).")
     else:
         print("[step_04] XGBoost not available; skipping advanced model.")
 
-    # Evaluate on validation and test
+    report = pd.concat(reports, ignore_index=True)
+    report["mode"] = search_cfg.get("mode", "grid")
+    # Candidates are fitted in worker processes; their mean fit time per fold goes to the profile
+    for r in report.itertuples():
+        record(f"step_04/{r.model}{r.params}", r.mean_fit_time, round=int(r.round), cv_auc=r.cv_auc, n_resources=r.n_resources)
+
+    # Evaluate on validation (each model's window) and test
+    report["val_window"] = None
     for name, m in models.items():
-        val_auc = roc_auc_score(y_valid, m.predict_proba(X_valid)[:,1]) if len(valid) else float("nan")
-        test_auc = roc_auc_score(y_test,  m.predict_proba(X_test)[:,1])  if len(test)  else float("nan")
-        print(f"[step_04] {name} - Val AUC: {val_auc:.3f} | Test AUC: {test_auc:.3f}")
+        rows = val_rows.get(name, valid)
+        X_valid, y_valid = store.frame(rows), store.y[rows]
+        window = "..".join(str(pd.Timestamp(store.dates[i]).date()) for i in (rows.start, rows.stop - 1)) if len(y_valid) else None
+        val_auc = roc_auc_score(y_valid, m.predict_proba(X_valid)[:,1]) if len(y_valid) else float("nan")
+        test_auc = roc_auc_score(y_test,  m.predict_proba(X_test)[:,1])  if len(y_test)  else float("nan")
+        print(f"[step_04] {name} - Val AUC: {val_auc:.3f} ({window or 'no rows'}) | Test AUC: {test_auc:.3f}")
+        best = report["model"].eq(name) & report["is_best"]
+        report.loc[best, ["val_auc", "test_auc"]] = [val_auc, test_auc]
+        report.loc[best, "val_window"] = window
 
         joblib.dump(m, processed_dir / f"{name}.joblib")
+
+    report.to_csv(Path(cfg["paths"]["reports_dir"]) / "search_report.csv", index=False)
+    print("[step_04] Saved reports/search_report.csv")
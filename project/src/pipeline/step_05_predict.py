@@ -1,29 +1,66 @@
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import joblib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.models.store import open_store
+from src.utils_io import MODEL_NAMES, iter_artifact, write_artifact
+from src.utils_profile import record, span
+
+
+def _predict(model, X: pd.DataFrame):
+    start = time.perf_counter()
+    proba = model.predict_proba(X)[:, 1]
+    return proba, time.perf_counter() - start
 
 
 def run(cfg: dict):
-    processed_dir = Path(cfg["paths"]["processed_dir"])
-    df = pd.read_csv(processed_dir / "dataset_features.csv")
+    if cfg["models"].get("walk_forward", {}).get("enabled"):
+        print("[step_05] Walk-forward predictions were written by step_04; skipping.")
+        return
 
-    feature_cols = [
-        c
-        for c in df.columns
-        if c not in ["Date", "ticker", "price", "target_return_1d", "target_up"]
-    ]
-    X = df[feature_cols]
-    preds = {}
+    processed_dir = Path(cfg["paths"]["processed_dir"])
+    pred_cfg = cfg.get("predict", {})
+    batch_rows = pred_cfg.get("batch_rows", 100_000)
 
-    for model_name in ["DecisionTree", "RandomForest"]:
+    models = {}
+    for model_name in MODEL_NAMES:
         model_path = processed_dir / f"{model_name}.joblib"
         if not model_path.exists():
             print(f"[step_05] Missing model {model_name}, skipping.")
             continue
-        model = joblib.load(model_path)
-        proba = model.predict_proba(X)[:, 1]
-        df[f"pred_{model_name}"] = proba
-        preds[model_name] = proba.mean()
+        models[model_name] = joblib.load(model_path)
+    if not models:
+        raise FileNotFoundError(f"No trained models in {processed_dir}; run step_04 first.")
+
+    # Score the shared memory-mapped matrix in contiguous (zero-copy) batches, all models
+    # concurrently; probabilities are put back in artifact order for the output pass
+    store = open_store(cfg, batch_rows)
+    proba = {name: np.empty(len(store)) for name in models}
+    seconds = dict.fromkeys(models, 0.0)
+    with ThreadPoolExecutor(max_workers=pred_cfg.get("threads") or max(len(models), 1)) as pool:
+        for lo in range(0, len(store), batch_rows):
+            X = store.frame(slice(lo, lo + batch_rows))
+            futures = {name: pool.submit(_predict, m, X) for name, m in models.items()}
+            for name, fut in futures.items():
+                proba[name][lo:lo + len(X)], secs = fut.result()
+                seconds[name] += secs
+    proba = {name: store.to_artifact_order(p) for name, p in proba.items()}
+
+    # Stream feature rows in chunks (bounds memory) and append them with their predictions
+    n_rows = 0
+    for i, chunk in enumerate(iter_artifact(cfg, "dataset_features", batch_rows=batch_rows)):
+        for name, p in proba.items():
+            chunk[f"pred_{name}"] = p[n_rows:n_rows + len(chunk)]
+        with span("write", rows=len(chunk)):
+            path = write_artifact(chunk, cfg, "predictions", append=i > 0, part=i)
+        n_rows += len(chunk)
 
-    df.to_csv(processed_dir / "predictions.csv", index=False)
-    print("[step_05] Saved predictions.csv")
+    if not n_rows:
+        print("[step_05] dataset_features is empty; nothing to predict.")
+        return
+    for name, secs in seconds.items():
+        record(f"step_05/predict:{name}", secs, rows=n_rows)
+        print(f"[step_05] {name}: {n_rows / max(secs, 1e-9):,.0f} rows/sec")
+    print(f"[step_05] Saved {path.name} ({n_rows} rows, batches of {batch_rows}).")
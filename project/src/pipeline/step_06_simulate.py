@@ -1,59 +1,104 @@
 import pandas as pd
 from pathlib import Path
-from src.simulation.strategies import (
-    sim_long_only_threshold,
-    sim_long_short_threshold,
-    sim_long_only_sl_tp,
-)
-from src.utils_metrics import compute_kpis
+from src.simulation.panel import build_market
+from src.simulation.bootstrap import block_paths, bootstrap_kpis, kpi_intervals, ticker_paths
+from src.simulation.registry import ROW_PARTS, run_strategies
+from src.simulation.sweep import run_sweep
+from src.utils_metrics import compute_kpis, rolling_kpis
+from src.utils_io import artifact_schema, read_artifact
+from src.utils_profile import span
 
 
-def run(cfg: dict):
-    processed_dir = Path(cfg["paths"]["processed_dir"])
-    reports_dir = Path(cfg["paths"]["reports_dir"])
-    backtests_dir = Path(cfg["paths"]["backtests_dir"])
-
-    df = pd.read_csv(processed_dir / "predictions.csv")
-    df = df.sort_values(["ticker", "Date"])
+def load_market(cfg: dict):
+    """One read-only market (date x ticker panel + per-date rank order) built from `predictions`."""
+    # Only the columns the strategies use
+    date_col = cfg["data"]["date_col"]
+    pred_cols = [c for c in artifact_schema(cfg, "predictions").index if c.startswith("pred_")]
+    with span("read") as sp:
+        df = read_artifact(cfg, "predictions", columns=[date_col, "ticker", "price", "target_return_1d"] + pred_cols)
+        sp["rows"] = len(df)
 
     prob_col = (
         "pred_RandomForest"
         if "pred_RandomForest" in df.columns
         else "pred_DecisionTree"
     )
-    out = []
+    with span("build_market", rows=len(df)):
+        return build_market(df, prob_col, date_col)
 
-    # Strategy 1: Long-only threshold
-    s1 = sim_long_only_threshold(
-        df.copy(),
-        prob_col,
-        threshold=cfg["simulation"]["thresholds"]["buy_prob"],
-        fee_bps=cfg["simulation"]["costs"]["fee_bps"],
-    )
-    out.append(("long_only_threshold", compute_kpis(s1)))
-
-    # Strategy 2: Long-Short threshold
-    s2 = sim_long_short_threshold(
-        df.copy(),
-        prob_col,
-        buy_thr=cfg["simulation"]["thresholds"]["buy_prob"],
-        short_thr=cfg["simulation"]["thresholds"]["short_prob"],
-        fee_bps=cfg["simulation"]["costs"]["fee_bps"],
-    )
-    out.append(("long_short_threshold", compute_kpis(s2)))
-
-    # Strategy 3: Long-only with SL/TP
-    s3 = sim_long_only_sl_tp(
-        df.copy(),
-        prob_col,
-        threshold=cfg["simulation"]["thresholds"]["buy_prob"],
-        stop_loss=cfg["simulation"]["risk"]["stop_loss"],
-        take_profit=cfg["simulation"]["risk"]["take_profit"],
-        fee_bps=cfg["simulation"]["costs"]["fee_bps"],
-    )
-    out.append(("long_only_sl_tp", compute_kpis(s3)))
+
+def run_sweep_grid(cfg: dict, market) -> pd.DataFrame:
+    """Parameter sweep over the `simulation.sweep` grids (each falls back to the single configured value)."""
+    sim = cfg["simulation"]
+    sweep = sim.get("sweep", {})
+    grid = {
+        "buy_prob": sweep.get("buy_prob", [sim["thresholds"]["buy_prob"]]),
+        "short_prob": sweep.get("short_prob", [sim["thresholds"]["short_prob"]]),
+        "stop_loss": sweep.get("stop_loss", [sim["risk"]["stop_loss"]]),
+        "take_profit": sweep.get("take_profit", [sim["risk"]["take_profit"]]),
+        "fee_bps": sweep.get("fee_bps", [sim["costs"]["fee_bps"]]),
+    }
+    with span("sweep"):
+        return run_sweep(market.panel, grid, sim.get("capital", {}).get("max_concurrent_positions", 3), order=market.order)
+
+
+def sweep(cfg: dict):
+    """Only the parameter sweep (whether or not `simulation.sweep.enabled`), e.g. from the CLI."""
+    backtests_dir = Path(cfg["paths"]["backtests_dir"])
+    res = run_sweep_grid(cfg, load_market(cfg))
+    res.to_csv(backtests_dir / "sweep.csv", index=False)
+    print(f"[step_06] Saved backtests/sweep.csv ({len(res)} combinations)")
+
+
+def run(cfg: dict):
+    backtests_dir = Path(cfg["paths"]["backtests_dir"])
+    # Shared by every strategy
+    market = load_market(cfg)
+
+    # Strategies from config.yaml `simulation.strategies` (see src/simulation/registry.py), run concurrently
+    sim = cfg["simulation"]
+    results = run_strategies(market, sim, sim["strategies"], workers=sim.get("workers", 0))
+    out = []
+    for name, (daily, secs) in results.items():
+        print(f"[step_06] {name}: {secs:.3f}s")
+        out.append((name, compute_kpis(daily)))
 
     pd.DataFrame([{"strategy": k, **v} for k, v in out]).to_csv(
         backtests_dir / "summary.csv", index=False
     )
     print("[step_06] Saved backtests/summary.csv")
+
+    # Optional rolling KPIs for all strategies at once (one column per strategy x KPI x window)
+    rolling = sim.get("rolling", {})
+    if rolling.get("enabled"):
+        returns = pd.DataFrame({name: daily["strategy_ret"].to_numpy() for name, (daily, _) in results.items()})
+        with span("rolling", rows=returns.size):
+            roll = rolling_kpis(returns, rolling.get("windows", [63, 252])).round(6)
+        roll.insert(0, "Date", next(iter(results.values()))[0]["Date"].to_numpy())
+        roll.to_csv(backtests_dir / "rolling.csv", index=False)
+        print(f"[step_06] Saved backtests/rolling.csv ({roll.shape[1] - 1} series)")
+
+    # Optional bootstrap confidence intervals for the KPIs
+    boot = sim.get("bootstrap", {})
+    if boot.get("enabled"):
+        opts = {k: boot[k] for k in ("n_paths", "seed", "chunk_paths", "workers") if k in boot}
+        tables = []
+        for name, (daily, _) in results.items():
+            point = dict(out)[name]
+            methods = {"block": block_paths(daily["strategy_ret"].to_numpy(), boot.get("block_days", 21))}
+            if boot.get("tickers", True) and name in ROW_PARTS:
+                methods["ticker"] = ticker_paths(market.order, *ROW_PARTS[name](market, sim))
+            for method, make_paths in methods.items():
+                with span(f"bootstrap:{name}:{method}", rows=boot.get("n_paths", 10000)):
+                    table = kpi_intervals(bootstrap_kpis(make_paths, **opts), point, boot.get("alpha", 0.05))
+                tables.append(table.assign(strategy=name, method=method))
+        res = pd.concat(tables, ignore_index=True)
+        res = res[["strategy", "method"] + [c for c in res.columns if c not in ("strategy", "method")]]
+        res.round(6).to_csv(backtests_dir / "bootstrap.csv", index=False)
+        print(f"[step_06] Saved backtests/bootstrap.csv ({boot.get('n_paths', 10000)} paths)")
+
+    # Optional parameter sweep over grids
+    if sim.get("sweep", {}).get("enabled"):
+        res = run_sweep_grid(cfg, market)
+        res.to_csv(backtests_dir / "sweep.csv", index=False)
+        print(f"[step_06] Saved backtests/sweep.csv ({len(res)} combinations)")
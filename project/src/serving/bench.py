@@ -0,0 +1,107 @@
+import argparse
+import http.client
+import json
+import threading
+import time
+import numpy as np
+import pandas as pd
+import yaml
+from src.serving.scorer import Scorer
+from src.serving.server import make_server
+from src.utils_io import read_artifact
+
+
+def _ms(samples) -> str:
+    a = np.asarray(samples) * 1e3
+    return f"p50 {np.percentile(a, 50):.3f} ms | p99 {np.percentile(a, 99):.3f} ms | n={len(a)}"
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+
+def run(cfg: dict, days: int = 20, with_http: bool = True) -> dict:
+    """
+    Replay the last `days` dates of `unified_long` through a warm `Scorer` (state built from
+    the earlier history) and time:
+    - single: one intraday tick for one ticker (features + every model)
+    - batch: one tick for every ticker in a single call (reported per call and per ticker)
+    - roll: the first tick of a new date for all tickers (commits the previous day)
+    - http: single-tick round trip through the HTTP front end (keep-alive)
+    The close-price predictions are compared with the offline models on `dataset_features`.
+    """
+    date_col = cfg["data"]["date_col"]
+    hist = read_artifact(cfg, "unified_long", columns=[date_col, "ticker", "price"])
+    hist[date_col] = pd.to_datetime(hist[date_col])
+    hist = hist.dropna(subset=["price"])
+    dates = np.sort(hist[date_col].unique())
+    replay = dates[-days:]
+
+    scorer = Scorer.from_config(cfg, until=str(pd.Timestamp(replay[0]) - pd.Timedelta(days=1)))
+    timings = {"single": [], "batch": [], "batch_per_ticker": [], "roll": [], "http": []}
+    online = []
+
+    for d in replay:
+        day = hist[hist[date_col] == d]
+        ticks = [{"ticker": t, "date": str(pd.Timestamp(d).date()), "price": p} for t, p in zip(day["ticker"], day["price"])]
+        if not ticks:
+            continue
+        _, secs = _timed(scorer.score, ticks)
+        timings["roll"].append(secs)
+        for tick in ticks:
+            _, secs = _timed(scorer.score, [tick])
+            timings["single"].append(secs)
+        preds, secs = _timed(scorer.score, ticks)
+        timings["batch"].append(secs)
+        timings["batch_per_ticker"].append(secs / len(ticks))
+        online += [{"ticker": t, date_col: pd.Timestamp(d), **p} for t, p in preds.items()]
+
+    if with_http:
+        server = make_server(scorer, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        conn = http.client.HTTPConnection(*server.server_address[:2])
+        d = str(pd.Timestamp(replay[-1]).date())
+        for t, p in hist[hist[date_col] == replay[-1]][["ticker", "price"]].itertuples(index=False):
+            body = json.dumps({"ticks": [{"ticker": t, "date": d, "price": p}]})
+            start = time.perf_counter()
+            conn.request("POST", "/score", body, {"Content-Type": "application/json"})
+            conn.getresponse().read()
+            timings["http"].append(time.perf_counter() - start)
+        conn.close()
+        server.shutdown()
+        server.server_close()
+
+    # Online (close-price) predictions vs the offline models on the stored feature rows
+    online = pd.DataFrame(online)
+    feats = read_artifact(cfg, "dataset_features")
+    feats[date_col] = pd.to_datetime(feats[date_col])
+    merged = feats.merge(online, on=["ticker", date_col], how="inner")
+    diff = {}
+    for name, model in scorer.models.items():
+        offline = model.predict_proba(merged[scorer.feature_cols])[:, 1]
+        diff[name] = float(np.nanmax(np.abs(offline - merged[f"pred_{name}"].astype(float)))) if len(merged) else float("nan")
+
+    report = {k: _ms(v) for k, v in timings.items() if v}
+    report["tickers"] = int(hist[hist[date_col] == replay[-1]]["ticker"].nunique())
+    report["offline_agreement_max_abs_diff"] = diff
+    report["rows_compared"] = int(len(merged))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument("--days", type=int, default=20)
+    parser.add_argument("--no-http", action="store_true")
+    args = parser.parse_args()
+    with open(args.config, "r") as f:
+        cfg = yaml.safe_load(f)
+    report = run(cfg, args.days, with_http=not args.no_http)
+    for k, v in report.items():
+        print(f"[serving.bench] {k}: {v}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import threading
+import joblib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from src.features.cross_section import cross_section_names
+from src.features.incremental import _grow, extend, init_state, peek
+from src.features.registry import listed_features
+from src.serving.trees import PackedForest, packable
+from src.utils_io import MODEL_NAMES, artifact_exists, read_artifact
+from src.utils_metrics import StreamingKPIs
+
+# Up to this many rows, packed trees beat sklearn's per-call overhead
+PACKED_MAX_ROWS = 256
+
+
+class Scorer:
+    """
+    In-process scoring API with warm models and per-ticker rolling feature state.
+    - `score(ticks)`: ticks are (ticker, date, price). A tick for a new date opens a provisional
+      row for that ticker; later ticks of the same date replace its price. Features come from
+      `src.features.incremental.peek` (same kernels as the offline build) and every model
+      scores the provisional rows; state is not modified.
+    - the provisional row of a date is committed to the state (`extend`) when a tick for a later
+      date arrives, or on `flush()` (e.g. after the close)
+    - `record_return(ret)`: realized daily return of whatever trades on these scores; KPIs are
+      kept up to date in O(1) per day (`StreamingKPIs`)
+    Thread-safe; one lock around state changes and scoring.
+    """
+
+    def __init__(self, models: Dict[str, object], state: dict, date_col: str = "Date"):
+        if not models:
+            raise ValueError("No trained models to serve; run step 04 first.")
+        self.models = models
+        self.state = state
+        self.date_col = date_col
+        self.open: Dict[str, tuple] = {}      # ticker -> (date, price) not yet committed
+        self.lock = threading.Lock()
+        self.packed = {name: PackedForest(m) for name, m in models.items() if packable(m)}
+        first = next(iter(models.values()), None)
+        self.feature_cols: List[str] = list(getattr(first, "feature_names_in_", []))
+        cross = [c for c in self.feature_cols if c in cross_section_names()]
+        if cross:
+            raise ValueError(
+                f"Models use cross-sectional features ({', '.join(cross)}), which need every ticker of a "
+                "date; retrain with features.cross_section disabled to serve them."
+            )
+        self.pnl = StreamingKPIs()
+
+    @classmethod
+    def from_config(cls, cfg: dict, until: Optional[str] = None) -> "Scorer":
+        """
+        Load the saved models and the step 03 feature state (`feature_state.joblib`); without a
+        saved state, replay `unified_long` once (rows dated <= `until`, if given).
+        """
+        processed_dir = Path(cfg["paths"]["processed_dir"])
+        date_col = cfg["data"]["date_col"]
+        models = {
+            name: joblib.load(processed_dir / f"{name}.joblib")
+            for name in MODEL_NAMES if (processed_dir / f"{name}.joblib").exists()
+        }
+        state_path = processed_dir / "feature_state.joblib"
+        if until is None and state_path.exists():
+            state = joblib.load(state_path)
+        else:
+            state = init_state(listed_features(cfg)[0])
+            if artifact_exists(cfg, "unified_long"):
+                hist = read_artifact(cfg, "unified_long", columns=[date_col, "ticker", "price"])
+                if until is not None:
+                    hist = hist[pd.to_datetime(hist[date_col]) <= pd.Timestamp(until)]
+                extend(state, hist, date_col)
+        return cls(models, state, date_col)
+
+    def _commit(self, tickers: Iterable[str]):
+        rows = [(self.open[t][0], t, self.open[t][1]) for t in tickers]
+        if rows:
+            extend(self.state, pd.DataFrame(rows, columns=[self.date_col, "ticker", "price"]), self.date_col)
+            for t in tickers:
+                del self.open[t]
+
+    def flush(self) -> int:
+        """Commit every provisional row (end of day). Returns the number of tickers committed."""
+        with self.lock:
+            n = len(self.open)
+            self._commit(list(self.open))
+            return n
+
+    def record_return(self, ret: float) -> Dict[str, float]:
+        """Add one realized daily return and return the running KPIs."""
+        with self.lock:
+            return self.pnl.update(float(ret)).kpis()
+
+    def _predict(self, X: np.ndarray) -> Dict[str, np.ndarray]:
+        out = {}
+        for name, model in self.models.items():
+            if name in self.packed and len(X) <= PACKED_MAX_ROWS:
+                out[name] = self.packed[name].predict_proba1(X)
+            elif name == "XGBClassifier":
+                # Same trees as predict_proba: up to the early-stopping best iteration, if any
+                best = getattr(model, "best_iteration", None)
+                trees = (0, best + 1) if best is not None else (0, 0)
+                out[name] = model.get_booster().inplace_predict(X, iteration_range=trees)
+            else:
+                out[name] = model.predict_proba(pd.DataFrame(X, columns=self.feature_cols))[:, 1]
+        return out
+
+    def score(self, ticks) -> Dict[str, dict]:
+        """
+        Score ticks: a DataFrame or list of dicts with ticker, date and price.
+        Returns {ticker: {"date": ..., "pred_<model>": prob, ...}}; tickers without enough
+        history get None probabilities, ticks older than the committed state get an "error".
+        """
+        if isinstance(ticks, pd.DataFrame):
+            ticks = ticks.to_dict("records")
+        # A handful of ticks per call: plain lists are much cheaper than a DataFrame here
+        names = [t["ticker"] for t in ticks]
+        days = [pd.Timestamp(t[self.date_col] if self.date_col in t else t["date"]) for t in ticks]
+        prices = [t["price"] for t in ticks]
+        result: Dict[str, dict] = {}
+
+        with self.lock:
+            known = {t: i for i, t in enumerate(self.state["tickers"])}
+            last = self.state["last_date"]
+            # A later date closes the provisional row of the previous one
+            rolled = [
+                t for t, d in zip(names, days)
+                if t in self.open and d > self.open[t][0]
+            ]
+            self._commit(sorted(set(rolled)))
+            if rolled:
+                known = {t: i for i, t in enumerate(self.state["tickers"])}
+                last = self.state["last_date"]
+
+            for t, d, p in zip(names, days, prices):
+                if t in known and not pd.isna(last[known[t]]) and d <= last[known[t]]:
+                    result[t] = {"date": str(d.date()), "error": "tick is not newer than the committed state"}
+                    continue
+                self.open[t] = (d, float(p))
+
+            tickers = [t for t in dict.fromkeys(names) if t in self.open]
+            new = [t for t in tickers if t not in known]
+            if new:
+                # Register unseen tickers (empty history) so they can accumulate state
+                _grow(self.state, new)
+                known = {t: i for i, t in enumerate(self.state["tickers"])}
+            if not tickers:
+                return result
+
+            ids = np.array([known[t] for t in tickers])
+            dates = pd.DatetimeIndex([self.open[t][0] for t in tickers])
+            feats = peek(self.state, ids, np.array([self.open[t][1] for t in tickers]))
+            feats["dow"], feats["month"] = dates.dayofweek.to_numpy(), dates.month.to_numpy()
+            X = np.column_stack([feats[c] for c in self.feature_cols]).astype(np.float32)
+            ok = ~np.isnan(X).any(axis=1)
+            preds = self._predict(X[ok]) if ok.any() else {}
+
+        rows_ok = np.flatnonzero(ok)
+        for k, t in enumerate(tickers):
+            result[t] = {"date": str(dates[k].date())}
+            for name in self.models:
+                result[t][f"pred_{name}"] = None
+        for j, k in enumerate(rows_ok):
+            for name, proba in preds.items():
+                result[tickers[k]][f"pred_{name}"] = float(proba[j])
+        return result
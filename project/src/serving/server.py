@@ -0,0 +1,111 @@
+import argparse
+import json
+import os
+import socketserver
+import time
+import yaml
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.serving.scorer import Scorer
+
+
+def make_handler(scorer: Scorer):
+    """
+    JSON over HTTP:
+    - POST /score  {"ticks": [{"ticker": "AMZN", "date": "2024-05-02", "price": 181.2}, ...]}
+    - POST /flush  commit provisional rows (end of day)
+    - POST /pnl    {"ret": 0.004} realized daily return -> running KPIs
+    - GET  /kpis   running KPIs (CAGR, Sharpe, MaxDrawdown, TotalReturn) and days recorded
+    - GET  /health models and number of tickers in state
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive: no reconnect per request
+        disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+        def _send(self, code: int, body: dict):
+            data = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, {"models": list(scorer.models), "tickers": len(scorer.state["tickers"])})
+            elif self.path == "/kpis":
+                self._send(200, {"days": scorer.pnl.n_days, **scorer.pnl.kpis()})
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/score":
+                    start = time.perf_counter()
+                    preds = scorer.score(body["ticks"])
+                    self._send(200, {"predictions": preds, "latency_ms": (time.perf_counter() - start) * 1e3})
+                elif self.path == "/flush":
+                    self._send(200, {"committed": scorer.flush()})
+                elif self.path == "/pnl":
+                    self._send(200, scorer.record_return(body["ret"]))
+                else:
+                    self._send(404, {"error": "not found"})
+            except (KeyError, ValueError, TypeError) as e:
+                self._send(400, {"error": str(e)})
+
+        def address_string(self):
+            # Unix sockets have no (host, port) peer address
+            return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(scorer: Scorer, host: str = "127.0.0.1", port: int = 8765, unix_socket: str = None):
+    """HTTP server on host:port, or on a Unix socket path when `unix_socket` is set."""
+    handler = make_handler(scorer)
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        return UnixHTTPServer(unix_socket, handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--unix-socket")
+    args = parser.parse_args(argv)
+
+    with open(args.config, "r") as f:
+        cfg = yaml.safe_load(f)
+    serving = cfg.get("serving", {})
+    scorer = Scorer.from_config(cfg)
+    server = make_server(
+        scorer,
+        host=args.host or serving.get("host", "127.0.0.1"),
+        port=args.port or serving.get("port", 8765),
+        unix_socket=args.unix_socket or serving.get("unix_socket"),
+    )
+    where = args.unix_socket or serving.get("unix_socket") or "%s:%d" % server.server_address[:2]
+    print(f"[serving] {len(scorer.models)} models, {len(scorer.state['tickers'])} tickers; listening on {where}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import numpy as np
+
+
+class PackedForest:
+    """
+    sklearn DecisionTree/RandomForest classifier flattened into node arrays, evaluated for all
+    trees at once with a few numpy ops per tree level. Same result as `predict_proba(X)[:, 1]`
+    (up to summation order), without sklearn's per-call overhead, which dominates for a
+    handful of rows.
+    """
+
+    def __init__(self, model):
+        trees = [e.tree_ for e in getattr(model, "estimators_", [model])]
+        sizes = np.array([t.node_count for t in trees])
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        left = np.concatenate([t.children_left for t in trees]).astype(np.int64)
+        right = np.concatenate([t.children_right for t in trees]).astype(np.int64)
+        leaf = left == -1
+        idx = np.arange(len(left))
+        shift = np.repeat(offsets, sizes)
+
+        # Leaves point to themselves with an always-true split, so every row can take
+        # max_depth steps without checking whether it already reached a leaf
+        self.left = np.where(leaf, idx, left + shift)
+        self.right = np.where(leaf, idx, right + shift)
+        self.feature = np.where(leaf, 0, np.concatenate([t.feature for t in trees])).astype(np.int64)
+        self.threshold = np.where(leaf, np.inf, np.concatenate([t.threshold for t in trees]))
+        values = np.concatenate([t.value[:, 0, :] for t in trees])
+        totals = values.sum(axis=1)
+        self.leaf_proba = values[:, 1] / np.where(totals == 0, 1.0, totals)
+        self.roots = offsets.astype(np.int64)
+        self.depth = max(t.max_depth for t in trees)
+        self.n_features = model.n_features_in_
+
+    def predict_proba1(self, X: np.ndarray) -> np.ndarray:
+        """P(class 1) for each row of X (float32 like sklearn trees; no NaNs)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.leaf_proba[node].sum(axis=1) / len(self.roots)
+
+
+def packable(model) -> bool:
+    """Binary sklearn tree classifiers (a single tree or a forest of them)."""
+    trees = getattr(model, "estimators_", [model])
+    return hasattr(model, "classes_") and len(model.classes_) == 2 and all(hasattr(t, "tree_") for t in trees)
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+from src.simulation.panel import DayOrder
+
+KPI_NAMES = ["CAGR", "Sharpe", "MaxDrawdown", "TotalReturn"]
+
+
+def path_kpis(returns: np.ndarray, periods_per_year: int = 252) -> Dict[str, np.ndarray]:
+    """
+    `compute_kpis` for every row of a (paths, periods) return matrix at once (unrounded).
+    NaN returns are flat days for equity and skipped by Sharpe, as in `compute_kpis`.
+    """
+    finite = ~np.isnan(returns)
+    r = np.where(finite, returns, 0.0)
+    equity = np.cumprod(1.0 + r, axis=1)
+    total = equity[:, -1] / equity[:, 0] - 1.0
+    years = returns.shape[1] / periods_per_year
+
+    count = finite.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = r.sum(axis=1) / count
+        std = np.sqrt(np.where(finite, (r - mean[:, None]) ** 2, 0.0).sum(axis=1) / count)
+        sharpe = mean * periods_per_year / (std * np.sqrt(periods_per_year))
+    sharpe = np.where((std == 0) | np.isnan(std), 0.0, sharpe)
+
+    drawdown = (equity / np.maximum.accumulate(equity, axis=1) - 1.0).min(axis=1)
+    return {
+        "CAGR": (1 + total) ** (1 / years) - 1 if years > 0 else np.zeros(len(r)),
+        "Sharpe": sharpe,
+        "MaxDrawdown": drawdown,
+        "TotalReturn": total,
+    }
+
+
+def block_paths(returns: np.ndarray, block: int = 21) -> Callable[[np.random.Generator, int], np.ndarray]:
+    """
+    Circular moving-block bootstrap of one daily return series: each path is stitched from
+    random blocks of `block` consecutive days (keeps short-range autocorrelation).
+    """
+    returns = np.asarray(returns, dtype=float)
+    n = len(returns)
+    n_blocks = -(-n // block)
+    offsets = np.arange(block)
+
+    def make(rng: np.random.Generator, size: int) -> np.ndarray:
+        starts = rng.integers(0, n, size=(size, n_blocks))
+        idx = (starts[:, :, None] + offsets).reshape(size, -1)[:, :n] % n
+        return returns[idx]
+
+    return make
+
+
+def ticker_paths(order: DayOrder, num: np.ndarray, den: np.ndarray, empty: float = np.nan):
+    """
+    Ticker bootstrap of a strategy whose daily return is sum(num) / sum(den) over the day's rows
+    (see the `*_rows` kernels): every path redraws the universe with replacement and weights
+    each ticker's rows by how often it was drawn. Signals are kept as they are; this measures
+    how much the result depends on which tickers happened to be traded.
+    """
+    n_tickers, n_dates = int(order.ticker_idx.max()) + 1, len(order.dates)
+    cell = order.ticker_idx * n_dates + order.date_idx
+    num_td = np.bincount(cell, weights=num, minlength=n_tickers * n_dates).reshape(n_tickers, n_dates)
+    den_td = np.bincount(cell, weights=den, minlength=n_tickers * n_dates).reshape(n_tickers, n_dates)
+    uniform = np.full(n_tickers, 1.0 / n_tickers)
+
+    def make(rng: np.random.Generator, size: int) -> np.ndarray:
+        weights = rng.multinomial(n_tickers, uniform, size=size).astype(float)
+        top, bottom = weights @ num_td, weights @ den_td
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(bottom > 0, top / bottom, empty)
+
+    return make
+
+
+def bootstrap_kpis(
+    make_paths: Callable[[np.random.Generator, int], np.ndarray],
+    n_paths: int = 10000,
+    seed: int = 42,
+    chunk_paths: int = 1000,
+    workers: int = 0,
+) -> pd.DataFrame:
+    """
+    KPIs of `n_paths` resampled paths, one row per path.
+    - paths are generated and evaluated in chunks of `chunk_paths` (bounded memory) on a
+      thread pool (`workers`, 0 = one per chunk up to 8)
+    - each chunk has its own child seed of `seed`, so results do not depend on `workers`
+    """
+    sizes = [min(chunk_paths, n_paths - i) for i in range(0, n_paths, chunk_paths)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    def _chunk(k: int) -> Dict[str, np.ndarray]:
+        return path_kpis(make_paths(np.random.default_rng(seeds[k]), sizes[k]))
+
+    with ThreadPoolExecutor(max_workers=workers or min(len(sizes), 8)) as pool:
+        parts = list(pool.map(_chunk, range(len(sizes))))
+    return pd.DataFrame({k: np.concatenate([p[k] for p in parts]) for k in KPI_NAMES})
+
+
+def kpi_intervals(samples: pd.DataFrame, point: Dict[str, float], alpha: float = 0.05) -> pd.DataFrame:
+    """Point estimate plus bootstrap median, std and the (alpha/2, 1-alpha/2) percentile interval per KPI."""
+    q = samples.quantile([alpha / 2, 0.5, 1 - alpha / 2])
+    return pd.DataFrame({
+        "kpi": KPI_NAMES,
+        "point": [point.get(k) for k in KPI_NAMES],
+        "median": q.iloc[1][KPI_NAMES].to_numpy(),
+        "lo": q.iloc[0][KPI_NAMES].to_numpy(),
+        "hi": q.iloc[2][KPI_NAMES].to_numpy(),
+        "std": samples[KPI_NAMES].std().to_numpy(),
+    })
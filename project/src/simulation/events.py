@@ -0,0 +1,194 @@
+import time
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+from src.simulation.panel import MarketPanel, desc_order
+from src.utils_metrics import StreamingKPIs
+from src.utils_profile import record
+
+
+@dataclass(frozen=True)
+class Bars:
+    """
+    Every quote of one timestamp (a day, or a minute for intraday data).
+    - ticker: integer ticker ids, ascending (ties in `prob` are broken by this order)
+    - price: entry price; ret: return a position earns by holding through this bar (the daily
+      pipeline's `target_return_1d`); prob: model probability (NaN = no entry signal)
+    """
+    time: object
+    ticker: np.ndarray
+    price: np.ndarray
+    ret: np.ndarray
+    prob: np.ndarray
+
+
+def panel_bars(panel: MarketPanel) -> Iterator[Bars]:
+    """Daily bars of a `MarketPanel` (the rows present on each date)."""
+    for i, d in enumerate(panel.dates):
+        cols = np.flatnonzero(panel.present[i])
+        yield Bars(d, cols, panel.price[i, cols], panel.ret[i, cols], panel.prob[i, cols])
+
+
+def frame_bars(
+    df: pd.DataFrame,
+    prob_col: str,
+    time_col: str = "Date",
+    ret_col: str = "target_return_1d",
+    tickers: Optional[np.ndarray] = None,
+) -> Iterator[Bars]:
+    """
+    Bars from a long (time, ticker) frame of any frequency: one sort by (time, ticker), then one
+    slice per timestamp. `tickers` fixes the id of every symbol (default: the sorted tickers, ids as
+    in `build_panel`); a symbol of the frame missing from it raises ValueError. Duplicate
+    (time, ticker) rows keep the first, like `build_panel`.
+    """
+    t_idx, times = pd.factorize(pd.to_datetime(df[time_col]), sort=True)
+    if tickers is None:
+        k_idx, tickers = pd.factorize(df["ticker"], sort=True)
+    else:
+        k_idx = pd.Index(tickers).get_indexer(df["ticker"])
+        if (k_idx < 0).any():
+            unknown = sorted(map(str, pd.unique(df["ticker"].to_numpy()[k_idx < 0])))
+            raise ValueError(f"Unknown ticker(s) {unknown}: not in `tickers`")
+    key = t_idx.astype(np.int64) * max(len(tickers), 1) + k_idx
+    key, first = np.unique(key, return_index=True)
+    t_idx, k_idx = t_idx[first], k_idx[first]
+    price = df["price"].to_numpy(dtype=float)[first]
+    ret = df[ret_col].to_numpy(dtype=float)[first]
+    prob = df[prob_col].to_numpy(dtype=float)[first]
+    bounds = np.searchsorted(t_idx, np.arange(len(times) + 1))
+    for i, d in enumerate(times):
+        s = slice(bounds[i], bounds[i + 1])
+        yield Bars(d, k_idx[s], price[s], ret[s], prob[s])
+
+
+class SLTPBook:
+    """
+    Open long positions for the SL/TP strategy, held in per-ticker arrays (at most one per ticker):
+    - equity: marked-to-market value, compounded by `ret` on every bar the ticker quotes
+    - qty, entry: shares and entry price; the SL/TP test is on equity / (qty * entry) - 1
+    - seq: entry sequence; `order` keeps held tickers in entry order, so exits and the equity sum
+      add up in the same order as the dict-based `sim_long_only_sl_tp`
+    Per bar, only held tickers that quote are compounded and tested (vectorized); Python-level work
+    is limited to the positions that cross a level and the new entries.
+    """
+
+    def __init__(self, cash: float, fee_bps: float, stop_loss: float, take_profit: float, n_tickers: int = 0):
+        self.cash = cash
+        self.fee = fee_bps / 1e4
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.held = np.zeros(n_tickers, dtype=bool)
+        self.equity = np.zeros(n_tickers)
+        self.qty = np.zeros(n_tickers)
+        self.entry = np.zeros(n_tickers)
+        self.seq = np.zeros(n_tickers, dtype=np.int64)
+        self.order = np.zeros(0, dtype=np.int64)
+        self._next_seq = 0
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def _reserve(self, n: int):
+        if n <= len(self.held):
+            return
+        grow = max(n, 2 * len(self.held))
+        for name in ("held", "equity", "qty", "entry", "seq"):
+            old = getattr(self, name)
+            new = np.zeros(grow, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def mark_and_exit(self, bars: Bars) -> int:
+        """Compound held positions that quote in `bars`, close those past SL/TP. Returns exits."""
+        if not len(self.order) or not len(bars.ticker):
+            return 0
+        self._reserve(int(bars.ticker.max()) + 1)
+        on = self.held[bars.ticker]
+        if not on.any():
+            return 0
+        t = bars.ticker[on]
+        self.equity[t] *= 1 + bars.ret[on]
+        cum = self.equity[t] / (self.qty[t] * self.entry[t]) - 1.0
+        hit = t[(cum <= self.stop_loss) | (cum >= self.take_profit)]
+        if not len(hit):
+            return 0
+        for k in hit[np.argsort(self.seq[hit])]:
+            self.cash += float(self.equity[k]) * (1 - self.fee)
+        self.held[hit] = False
+        self.order = self.order[self.held[self.order]]
+        return len(hit)
+
+    def enter(self, bars: Bars, threshold: float, max_concurrent: int) -> int:
+        """
+        Fill free slots with the bar's best probabilities >= threshold, splitting free cash evenly.
+        As in the reference, a candidate already held is re-entered (its previous position is
+        replaced and keeps its place in the entry order). Returns entries.
+        """
+        slots = max(0, max_concurrent - len(self.order))
+        if not slots or not len(bars.ticker):
+            return 0
+        ranked = desc_order(bars.prob)
+        ranked = ranked[bars.prob[ranked] >= threshold][:slots]
+        if not len(ranked):
+            return 0
+        alloc_per = self.cash / len(ranked)
+        if alloc_per <= 0:
+            return 0
+        self._reserve(int(bars.ticker.max()) + 1)
+        for j in ranked:
+            k = bars.ticker[j]
+            invest = alloc_per * (1 - self.fee)
+            price = float(bars.price[j])
+            self.qty[k] = invest / price
+            self.entry[k] = price
+            self.equity[k] = invest
+            if not self.held[k]:
+                self.held[k] = True
+                self.seq[k] = self._next_seq
+                self._next_seq += 1
+                self.order = np.append(self.order, k)
+            self.cash -= alloc_per
+        return len(ranked)
+
+    def total(self) -> float:
+        """Cash plus position equity, summed left to right in entry order."""
+        if not len(self.order):
+            return self.cash
+        return self.cash + float(np.cumsum(self.equity[self.order])[-1])
+
+
+def sim_sl_tp_events(
+    bars: Iterable[Bars],
+    threshold: float = 0.6,
+    stop_loss: float = -0.03,
+    take_profit: float = 0.06,
+    fee_bps: float = 5.0,
+    max_concurrent: int = 3,
+    initial_capital: float = 10000.0,
+    n_tickers: int = 0,
+    tracker: Optional[StreamingKPIs] = None,
+) -> pd.DataFrame:
+    """
+    Event-driven long-only SL/TP simulation over a time-ordered stream of `Bars` (daily or
+    intraday). On every bar: mark and exit positions past their levels, enter the best new
+    signals into free slots, record total equity. With daily bars (`panel_bars`) the result equals
+    `sim_long_only_sl_tp` / `sim_long_only_sl_tp_fast` exactly.
+    Returns one row per bar: Date (the bar's timestamp), strategy_ret, equity; `tracker`
+    (optional) receives every bar's return.
+    """
+    book = SLTPBook(initial_capital, fee_bps, stop_loss, take_profit, n_tickers)
+    stamps, rets, curve = [], [], []
+    start = time.perf_counter()
+    for b in bars:
+        book.mark_and_exit(b)
+        book.enter(b, threshold, max_concurrent)
+        total = book.total()
+        rets.append(total / curve[-1] - 1.0 if curve else 0.0)
+        curve.append(total)
+        stamps.append(b.time)
+        if tracker is not None:
+            tracker.update(rets[-1])
+    record("sim_sl_tp_events/bar_loop", time.perf_counter() - start, rows=len(stamps))
+    return pd.DataFrame({"Date": pd.to_datetime(stamps), "strategy_ret": rets, "equity": curve})
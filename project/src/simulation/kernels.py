@@ -0,0 +1,128 @@
+import numpy as np
+from typing import Sequence
+from src.simulation.panel import DayOrder
+
+
+def _per_date_sum(values: np.ndarray, dates: np.ndarray, n_dates: int) -> np.ndarray:
+    """Sum (..., J) values into (..., n_dates) buckets given the date index of each of the J rows."""
+    lead = values.shape[:-1]
+    n_combos = int(np.prod(lead)) if lead else 1
+    idx = (np.arange(n_combos)[:, None] * n_dates + dates[None, :]).ravel()
+    out = np.bincount(idx, weights=values.reshape(n_combos, -1).ravel(), minlength=n_combos * n_dates)
+    return out.reshape(*lead, n_dates)
+
+
+def long_only_threshold_returns(
+    order: DayOrder,
+    thresholds: Sequence[float],
+    fee_bps: Sequence[float],
+    max_concurrent: int = 3,
+) -> np.ndarray:
+    """
+    Daily returns of the long-only threshold strategy for every (threshold, fee) pair at once.
+    Returns an array of shape (len(thresholds), len(fee_bps), n_dates).
+    - A row holds a position when it is in the day's top-N by prob and prob >= threshold.
+    - Entry cost lands on the entry row, exit cost on the ticker's next row; the day's
+      return is the mean over all rows of that date with a known next-day return.
+    - Only top-N rows can hold a position, so the work is O(dates x N x params).
+    """
+    thr = np.asarray(thresholds, dtype=float)[:, None]
+    fee = np.asarray(fee_bps, dtype=float) / 1e4
+    n_dates = len(order.dates)
+
+    valid = ~np.isnan(order.ret)
+    top = order.rank_desc <= max_concurrent
+    rows = np.flatnonzero(top & (order.prob >= thr.min()))
+
+    def _selected(r: np.ndarray) -> np.ndarray:
+        # Selection of rows r for every threshold; r == -1 means "no such row"
+        safe = np.where(r >= 0, r, 0)
+        return (r >= 0) & top[safe] & (order.prob[safe] >= thr)
+
+    sel = _selected(rows)
+    pr, nx = order.prev_row[rows], order.next_row[rows]
+    entries = sel & (pr >= 0) & ~_selected(pr) & valid[rows]
+    exits = sel & (nx >= 0) & ~_selected(nx) & valid[np.where(nx >= 0, nx, 0)]
+
+    di = order.date_idx[rows]
+    gain = _per_date_sum(np.where(sel & valid[rows], np.nan_to_num(order.ret[rows]), 0.0), di, n_dates)
+    changes = _per_date_sum(entries.astype(float), di, n_dates)
+    changes += _per_date_sum(exits.astype(float), order.date_idx[np.where(nx >= 0, nx, 0)], n_dates)
+
+    n_rows = np.bincount(order.date_idx, weights=valid, minlength=n_dates)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = (gain[:, None, :] - fee[None, :, None] * changes[:, None, :]) / n_rows
+    return out
+
+
+def long_short_threshold_returns(
+    order: DayOrder,
+    buy_thresholds: Sequence[float],
+    short_thresholds: Sequence[float],
+    fee_bps: Sequence[float],
+    max_concurrent: int = 3,
+) -> np.ndarray:
+    """
+    Daily returns of the long-short threshold strategy for every (buy_thr, short_thr, fee) triple.
+    Returns an array of shape (len(buy), len(short), len(fee_bps), n_dates).
+    - Long: top-N with prob >= buy_thr; short: bottom-N with prob <= 1 - short_thr (short wins).
+    - Cost is the position change vs the ticker's previous row (none on its first row).
+    - Equal weight over the day's open positions; 0.0 on days without positions.
+    """
+    buy = np.asarray(buy_thresholds, dtype=float)[:, None, None]
+    short = 1 - np.asarray(short_thresholds, dtype=float)[None, :, None]
+    fee = np.asarray(fee_bps, dtype=float) / 1e4
+    n_dates = len(order.dates)
+
+    top = order.rank_desc <= max_concurrent
+    bottom = order.rank_asc <= max_concurrent
+    rows = np.flatnonzero(top | bottom)
+
+    def _position(r: np.ndarray) -> np.ndarray:
+        safe = np.where(r >= 0, r, 0)
+        p = order.prob[safe]
+        is_long = top[safe] & (p >= buy)
+        is_short = bottom[safe] & (p <= short)
+        return np.where(is_short, -1.0, np.where(is_long, 1.0, 0.0))
+
+    pos = _position(rows)
+    pr = order.prev_row[rows]
+    turnover = np.where(pr >= 0, np.abs(pos - _position(pr)), 0.0)
+
+    active = pos != 0
+    ret = order.ret[rows]
+    finite = ~np.isnan(ret)
+    di = order.date_idx[rows]
+    gain = _per_date_sum(np.where(active & finite, pos * np.nan_to_num(ret), 0.0), di, n_dates)
+    cost = _per_date_sum(np.where(active & finite, turnover, 0.0), di, n_dates)
+    n_active = _per_date_sum(active.astype(float), di, n_dates)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = (gain[..., None, :] - fee[:, None] * cost[..., None, :]) / n_active[..., None, :]
+    return np.where(n_active[..., None, :] > 0, out, 0.0)
+
+
+def long_only_threshold_rows(order: DayOrder, threshold: float, fee_bps: float, max_concurrent: int = 3):
+    """
+    Per-row parts of the long-only threshold return for one parameter set: the day's return is
+    sum(num) / sum(den) over its rows (NaN without rows). Used to re-weight tickers.
+    """
+    valid = ~np.isnan(order.ret)
+    pos = ((order.rank_desc <= max_concurrent) & (order.prob >= threshold)).astype(float)
+    prev = np.where(order.prev_row >= 0, pos[order.prev_row], pos)
+    num = np.where(valid, pos * np.nan_to_num(order.ret) - fee_bps / 1e4 * np.abs(pos - prev), 0.0)
+    return num, valid.astype(float)
+
+
+def long_short_threshold_rows(
+    order: DayOrder, buy_thr: float, short_thr: float, fee_bps: float, max_concurrent: int = 3
+):
+    """Per-row parts of the long-short threshold return (sum(num) / sum(den); 0.0 without positions)."""
+    is_long = (order.rank_desc <= max_concurrent) & (order.prob >= buy_thr)
+    is_short = (order.rank_asc <= max_concurrent) & (order.prob <= 1 - short_thr)
+    pos = np.where(is_short, -1.0, np.where(is_long, 1.0, 0.0))
+    prev = np.where(order.prev_row >= 0, pos[order.prev_row], pos)
+    active = pos != 0
+    finite = ~np.isnan(order.ret)
+    num = np.where(active & finite, pos * np.nan_to_num(order.ret) - fee_bps / 1e4 * np.abs(pos - prev), 0.0)
+    return num, active.astype(float)
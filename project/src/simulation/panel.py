@@ -0,0 +1,174 @@
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class MarketPanel:
+    """
+    Dense date x ticker view of a long (Date, ticker) frame.
+    - dates/tickers: sorted axis labels
+    - price, ret (next-day return), prob: float64 matrices, NaN where no row exists
+    - present: True where the long frame has a row for (date, ticker)
+    """
+    dates: np.ndarray
+    tickers: np.ndarray
+    price: np.ndarray
+    ret: np.ndarray
+    prob: np.ndarray
+    present: np.ndarray
+
+
+def build_panel(
+    df: pd.DataFrame,
+    prob_col: str,
+    date_col: str = "Date",
+    ret_col: str = "target_return_1d",
+) -> MarketPanel:
+    """
+    Pivot the long frame once into dense matrices (one pass, no per-date filtering).
+    Duplicate (date, ticker) rows keep the first occurrence, like `.iloc[0]` lookups do.
+    """
+    date_idx, dates = pd.factorize(pd.to_datetime(df[date_col]), sort=True)
+    tick_idx, tickers = pd.factorize(df["ticker"], sort=True)
+    n_dates, n_tickers = len(dates), len(tickers)
+
+    keep = ~pd.Series(date_idx * n_tickers + tick_idx).duplicated().to_numpy()
+    di, ti = date_idx[keep], tick_idx[keep]
+
+    def _dense(col: str) -> np.ndarray:
+        out = np.full((n_dates, n_tickers), np.nan)
+        out[di, ti] = df[col].to_numpy(dtype=float)[keep]
+        return out
+
+    present = np.zeros((n_dates, n_tickers), dtype=bool)
+    present[di, ti] = True
+
+    return MarketPanel(
+        dates=np.asarray(dates),
+        tickers=np.asarray(tickers),
+        price=_dense("price"),
+        ret=_dense(ret_col),
+        prob=_dense(prob_col),
+        present=present,
+    )
+
+
+def desc_order(values: np.ndarray) -> np.ndarray:
+    """
+    Indices that sort `values` descending with NaNs last.
+    Mirrors `DataFrame.sort_values(col, ascending=False)` exactly, including how ties are ordered.
+    """
+    nan = np.isnan(values)
+    idx = np.arange(len(values))
+    non_nan_idx = idx[~nan][::-1]
+    order = non_nan_idx[values[~nan][::-1].argsort(kind="quicksort")][::-1]
+    return np.concatenate([order, idx[nan]])
+
+
+@dataclass(frozen=True)
+class DayOrder:
+    """
+    Sparse per-row view of a long (Date, ticker) frame, shared by the threshold strategies.
+    Rows are in (date, ticker) order; memory is O(rows), whatever the number of tickers.
+    - dates: sorted unique dates; date_idx / ticker_idx: date and ticker index of each row
+    - prob, ret: float64 per row
+    - rank_desc / rank_asc: per-date ordinal rank of `prob` (1 = first), as
+      `groupby("Date").rank(method="first")` on the sorted frame; NaN probs rank after all
+    - prev_row / next_row: row of the same ticker on its previous / next date (-1 if none)
+    """
+    dates: np.ndarray
+    date_idx: np.ndarray
+    ticker_idx: np.ndarray
+    prob: np.ndarray
+    ret: np.ndarray
+    rank_desc: np.ndarray
+    rank_asc: np.ndarray
+    prev_row: np.ndarray
+    next_row: np.ndarray
+
+
+def build_day_order(
+    df: pd.DataFrame,
+    prob_col: str,
+    date_col: str = "Date",
+    ret_col: str = "target_return_1d",
+) -> DayOrder:
+    """Sort the long frame once by (date, ticker) and precompute ranks and ticker neighbours."""
+    date_idx, dates = pd.factorize(pd.to_datetime(df[date_col]), sort=True)
+    tick_idx, tickers = pd.factorize(df["ticker"], sort=True)
+    # One int64 key sorts by (date, ticker); a stable sort keeps duplicate rows in frame order
+    rows = np.argsort(date_idx.astype(np.int64) * len(tickers) + tick_idx, kind="stable")
+    return _day_order(
+        np.asarray(dates), date_idx[rows], tick_idx[rows],
+        df[prob_col].to_numpy(dtype=float)[rows], df[ret_col].to_numpy(dtype=float)[rows],
+    )
+
+
+def panel_day_order(panel: MarketPanel) -> DayOrder:
+    """`DayOrder` of the rows present in a panel (same result as `build_day_order` on its frame)."""
+    di, ti = np.nonzero(panel.present)
+    return _day_order(panel.dates, di, ti, panel.prob[di, ti], panel.ret[di, ti])
+
+
+def _day_order(dates, date_idx, tick_idx, prob, ret) -> DayOrder:
+    # Rows arrive sorted by (date, ticker)
+    n = len(date_idx)
+    date_idx = date_idx.astype(np.int32)
+    starts = np.searchsorted(date_idx, np.arange(len(dates)))
+
+    # One stable sort by (date, prob): ties keep ticker order, NaNs go last within a date
+    order = np.lexsort((prob, date_idx))
+    p, d = prob[order], date_idx[order]
+    pos = np.arange(n) - starts[d]
+    n_valid = np.bincount(date_idx, weights=~np.isnan(prob), minlength=len(dates)).astype(np.int64)
+
+    # Tie blocks of equal prob within a date give the descending rank without a second sort
+    k = np.arange(n)
+    new_block = np.ones(n, dtype=bool)
+    new_block[1:] = (d[1:] != d[:-1]) | (p[1:] != p[:-1])
+    end_block = np.ones(n, dtype=bool)
+    end_block[:-1] = new_block[1:]
+    block_start = np.maximum.accumulate(np.where(new_block, k, 0))
+    block_end = np.minimum.accumulate(np.where(end_block, k + 1, n)[::-1])[::-1]
+    desc = n_valid[d] - (block_end - starts[d]) + (k - block_start) + 1
+
+    nan = np.isnan(p)
+    big = np.iinfo(np.int32).max
+    rank_asc = np.empty(n, dtype=np.int32)
+    rank_desc = np.empty(n, dtype=np.int32)
+    rank_asc[order] = np.where(nan, big, pos + 1)
+    rank_desc[order] = np.where(nan, big, desc)
+
+    # Ticker neighbours: a stable sort by ticker leaves each ticker's rows in date order
+    by_ticker = np.argsort(tick_idx, kind="stable")
+    same = tick_idx[by_ticker][1:] == tick_idx[by_ticker][:-1]
+    prev_row = np.full(n, -1, dtype=np.int64)
+    next_row = np.full(n, -1, dtype=np.int64)
+    prev_row[by_ticker[1:][same]] = by_ticker[:-1][same]
+    next_row[by_ticker[:-1][same]] = by_ticker[1:][same]
+
+    return DayOrder(
+        dates=np.asarray(dates), date_idx=date_idx, ticker_idx=np.asarray(tick_idx), prob=prob, ret=ret,
+        rank_desc=rank_desc, rank_asc=rank_asc, prev_row=prev_row, next_row=next_row,
+    )
+
+
+@dataclass(frozen=True)
+class Market:
+    """
+    Everything a registered strategy reads, built once per backtest and shared by all of them:
+    the dense `panel` and the sparse per-date `order` of the same frame. Arrays are read-only.
+    """
+    panel: MarketPanel
+    order: DayOrder
+
+
+def build_market(df: pd.DataFrame, prob_col: str, date_col: str = "Date", ret_col: str = "target_return_1d") -> Market:
+    """Pivot once, derive the per-date order from the panel, and freeze every array."""
+    panel = build_panel(df, prob_col, date_col, ret_col)
+    market = Market(panel=panel, order=panel_day_order(panel))
+    for part in (market.panel, market.order):
+        for name in part.__dataclass_fields__:
+            getattr(part, name).flags.writeable = False
+    return market
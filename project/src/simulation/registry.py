@@ -0,0 +1,109 @@
+import importlib
+import time
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+from src.simulation.kernels import long_only_threshold_rows, long_short_threshold_rows
+from src.simulation.panel import Market
+from src.utils_profile import span, submit
+from src.simulation.strategies import (
+    sim_long_only_sl_tp_fast,
+    sim_long_only_threshold,
+    sim_long_short_threshold,
+)
+
+# name -> fn(market, sim_cfg) returning a daily frame with Date, strategy_ret, equity
+STRATEGIES: Dict[str, Callable[[Market, dict], pd.DataFrame]] = {}
+
+
+def register(name: str):
+    """Decorator adding a strategy to the registry under `name`."""
+    def wrap(fn):
+        STRATEGIES[name] = fn
+        return fn
+    return wrap
+
+
+def resolve(name: str) -> Callable[[Market, dict], pd.DataFrame]:
+    """
+    A registered name, or "package.module:function" for strategies that live outside this
+    package (imported on demand, so new strategies need no pipeline change).
+    """
+    if name in STRATEGIES:
+        return STRATEGIES[name]
+    if ":" in name:
+        module, fn = name.split(":", 1)
+        return getattr(importlib.import_module(module), fn)
+    raise ValueError(f"Unknown strategy '{name}'. Registered: {sorted(STRATEGIES)}")
+
+
+def _max_concurrent(sim: dict) -> int:
+    return sim.get("capital", {}).get("max_concurrent_positions", 3)
+
+
+@register("long_only_threshold")
+def long_only_threshold(market: Market, sim: dict) -> pd.DataFrame:
+    return sim_long_only_threshold(
+        None, None,
+        threshold=sim["thresholds"]["buy_prob"],
+        fee_bps=sim["costs"]["fee_bps"],
+        max_concurrent=_max_concurrent(sim),
+        order=market.order,
+    )
+
+
+@register("long_short_threshold")
+def long_short_threshold(market: Market, sim: dict) -> pd.DataFrame:
+    return sim_long_short_threshold(
+        None, None,
+        buy_thr=sim["thresholds"]["buy_prob"],
+        short_thr=sim["thresholds"]["short_prob"],
+        fee_bps=sim["costs"]["fee_bps"],
+        max_concurrent=_max_concurrent(sim),
+        order=market.order,
+    )
+
+
+@register("long_only_sl_tp")
+def long_only_sl_tp(market: Market, sim: dict) -> pd.DataFrame:
+    return sim_long_only_sl_tp_fast(
+        None, None,
+        threshold=sim["thresholds"]["buy_prob"],
+        stop_loss=sim["risk"]["stop_loss"],
+        take_profit=sim["risk"]["take_profit"],
+        fee_bps=sim["costs"]["fee_bps"],
+        max_concurrent=_max_concurrent(sim),
+        initial_capital=sim.get("capital", {}).get("initial", 10000.0),
+        panel=market.panel,
+    )
+
+
+# name -> fn(market, sim_cfg) returning per-row (num, den, empty) with daily return
+# sum(num) / sum(den) (`empty` on days without rows); enables the ticker bootstrap
+ROW_PARTS: Dict[str, Callable[[Market, dict], tuple]] = {
+    "long_only_threshold": lambda market, sim: long_only_threshold_rows(
+        market.order, sim["thresholds"]["buy_prob"], sim["costs"]["fee_bps"], _max_concurrent(sim)
+    ) + (float("nan"),),
+    "long_short_threshold": lambda market, sim: long_short_threshold_rows(
+        market.order, sim["thresholds"]["buy_prob"], sim["thresholds"]["short_prob"],
+        sim["costs"]["fee_bps"], _max_concurrent(sim),
+    ) + (0.0,),
+}
+
+
+def _timed(name: str, fn, market: Market, sim: dict) -> Tuple[pd.DataFrame, float]:
+    start = time.perf_counter()
+    with span(f"strategy:{name}", rows=len(market.order.date_idx)):
+        daily = fn(market, sim)
+    return daily, time.perf_counter() - start
+
+
+def run_strategies(market: Market, sim: dict, names: List[str], workers: int = 0) -> Dict[str, Tuple[pd.DataFrame, float]]:
+    """
+    Run the named strategies on one shared `market` in a thread pool (`workers`, 0 = one
+    per strategy). Returns {name: (daily frame, seconds)} in the order of `names`.
+    """
+    fns = {name: resolve(name) for name in names}
+    with ThreadPoolExecutor(max_workers=workers or max(len(fns), 1)) as pool:
+        futures = {name: submit(pool, _timed, name, fn, market, sim) for name, fn in fns.items()}
+        return {name: f.result() for name, f in futures.items()}
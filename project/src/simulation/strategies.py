@@ -1,6 +1,58 @@
+import time
 import pandas as pd
 import numpy as np
 from typing import Optional
+from src.simulation.kernels import long_only_threshold_returns, long_short_threshold_returns
+from src.simulation.panel import DayOrder, MarketPanel, build_day_order, build_panel, desc_order
+from src.utils_metrics import StreamingKPIs
+from src.utils_profile import record
+
+def _daily_frame(dates: np.ndarray, strategy_ret: np.ndarray, initial_capital: float = 10000.0) -> pd.DataFrame:
+    """One row per date: strategy return and equity (NaN returns count as flat days)."""
+    daily = pd.DataFrame({"Date": pd.to_datetime(dates), "strategy_ret": strategy_ret})
+    daily["equity"] = initial_capital * (1 + daily["strategy_ret"].fillna(0)).cumprod()
+    return daily
+
+def sim_long_only_threshold(
+    df: pd.DataFrame,
+    prob_col: str,
+    threshold: float = 0.6,
+    fee_bps: float = 5.0,
+    max_concurrent: int = 3,
+    order: Optional[DayOrder] = None,
+) -> pd.DataFrame:
+    """
+    Vectorized daily portfolio:
+    - Each day, pick up to top-N tickers where prob >= threshold.
+    - Equal-weight over all of the day's rows (unselected rows contribute 0).
+    - Apply costs when entering/exiting a ticker.
+    Array ops only (see `src.simulation.kernels`); pass a shared `order` to skip the sort.
+    """
+    if order is None:
+        order = build_day_order(df, prob_col)
+    ret = long_only_threshold_returns(order, [threshold], [fee_bps], max_concurrent)[0, 0]
+    return _daily_frame(order.dates, ret)
+
+def sim_long_short_threshold(
+    df: pd.DataFrame,
+    prob_col: str,
+    buy_thr: float = 0.6,
+    short_thr: float = 0.6,
+    fee_bps: float = 5.0,
+    max_concurrent: int = 3,
+    order: Optional[DayOrder] = None,
+) -> pd.DataFrame:
+    """
+    Long-Short daily portfolio:
+    - Long if prob >= buy_thr (pick top-N)
+    - Short if prob <= 1 - short_thr (pick bottom-N)
+    - Equal-weight among chosen longs and shorts; 0 on days without positions.
+    Array ops only (see `src.simulation.kernels`); pass a shared `order` to skip the sort.
+    """
+    if order is None:
+        order = build_day_order(df, prob_col)
+    ret = long_short_threshold_returns(order, [buy_thr], [short_thr], [fee_bps], max_concurrent)[0, 0, 0]
+    return _daily_frame(order.dates, ret)
 
 def _apply_costs(position: pd.Series, fee_bps: float) -> pd.Series:
     """
@@ -10,12 +62,7 @@ def _apply_costs(position: pd.Series, fee_bps: float) -> pd.Series:
     change = position.diff().abs().fillna(0)
     return change * (fee_bps / 1e4)
 
-def _aggregate_daily(df: pd.DataFrame, ret_col: str = "ret_1d") -> pd.DataFrame:
-    """Ensure daily aggregation by date across tickers exists."""
-    daily = df.groupby("Date", as_index=False).agg({ret_col: "mean"})
-    return daily
-
-def sim_long_only_threshold(
+def sim_long_only_threshold_ref(
     df: pd.DataFrame,
     prob_col: str,
     threshold: float = 0.6,
@@ -23,10 +70,8 @@ def sim_long_only_threshold(
     max_concurrent: int = 3,
 ) -> pd.DataFrame:
     """
-    Vectorized daily portfolio:
-    - Each day, pick up to top-N tickers where prob >= threshold.
-    - Equal-weight them for that day.
-    - Apply costs when entering/exiting a ticker.
+    Pandas reference for `sim_long_only_threshold` (groupby ranks and per-ticker costs).
+    Slow; kept to check the kernels against (equal up to float summation order).
     """
     df = df.copy()
     df["Date"] = pd.to_datetime(df["Date"])
@@ -34,16 +79,12 @@ def sim_long_only_threshold(
 
     # Rank by prob per day, select top-N >= threshold
     df["rank_prob"] = df.groupby("Date")[prob_col].rank(ascending=False, method="first")
-    df["selected"] = ((df[prob_col] >= threshold) & (df["rank_prob"] <= max_concurrent)).astype(int)
-
-    # Position per row
-    df["position"] = df["selected"]
+    df["position"] = ((df[prob_col] >= threshold) & (df["rank_prob"] <= max_concurrent)).astype(int)
 
     # Per-ticker transaction costs when position changes
-    df["pos_change_cost"] = df.groupby("ticker")["position"].apply(lambda s: _apply_costs(s, fee_bps))
+    df["pos_change_cost"] = df.groupby("ticker")["position"].transform(lambda s: _apply_costs(s, fee_bps))
 
     # Strategy return per row: next-day return * position - costs
-    # Use actual next-day return already provided as "target_return_1d"
     df["row_ret"] = df["position"] * df["target_return_1d"] - df["pos_change_cost"]
 
     # Aggregate equal-weighted per day
@@ -51,7 +92,7 @@ def sim_long_only_threshold(
     daily["equity"] = 10000 * (1 + daily["strategy_ret"].fillna(0)).cumprod()
     return daily
 
-def sim_long_short_threshold(
+def sim_long_short_threshold_ref(
     df: pd.DataFrame,
     prob_col: str,
     buy_thr: float = 0.6,
@@ -60,10 +101,8 @@ def sim_long_short_threshold(
     max_concurrent: int = 3,
 ) -> pd.DataFrame:
     """
-    Long-Short daily portfolio:
-    - Long if prob >= buy_thr (pick top-N)
-    - Short if prob <= 1 - short_thr (pick bottom-N)
-    - Equal-weight among chosen longs and shorts.
+    Pandas reference for `sim_long_short_threshold` (groupby ranks, per-date apply).
+    Slow; kept to check the kernels against (equal up to float summation order).
     """
     df = df.copy()
     df["Date"] = pd.to_datetime(df["Date"])
@@ -71,16 +110,16 @@ def sim_long_short_threshold(
 
     # Ranks for top and bottom
     df["rank_desc"] = df.groupby("Date")[prob_col].rank(ascending=False, method="first")
-    df["rank_asc"]  = df.groupby("Date")[prob_col].rank(ascending=True, method="first")
+    df["rank_asc"] = df.groupby("Date")[prob_col].rank(ascending=True, method="first")
 
-    long_mask  = (df[prob_col] >= buy_thr) & (df["rank_desc"] <= max_concurrent)
-    short_mask = (df[prob_col] <= (1 - short_thr)) & (df["rank_asc"]  <= max_concurrent)
+    long_mask = (df[prob_col] >= buy_thr) & (df["rank_desc"] <= max_concurrent)
+    short_mask = (df[prob_col] <= (1 - short_thr)) & (df["rank_asc"] <= max_concurrent)
 
     df["position"] = 0
-    df.loc[long_mask,  "position"] = 1
+    df.loc[long_mask, "position"] = 1
     df.loc[short_mask, "position"] = -1
 
-    df["pos_change_cost"] = df.groupby("ticker")["position"].apply(lambda s: _apply_costs(s, fee_bps))
+    df["pos_change_cost"] = df.groupby("ticker")["position"].transform(lambda s: _apply_costs(s, fee_bps))
 
     # If short, the return contribution is - target_return_1d (we profit if price goes down)
     df["row_ret"] = df["position"] * df["target_return_1d"] - df["pos_change_cost"]
@@ -91,10 +130,9 @@ def sim_long_short_threshold(
         if pos.sum() == 0:
             return pd.Series({"strategy_ret": 0.0})
         weights = pos / pos.sum()
-        ret = (weights * group["row_ret"]).sum()
-        return pd.Series({"strategy_ret": ret})
+        return pd.Series({"strategy_ret": (weights * group["row_ret"]).sum()})
 
-    daily = df.groupby("Date").apply(_daily_ret).reset_index()
+    daily = df.groupby("Date")[["position", "row_ret"]].apply(_daily_ret).reset_index()
     daily["equity"] = 10000 * (1 + daily["strategy_ret"].fillna(0)).cumprod()
     return daily
 
@@ -132,6 +170,7 @@ def sim_long_only_sl_tp(
 
     # Construct helper: next-day returns table
     # We'll iterate by date; for each ticker on a date we know target_return_1d for next day.
+    start = time.perf_counter()
     for idx_date, d in enumerate(dates):
         day_df = df[df["Date"] == d].copy()
         # 1) Close existing positions based on SL/TP if triggered by cumulative return since entry.
@@ -192,7 +231,93 @@ def sim_long_only_sl_tp(
             daily_returns.append((d, (total_equity / prev) - 1.0))
         else:
             daily_returns.append((d, 0.0))
+    record("sim_long_only_sl_tp/date_loop", time.perf_counter() - start, rows=len(dates))
 
     sim = pd.DataFrame(daily_returns, columns=["Date", "strategy_ret"]).sort_values("Date")
     sim["equity"] = [e for _, e in sorted(equity_curve, key=lambda x: x[0])]
     return sim
+
+def sim_long_only_sl_tp_fast(
+    df: pd.DataFrame,
+    prob_col: str,
+    threshold: float = 0.6,
+    stop_loss: float = -0.03,
+    take_profit: float = 0.06,
+    fee_bps: float = 5.0,
+    max_concurrent: int = 3,
+    initial_capital: float = 10000.0,
+    panel: Optional[MarketPanel] = None,
+    tracker: Optional[StreamingKPIs] = None,
+) -> pd.DataFrame:
+    """
+    Array-backed version of `sim_long_only_sl_tp` (same rules, same equity curve).
+    - Pivots the frame once into date x ticker matrices (or reuses `panel`).
+    - Steps through dates with integer indexing only; positions are keyed by ticker column.
+    - `tracker` (optional) is updated with every day's return, so KPIs can be read while it runs.
+    `sim_long_only_sl_tp` stays as the reference implementation to check this against.
+    """
+    if panel is None:
+        panel = build_panel(df, prob_col)
+
+    cash = initial_capital
+    positions = {}  # ticker column -> {"entry_price": float, "qty": float, "equity": float}
+    equity_curve = []
+    daily_returns = []
+
+    fee = fee_bps / 1e4
+
+    start = time.perf_counter()
+    for i in range(len(panel.dates)):
+        present = panel.present[i]
+
+        # 1) Close existing positions on SL/TP (cumulative return since entry)
+        to_close = []
+        for t, pos in positions.items():
+            if not present[t]:
+                continue
+            pos["equity"] *= (1 + float(panel.ret[i, t]))
+            cum_ret_since_entry = pos["equity"] / (pos["qty"] * pos["entry_price"]) - 1.0
+            if cum_ret_since_entry <= stop_loss or cum_ret_since_entry >= take_profit:
+                cash += pos["equity"] * (1 - fee)
+                to_close.append(t)
+        for t in to_close:
+            positions.pop(t, None)
+
+        # 2) Open new positions: best probabilities >= threshold, into free slots
+        slots = max(0, max_concurrent - len(positions))
+        if slots:
+            cols = np.flatnonzero(present)
+            ranked = cols[desc_order(panel.prob[i, cols])]
+            new_opens = ranked[panel.prob[i, ranked] >= threshold][:slots].tolist()
+        else:
+            new_opens = []
+
+        if new_opens:
+            # Split current free cash evenly across the new entries (no rebalancing)
+            alloc_per = cash / max(len(new_opens), 1)
+            for t in new_opens:
+                if alloc_per <= 0:
+                    continue
+                price = float(panel.price[i, t])
+                invest = alloc_per * (1 - fee)
+                qty = invest / price
+                positions[t] = {"entry_price": price, "qty": qty, "equity": invest}
+                cash -= alloc_per
+
+        # 3) Total equity at end of day
+        pos_equity = sum(p["equity"] for p in positions.values())
+        total_equity = cash + pos_equity
+        if equity_curve:
+            daily_returns.append((total_equity / equity_curve[-1]) - 1.0)
+        else:
+            daily_returns.append(0.0)
+        equity_curve.append(total_equity)
+        if tracker is not None:
+            tracker.update(daily_returns[-1])
+    record("sim_long_only_sl_tp_fast/date_loop", time.perf_counter() - start, rows=len(panel.dates))
+
+    return pd.DataFrame({
+        "Date": pd.to_datetime(panel.dates),
+        "strategy_ret": daily_returns,
+        "equity": equity_curve,
+    })
@@ -0,0 +1,64 @@
+import itertools
+import pandas as pd
+from typing import Dict, List, Optional
+from src.simulation.panel import DayOrder, MarketPanel, panel_day_order
+from src.simulation.kernels import long_only_threshold_returns, long_short_threshold_returns
+from src.simulation.strategies import sim_long_only_sl_tp_fast
+from src.utils_metrics import compute_kpis
+
+PARAM_COLS = ["strategy", "buy_prob", "short_prob", "stop_loss", "take_profit", "fee_bps"]
+
+
+def _kpis(returns, initial_capital: float = 10000.0) -> Dict[str, float]:
+    sim = pd.DataFrame({"strategy_ret": returns})
+    sim["equity"] = initial_capital * (1 + sim["strategy_ret"].fillna(0)).cumprod()
+    return compute_kpis(sim)
+
+
+def run_sweep(
+    panel: MarketPanel,
+    grid: Dict[str, List[float]],
+    max_concurrent: int = 3,
+    order: Optional[DayOrder] = None,
+) -> pd.DataFrame:
+    """
+    Evaluate every parameter combination of `grid` on one precomputed panel.
+    - grid keys: buy_prob, short_prob, stop_loss, take_profit, fee_bps (lists of values)
+    - threshold strategies: ranks and cost events are computed once (`order`, derived from
+      the panel if not given) and broadcast over the parameter axes (see `src.simulation.kernels`)
+    - long_only_sl_tp is path-dependent, so it runs once per combination on the shared panel
+    Returns a tidy table: one row per (strategy, params) with `compute_kpis` columns.
+    """
+    if order is None:
+        order = panel_day_order(panel)
+    rows = []
+
+    lo = long_only_threshold_returns(order, grid["buy_prob"], grid["fee_bps"], max_concurrent)
+    for (a, buy), (f, fee) in itertools.product(enumerate(grid["buy_prob"]), enumerate(grid["fee_bps"])):
+        rows.append({"strategy": "long_only_threshold", "buy_prob": buy, "fee_bps": fee, **_kpis(lo[a, f])})
+
+    ls = long_short_threshold_returns(
+        order, grid["buy_prob"], grid["short_prob"], grid["fee_bps"], max_concurrent
+    )
+    for (a, buy), (b, short), (f, fee) in itertools.product(
+        enumerate(grid["buy_prob"]), enumerate(grid["short_prob"]), enumerate(grid["fee_bps"])
+    ):
+        rows.append({
+            "strategy": "long_short_threshold", "buy_prob": buy, "short_prob": short, "fee_bps": fee,
+            **_kpis(ls[a, b, f]),
+        })
+
+    for buy, sl, tp, fee in itertools.product(
+        grid["buy_prob"], grid["stop_loss"], grid["take_profit"], grid["fee_bps"]
+    ):
+        sim = sim_long_only_sl_tp_fast(
+            None, None, threshold=buy, stop_loss=sl, take_profit=tp, fee_bps=fee,
+            max_concurrent=max_concurrent, panel=panel,
+        )
+        rows.append({
+            "strategy": "long_only_sl_tp", "buy_prob": buy, "stop_loss": sl, "take_profit": tp, "fee_bps": fee,
+            **compute_kpis(sim),
+        })
+
+    out = pd.DataFrame(rows)
+    return out[PARAM_COLS + [c for c in out.columns if c not in PARAM_COLS]]
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# pandas (like pyarrow) is imported inside the readers/writers: path helpers and constants are
+# used by the CLI and the step table, which should start without loading it
+
+# Pipeline artifacts and the `paths` entry of the folder they live in
+ARTIFACTS = {
+    "unified_long": "interim_dir",
+    "dataset_features": "processed_dir",
+    "predictions": "processed_dir",
+}
+
+# Columns that are never model inputs
+META_COLS = ["Listing Exchange", "ETF"]
+NON_FEATURE_COLS = {"ticker", "price", "target_return_1d", "target_up", "year", *META_COLS}
+
+# Stored as float64: prices/returns compound in backtests, probabilities are compared to thresholds
+KEEP_FLOAT64 = {"price", "target_return_1d"}
+
+# Models steps 04/05 train and score (`<processed_dir>/<name>.joblib`)
+MODEL_NAMES = ["DecisionTree", "RandomForest", "XGBClassifier"]
+
+
+def _storage(cfg: dict) -> dict:
+    return {"format": "parquet", "partition_by": ["year"], **cfg.get("storage", {})}
+
+
+def artifact_path(cfg: dict, name: str) -> Path:
+    """`<dir>/<name>.parquet` (a dataset directory) or `<dir>/<name>.csv`."""
+    return Path(cfg["paths"][ARTIFACTS[name]]) / f"{name}.{_storage(cfg)['format']}"
+
+
+def artifact_exists(cfg: dict, name: str) -> bool:
+    return artifact_path(cfg, name).exists()
+
+
+def apply_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Explicit storage dtypes: float32 features, categorical strings; prices/targets/preds stay float64."""
+    import pandas as pd
+
+    out = {}
+    for c in df.columns:
+        s = df[c]
+        if s.dtype == "float64" and c not in KEEP_FLOAT64 and not c.startswith("pred_"):
+            s = s.astype("float32")
+        elif s.dtype == "object" or isinstance(s.dtype, pd.StringDtype):
+            s = s.astype("category")
+        out[c] = s
+    return pd.DataFrame(out, index=df.index)
+
+
+def feature_columns(dtypes: pd.Series, date_col: str) -> List[str]:
+    """Model inputs: numeric columns that are not identifiers, meta, targets or predictions."""
+    import pandas as pd
+
+    return [
+        c for c, t in dtypes.items()
+        if c != date_col and c not in NON_FEATURE_COLS and not c.startswith("pred_")
+        and pd.api.types.is_numeric_dtype(t)
+    ]
+
+
+def write_artifact(df: pd.DataFrame, cfg: dict, name: str, append: bool = False, part: Optional[int] = None) -> Path:
+    """
+    Write (or append to) an artifact.
+    - parquet: dataset directory, hive-partitioned by `storage.partition_by` ("ticker" and/or
+      "year"); appends add new files, so existing data is never rewritten
+    - part: number the files `part-<part>-*.parquet` instead of random names. Datasets read
+      their files in name order, so writers that append parts in row order (chunked or
+      sharded builds) read back in that order
+    - csv: single file, kept for compatibility
+    """
+    import pandas as pd
+
+    st = _storage(cfg)
+    path = artifact_path(cfg, name)
+
+    if st["format"] == "csv":
+        if append and path.exists():
+            df[pd.read_csv(path, nrows=0).columns].to_csv(path, mode="a", header=False, index=False)
+        else:
+            df.to_csv(path, index=False)
+        return path
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    parts = list(st["partition_by"])
+    df = apply_dtypes(df)
+    if "year" in parts:
+        df = df.assign(year=pd.to_datetime(df[cfg["data"]["date_col"]]).dt.year)
+    if not append and path.exists():
+        shutil.rmtree(path)
+    template = None if part is None else f"part-{part:05d}-{{i}}.parquet"
+    pq.write_to_dataset(
+        pa.Table.from_pandas(df, preserve_index=False), path, partition_cols=parts or None, basename_template=template,
+    )
+    return path
+
+
+def next_part(cfg: dict, name: str) -> int:
+    """Part number after every `part-<n>-*.parquet` file of an artifact (0 if there are none)."""
+    path = artifact_path(cfg, name)
+    if not path.is_dir():
+        return 0
+    numbers = [int(p.name.split("-")[1]) for p in path.rglob("part-*.parquet") if p.name.split("-")[1].isdigit()]
+    return max(numbers, default=-1) + 1
+
+
+def read_artifact(
+    cfg: dict,
+    name: str,
+    columns: Optional[List[str]] = None,
+    filters=None,
+) -> pd.DataFrame:
+    """
+    Read an artifact, optionally only `columns` (projection) and, for parquet, only the
+    partitions/rows matching pyarrow `filters` (e.g. [("year", ">=", 2020)]).
+    """
+    import pandas as pd
+
+    st = _storage(cfg)
+    path = artifact_path(cfg, name)
+
+    if st["format"] == "csv":
+        return pd.read_csv(path, usecols=columns)
+
+    df = pd.read_parquet(path, columns=columns, filters=filters)
+    if "year" in st["partition_by"] and "year" in df.columns and (columns is None or "year" not in columns):
+        df = df.drop(columns="year")
+    # Partition columns come back last; restore the requested / `<date>, ticker, ...` order
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    elif "ticker" in st["partition_by"]:
+        lead = [c for c in (cfg["data"]["date_col"], "ticker") if c in df.columns]
+        df = df[lead + [c for c in df.columns if c not in lead]]
+    # Partition discovery order is not alphabetical; keep categories sorted like plain strings
+    for c in df.columns:
+        if isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].cat.set_categories(sorted(df[c].cat.categories))
+    return df
+
+
+def iter_artifact(cfg: dict, name: str, columns: Optional[List[str]] = None, batch_rows: int = 100_000):
+    """
+    Yield an artifact as DataFrames of exactly `batch_rows` rows (the last one may be shorter), so
+    memory stays bounded: the Arrow data held is the remainder of the previous read plus one read
+    batch, under 2 x `batch_rows` rows.
+    """
+    import pandas as pd
+
+    path = artifact_path(cfg, name)
+    if _storage(cfg)["format"] == "csv":
+        yield from pd.read_csv(path, usecols=columns, chunksize=batch_rows)
+        return
+
+    import pyarrow as pa
+    import pyarrow.dataset as pds
+
+    dataset = pds.dataset(path, partitioning="hive")
+    columns = columns or [c for c in dataset.schema.names if c != "year"]
+    # Small readahead keeps memory bounded; small files/row groups are coalesced and the result is
+    # cut at batch_rows (slices are zero-copy, the remainder starts the next chunk)
+    batches = dataset.to_batches(columns=columns, batch_size=batch_rows, batch_readahead=1, fragment_readahead=1)
+    pending, n_pending = [], 0
+    for batch in batches:
+        pending.append(batch)
+        n_pending += batch.num_rows
+        if n_pending < batch_rows:
+            continue
+        table = pa.Table.from_batches(pending)
+        while table.num_rows >= batch_rows:
+            yield table.slice(0, batch_rows).to_pandas()
+            table = table.slice(batch_rows)
+        pending, n_pending = table.to_batches(), table.num_rows
+    if n_pending:
+        yield pa.Table.from_batches(pending).to_pandas()
+
+
+def artifact_schema(cfg: dict, name: str) -> pd.Series:
+    """Column dtypes without loading the data (CSV: inferred from the first rows)."""
+    import pandas as pd
+
+    path = artifact_path(cfg, name)
+    if _storage(cfg)["format"] == "csv":
+        return pd.read_csv(path, nrows=1000).dtypes
+
+    import pyarrow.dataset as pds
+
+    dtypes = pds.dataset(path, partitioning="hive").schema.empty_table().to_pandas().dtypes
+    return dtypes.drop("year", errors="ignore")
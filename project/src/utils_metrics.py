@@ -41,3 +41,91 @@ def compute_kpis(sim_df: pd.DataFrame, ret_col: str = "strategy_ret", ec_col: st
         "MaxDrawdown": round(float(max_drawdown(equity)), 6),
         "TotalReturn": round(float(equity.iloc[-1] / equity.iloc[0] - 1.0), 6),
     }
+
+class StreamingKPIs:
+    """
+    Online version of `compute_kpis`: O(1) work and memory per new day, no history kept.
+    - Sharpe: Welford running mean / variance of the finite returns (NaN days are skipped)
+    - MaxDrawdown: running equity peak
+    - CAGR / TotalReturn: compounded equity vs the first day's equity
+    `kpis()` at any point equals `compute_kpis` on the days seen so far.
+    """
+
+    def __init__(self, initial: float = 10000.0, periods_per_year: int = 252):
+        self.periods_per_year = periods_per_year
+        self.initial = initial
+        self.n_days = 0
+        self.n_ret = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.equity = initial
+        self.first_equity = None
+        self.peak = -np.inf
+        self.max_dd = 0.0
+
+    def update(self, ret: float) -> "StreamingKPIs":
+        """Add one day's return."""
+        self.n_days += 1
+        if ret is not None and not np.isnan(ret):
+            self.n_ret += 1
+            delta = ret - self.mean
+            self.mean += delta / self.n_ret
+            self.m2 += delta * (ret - self.mean)
+            self.equity *= 1.0 + ret
+        if self.first_equity is None:
+            self.first_equity = self.equity
+        self.peak = max(self.peak, self.equity)
+        self.max_dd = min(self.max_dd, self.equity / self.peak - 1.0)
+        return self
+
+    def kpis(self) -> Dict[str, float]:
+        """Current KPIs, rounded like `compute_kpis`."""
+        if self.n_days == 0:
+            return {"CAGR": 0.0, "Sharpe": 0.0, "MaxDrawdown": 0.0, "TotalReturn": 0.0}
+        total = self.equity / self.first_equity - 1.0
+        sigma = np.sqrt(self.m2 / self.n_ret) * np.sqrt(self.periods_per_year) if self.n_ret else np.nan
+        sharpe = 0.0 if sigma == 0 or np.isnan(sigma) else self.mean * self.periods_per_year / sigma
+        years = self.n_days / self.periods_per_year
+        return {
+            "CAGR": round(float((1 + total) ** (1 / years) - 1), 6),
+            "Sharpe": round(float(sharpe), 4),
+            "MaxDrawdown": round(float(self.max_dd), 6),
+            "TotalReturn": round(float(total), 6),
+        }
+
+def rolling_sharpe(returns: pd.DataFrame, window: int = 63, periods_per_year: int = 252) -> pd.DataFrame:
+    """
+    Trailing-window Sharpe for every column (e.g. one column per strategy) at once.
+    NaN until a window has `window` days; 0 where the window has no variance.
+    """
+    roll = returns.rolling(window, min_periods=window)
+    sigma = roll.std(ddof=0)
+    sharpe = roll.mean() * np.sqrt(periods_per_year) / sigma
+    return sharpe.mask((sigma == 0) & sigma.notna(), 0.0)
+
+def rolling_drawdown(returns: pd.DataFrame, window: int = 252) -> pd.DataFrame:
+    """Drawdown of each day's equity from the highest equity of the trailing `window` days."""
+    equity = (1.0 + returns.fillna(0)).cumprod()
+    return equity / equity.rolling(window, min_periods=1).max() - 1.0
+
+def rolling_max_drawdown(returns: pd.DataFrame, window: int = 252, chunk: int = 2048) -> pd.DataFrame:
+    """
+    Worst drawdown inside each trailing `window` (what `max_drawdown` would give on that slice),
+    for every column at once. Vectorized over a sliding window view, `chunk` dates at a time.
+    """
+    equity = (1.0 + returns.fillna(0).to_numpy(dtype=float)).cumprod(axis=0)
+    padded = np.vstack([np.full((window - 1, equity.shape[1]), np.nan), equity])
+    out = np.empty_like(equity)
+    for lo in range(0, len(equity), chunk):
+        win = np.lib.stride_tricks.sliding_window_view(padded[lo:lo + chunk + window - 1], window, axis=0)
+        peak = np.fmax.accumulate(win, axis=-1)
+        out[lo:lo + chunk] = np.nanmin(win / peak - 1.0, axis=-1)
+    return pd.DataFrame(out, index=returns.index, columns=returns.columns)
+
+def rolling_kpis(returns: pd.DataFrame, windows=(63, 252), periods_per_year: int = 252) -> pd.DataFrame:
+    """Rolling Sharpe and max drawdown per window, as columns `<strategy>_sharpe_<w>` / `<strategy>_maxdd_<w>`."""
+    parts = []
+    for w in windows:
+        parts.append(rolling_sharpe(returns, w, periods_per_year).add_suffix(f"_sharpe_{w}"))
+        parts.append(rolling_max_drawdown(returns, w).add_suffix(f"_maxdd_{w}"))
+    return pd.concat(parts, axis=1)
@@ -0,0 +1,239 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Sequence
+from src.utils_io import KEEP_FLOAT64
+
+
+def _is_exact(col: str) -> bool:
+    return col in KEEP_FLOAT64 or col.startswith("pred_")
+
+
+@dataclass
+class CompactPanel:
+    """
+    Long (ticker, date) dataset held as a few contiguous arrays instead of a DataFrame.
+    - tickers / dates: dictionaries, stored once; rows keep int32 `ticker` codes and `day` indices
+    - rows are sorted by (ticker, day); rows of ticker k are `offsets[k]:offsets[k + 1]`
+    - block: (columns, rows) array of features (float32 by default; ints are restored on output)
+    - exact: (columns, rows) float64 array for prices, targets and predictions (`KEEP_FLOAT64`, `pred_*`)
+    - meta: per-ticker attributes (e.g. `Listing Exchange`, `ETF`), one row per ticker code
+    Single columns (`column`) are zero-copy views; a ticker's rows are contiguous in each of them.
+    """
+    tickers: np.ndarray
+    dates: np.ndarray
+    ticker: np.ndarray
+    day: np.ndarray
+    offsets: np.ndarray
+    block: np.ndarray
+    block_cols: List[str]
+    exact: np.ndarray
+    exact_cols: List[str]
+    meta: pd.DataFrame
+    columns: List[str]
+    dtypes: Dict[str, object] = field(default_factory=dict)
+    date_col: str = "Date"
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, date_col: str = "Date", feature_dtype=np.float32) -> "CompactPanel":
+        """
+        Encode a long frame: factorize tickers and dates once, sort rows by (ticker, date),
+        move numeric columns into the blocks and constant-per-ticker strings into `meta`.
+        """
+        t_codes, tickers = pd.factorize(df["ticker"], sort=True)
+        d_codes, dates = pd.factorize(pd.to_datetime(df[date_col]), sort=True)
+        order = np.argsort(t_codes.astype(np.int64) * max(len(dates), 1) + d_codes, kind="stable")
+        ticker = t_codes[order].astype(np.int32)
+        offsets = np.searchsorted(ticker, np.arange(len(tickers) + 1)).astype(np.int64)
+
+        columns = [c for c in df.columns if c not in (date_col, "ticker")]
+        numeric = [c for c in columns if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+        exact_cols = [c for c in numeric if _is_exact(c)]
+        block_cols = [c for c in numeric if not _is_exact(c)]
+        first = order[offsets[:-1]]
+        meta = pd.DataFrame({c: df[c].to_numpy()[first] for c in columns if c not in numeric})
+
+        panel = cls(
+            tickers=np.asarray(tickers, dtype=object), dates=np.asarray(dates, dtype="datetime64[ns]"),
+            ticker=ticker, day=d_codes[order].astype(np.int32), offsets=offsets,
+            block=np.empty((len(block_cols), len(df)), dtype=feature_dtype), block_cols=block_cols,
+            exact=np.empty((len(exact_cols), len(df)), dtype=np.float64), exact_cols=exact_cols,
+            meta=meta, columns=columns,
+            dtypes={c: df[c].dtype for c in ["ticker"] + columns if not pd.api.types.is_float_dtype(df[c])},
+            date_col=date_col,
+        )
+        for i, c in enumerate(block_cols):
+            panel.block[i] = df[c].to_numpy()[order]
+        for i, c in enumerate(exact_cols):
+            panel.exact[i] = df[c].to_numpy(dtype=np.float64)[order]
+        return panel
+
+    @classmethod
+    def from_wide(
+        cls,
+        wide: pd.DataFrame,
+        date_col: str = "Date",
+        meta: Optional[pd.DataFrame] = None,
+        feature_dtype=np.float32,
+    ) -> "CompactPanel":
+        """
+        Long panel straight from a wide price table (date + one column per ticker), without a
+        melt: prices are the transposed matrix, ticker-major, in column order.
+        - meta: optional ticker -> attribute lookup (index = ticker), stored once per ticker
+        - adds the calendar columns `dow` / `month` (as `add_calendar_features`)
+        """
+        if not pd.to_datetime(wide[date_col]).is_monotonic_increasing:
+            wide = wide.sort_values(date_col, key=pd.to_datetime, kind="stable")
+        dates = pd.to_datetime(wide[date_col]).reset_index(drop=True)
+        tickers = np.asarray([c for c in wide.columns if c != date_col], dtype=object)
+        n_dates, n_tickers = len(dates), len(tickers)
+        d_codes, uniq = pd.factorize(dates, sort=True)
+
+        prices = wide[list(tickers)].to_numpy(dtype=np.float64).T.reshape(1, -1)
+        day = np.tile(d_codes.astype(np.int32), n_tickers)
+        calendar = np.vstack([
+            np.tile(dates.dt.dayofweek.to_numpy(), n_tickers),
+            np.tile(dates.dt.month.to_numpy(), n_tickers),
+        ]).astype(feature_dtype)
+
+        meta_cols = list(meta.columns) if meta is not None else []
+        ticker_meta = (
+            meta.reindex(tickers).reset_index(drop=True).astype("category") if meta is not None
+            else pd.DataFrame(index=range(n_tickers))
+        )
+        return cls(
+            tickers=tickers, dates=np.asarray(uniq, dtype="datetime64[ns]"),
+            ticker=np.repeat(np.arange(n_tickers, dtype=np.int32), n_dates), day=day,
+            offsets=np.arange(n_tickers + 1, dtype=np.int64) * n_dates,
+            block=calendar, block_cols=["dow", "month"],
+            exact=prices, exact_cols=["price"],
+            meta=ticker_meta, columns=["price", "dow", "month"] + meta_cols,
+            dtypes={"ticker": "category", "dow": np.dtype("int32"), "month": np.dtype("int32")},
+            date_col=date_col,
+        )
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.ticker)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [self.ticker, self.day, self.offsets, self.block, self.exact]
+        return int(sum(a.nbytes for a in arrays) + self.meta.memory_usage(deep=True).sum()
+                   + self.tickers.nbytes + self.dates.nbytes)
+
+    def column(self, name: str) -> np.ndarray:
+        """One column as a contiguous view (rows in (ticker, day) order)."""
+        if name in self.exact_cols:
+            return self.exact[self.exact_cols.index(name)]
+        return self.block[self.block_cols.index(name)]
+
+    def column_dtypes(self) -> pd.Series:
+        """dtype of every column as `to_frame` returns it (like `DataFrame.dtypes`, without decoding)."""
+        out = {}
+        for c in self.columns:
+            if c in self.meta.columns:
+                out[c] = self.dtypes.get(c, pd.CategoricalDtype())
+            else:
+                out[c] = self.dtypes.get(c, self.column(c).dtype)
+        return pd.Series(out, dtype=object)
+
+    def layout(self, lo: int = 0, hi: Optional[int] = None):
+        """
+        (starts, lengths, pos) of the non-empty tickers in rows `lo:hi` (on ticker boundaries),
+        relative to `lo`, as `engine.group_layout` returns them.
+        """
+        hi = len(self) if hi is None else hi
+        offs = self.offsets[(self.offsets >= lo) & (self.offsets <= hi)] - lo
+        lengths = np.diff(offs)
+        starts, lengths = offs[:-1][lengths > 0], lengths[lengths > 0]
+        return starts, lengths, np.arange(hi - lo) - np.repeat(starts, lengths)
+
+    def ticker_chunks(self, chunk_rows: int = 1 << 20):
+        """(lo, hi) row ranges of about `chunk_rows` rows that never split a ticker."""
+        n = len(self)
+        cuts = self.offsets[np.searchsorted(self.offsets, np.arange(chunk_rows, n, chunk_rows))]
+        bounds = np.unique(np.concatenate([[0], cuts, [n]]))
+        return list(zip(bounds[:-1].tolist(), bounds[1:].tolist())) or [(0, 0)]
+
+    # ------------------------------------------------------------------
+    # Transformations
+    # ------------------------------------------------------------------
+
+    def with_empty(self, dtypes: Dict[str, object]) -> "CompactPanel":
+        """
+        New panel with uninitialized columns `dtypes` ({name: dtype}) added or replaced, to be filled
+        through `column(name)[...]`. Exact columns are float64; the rest live in the block.
+        """
+        keep = [c for c in self.columns if c not in dtypes]
+        block_cols = [c for c in self.block_cols if c not in dtypes] + [c for c in dtypes if not _is_exact(c)]
+        exact_cols = [c for c in self.exact_cols if c not in dtypes] + [c for c in dtypes if _is_exact(c)]
+
+        def _alloc(names, dtype):
+            out = np.empty((len(names), len(self)), dtype=dtype)
+            for i, c in enumerate(names):
+                if c not in dtypes:
+                    out[i] = self.column(c)
+            return out
+
+        # Float columns take the dtype of their block; other dtypes (ints) are restored on output
+        restore = {c: t for c, t in self.dtypes.items() if c not in dtypes}
+        restore.update({c: np.dtype(t) for c, t in dtypes.items() if not np.issubdtype(np.dtype(t), np.floating)})
+        return replace(
+            self, block=_alloc(block_cols, self.block.dtype), block_cols=block_cols,
+            exact=_alloc(exact_cols, np.float64), exact_cols=exact_cols,
+            columns=keep + list(dtypes), dtypes=restore,
+        )
+
+    def compress(self, mask: np.ndarray) -> "CompactPanel":
+        """
+        Rows where `mask` is True, without a second copy of the blocks: kept rows are moved to the
+        front one column at a time and the result views the same buffers (dictionaries and
+        per-ticker meta are kept). This panel must not be used afterwards.
+        """
+        k = int(mask.sum())
+        for arr in (self.block, self.exact):
+            for i in range(len(arr)):
+                arr[i, :k] = arr[i, mask]
+        ticker = self.ticker[mask]
+        return replace(
+            self, ticker=ticker, day=self.day[mask],
+            offsets=np.searchsorted(ticker, np.arange(len(self.tickers) + 1)).astype(np.int64),
+            block=self.block[:, :k], exact=self.exact[:, :k],
+        )
+
+    def iter_frames(self, batch_rows: int = 1 << 20):
+        """Decode `batch_rows` rows at a time (bounded memory when writing large panels)."""
+        for lo in range(0, max(len(self), 1), batch_rows):
+            yield self.to_frame(rows=slice(lo, lo + batch_rows))
+
+    def to_frame(self, columns: Optional[Sequence[str]] = None, rows: slice = slice(None)) -> pd.DataFrame:
+        """
+        Decode into a long DataFrame (`date_col`, `ticker`, then `columns` in stored order).
+        Strings come back as categoricals unless they were plain objects in the source frame.
+        """
+        columns = list(columns) if columns is not None else self.columns
+        codes = self.ticker[rows]
+        out = {self.date_col: self.dates[self.day[rows]], "ticker": self._decode(self.tickers, "ticker", codes)}
+        for c in columns:
+            if c in self.meta.columns:
+                out[c] = self._decode(self.meta[c], c, codes)
+            else:
+                values = self.column(c)[rows]
+                dtype = self.dtypes.get(c)
+                out[c] = values.astype(dtype) if dtype is not None and dtype != values.dtype else values
+        return pd.DataFrame(out, columns=[self.date_col, "ticker"] + columns)
+
+    def _decode(self, per_ticker, name: str, codes: np.ndarray):
+        values = pd.Series(per_ticker).reset_index(drop=True)
+        if pd.api.types.is_object_dtype(self.dtypes.get(name)):
+            return values.to_numpy(dtype=object)[codes]
+        cat = values.astype("category")
+        return pd.Categorical.from_codes(cat.cat.codes.to_numpy()[codes], cat.cat.categories)
@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import argparse
+import contextvars
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# pandas is imported by the report functions only: every step imports `span`, and short steps
+# should not pay for pandas just to be instrumented
+
+# Active profiler; None = instrumentation is a no-op (one global lookup per span)
+_ACTIVE: Optional["Profiler"] = None
+
+# Names of the spans open in the current context; `submit` carries them into worker threads
+_PATH: contextvars.ContextVar[Tuple[str, ...]] = contextvars.ContextVar("span_path", default=())
+
+
+def _rss_mb() -> float:
+    """Current resident set size (Linux /proc; falls back to the peak elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+
+def _hwm_mb() -> float:
+    """Peak resident set size since the last `_reset_hwm` (process lifetime without /proc)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM"):
+                    return int(line.split()[1]) / 2**10
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+
+def _reset_hwm() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class _NullSpan:
+    """Shared no-op span; `as sp` still gives a dict, so `sp["rows"] = n` costs nothing to keep."""
+
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullSpan()
+
+
+class _Span:
+    def __init__(self, prof: "Profiler", name: str, attrs: dict):
+        self.prof, self.name, self.attrs = prof, name, attrs
+        self.peak = 0.0
+
+    def __enter__(self) -> dict:
+        names = _PATH.get() + (self.name,)
+        self.path = "/".join(names)
+        self._token = _PATH.set(names)
+        self.prof._open(self)
+        self.t0 = time.perf_counter_ns()
+        return self.attrs
+
+    def __exit__(self, exc_type, exc, tb):
+        t1 = time.perf_counter_ns()
+        _PATH.reset(self._token)
+        self.prof._close(self, t1, exc_type)
+        return False
+
+
+class Profiler:
+    """
+    Collects timing spans and memory for one pipeline run.
+    - span: wall time, thread, current and peak RSS (peak is per span on Linux: the high-water
+      mark is reset when a span opens and folded into every open span), plus free-form attrs
+      such as `rows`
+    - record: a measurement made elsewhere (e.g. per-candidate fit times from a CV search)
+    - sample_ms > 0: a background thread samples every thread's Python stack; the counts are
+      written as folded stacks (flamegraph.pl / speedscope input)
+    Spans opened in worker threads nest under the submitting span when the task is started
+    with `submit`. Spans opened in worker processes (sharded features, walk-forward folds) are
+    not collected; the parent span covers their wall time.
+    """
+
+    def __init__(self, sample_ms: float = 0.0):
+        self.sample_ms = sample_ms
+        self.events: List[dict] = []
+        self.samples: Counter = Counter()
+        self.started = time.time()
+        self._t0 = time.perf_counter_ns()
+        self._lock = threading.Lock()
+        self._open_spans: List[_Span] = []
+        self._can_reset = _reset_hwm()
+        self._sampler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Spans
+    # ------------------------------------------------------------------
+
+    def span(self, name: str, **attrs) -> _Span:
+        return _Span(self, name, attrs)
+
+    def record(self, name: str, seconds: float, **attrs):
+        with self._lock:
+            self.events.append({"type": "record", "name": name, "path": name, "dur_s": float(seconds), **attrs})
+
+    def _open(self, span: _Span):
+        with self._lock:
+            if self._can_reset:
+                hwm = _hwm_mb()
+                for s in self._open_spans:
+                    s.peak = max(s.peak, hwm)
+                _reset_hwm()
+            span.rss0 = _rss_mb()
+            self._open_spans.append(span)
+
+    def _close(self, span: _Span, t1: int, exc_type):
+        with self._lock:
+            self._open_spans.remove(span)
+            event = {
+                "type": "span", "name": span.name, "path": span.path,
+                "ts_us": (span.t0 - self._t0) / 1e3, "dur_s": (t1 - span.t0) / 1e9,
+                "thread": threading.current_thread().name, "tid": threading.get_ident(),
+                "rss_mb": round(_rss_mb(), 1), "rss_delta_mb": round(_rss_mb() - span.rss0, 1),
+                "peak_rss_mb": round(max(span.peak, _hwm_mb()), 1),
+                **span.attrs,
+            }
+            if exc_type is not None:
+                event["error"] = exc_type.__name__
+            self.events.append(event)
+
+    # ------------------------------------------------------------------
+    # Sampling
+    # ------------------------------------------------------------------
+
+    def start(self) -> "Profiler":
+        if self.sample_ms > 0:
+            self._sampler = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+            self._sampler.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+    def _sample_loop(self):
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.sample_ms / 1e3):
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                if tid not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.samples[";".join([names.get(tid, str(tid))] + stack[::-1])] += 1
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    def chrome_trace(self) -> dict:
+        """Spans as complete ("X") events plus an RSS counter track (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        trace = []
+        for e in self.events:
+            if e["type"] != "span":
+                continue
+            args = {k: v for k, v in e.items() if k not in ("type", "name", "ts_us", "dur_s", "tid", "thread")}
+            trace.append({"name": e["name"], "ph": "X", "ts": e["ts_us"], "dur": e["dur_s"] * 1e6,
+                          "pid": pid, "tid": e["tid"], "args": args})
+            trace.append({"name": "rss_mb", "ph": "C", "ts": e["ts_us"] + e["dur_s"] * 1e6, "pid": pid,
+                          "args": {"rss": e["rss_mb"], "peak": e["peak_rss_mb"]}})
+        threads = {e["tid"]: e["thread"] for e in self.events if e["type"] == "span"}
+        trace += [{"name": "thread_name", "ph": "M", "pid": pid, "tid": t, "args": {"name": n}} for t, n in threads.items()]
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def write(self, out_dir: Path, meta: Optional[dict] = None) -> Path:
+        """
+        Write `profile.jsonl` (one run header, then one JSON object per span/record),
+        `trace.json` (Chrome trace) and, when sampling, `stacks.txt` (folded stacks).
+        """
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        header = {
+            "type": "run", "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "wall_s": (time.perf_counter_ns() - self._t0) / 1e9, "pid": os.getpid(),
+            "peak_rss_scope": "span" if self._can_reset else "process", "sample_ms": self.sample_ms,
+            **(meta or {}),
+        }
+        with open(out_dir / "profile.jsonl", "w") as f:
+            for e in [header] + self.events:
+                f.write(json.dumps(e, default=str) + "\n")
+        with open(out_dir / "trace.json", "w") as f:
+            json.dump(self.chrome_trace(), f)
+        if self.samples:
+            with open(out_dir / "stacks.txt", "w") as f:
+                f.writelines(f"{stack} {n}\n" for stack, n in self.samples.most_common())
+        return out_dir
+
+
+# ----------------------------------------------------------------------
+# Instrumentation API (no-ops unless a profiler is active)
+# ----------------------------------------------------------------------
+
+def span(name: str, **attrs):
+    """
+    Time a block: `with span("features", rows=n) as sp: ...; sp["rows"] = len(out)`.
+    Nested spans form a path (`step_03/features/rsi`); tasks started with `submit` continue
+    the path of the span that submitted them.
+    """
+    prof = _ACTIVE
+    return _NULL if prof is None else prof.span(name, **attrs)
+
+
+def submit(pool, fn, *args, **kwargs):
+    """`pool.submit(fn, ...)` in a copy of the caller's context, so spans in `fn` nest under the caller's."""
+    return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def record(name: str, seconds: float, **attrs):
+    """Add a measurement taken elsewhere (no-op unless profiling)."""
+    if _ACTIVE is not None:
+        _ACTIVE.record(name, seconds, **attrs)
+
+
+def enabled() -> bool:
+    return _ACTIVE is not None
+
+
+@contextmanager
+def profiling(sample_ms: float = 0.0):
+    """Activate a `Profiler` for the duration of the block and yield it."""
+    global _ACTIVE
+    prof = Profiler(sample_ms).start()
+    previous, _ACTIVE = _ACTIVE, prof
+    try:
+        yield prof
+    finally:
+        _ACTIVE = previous
+        prof.stop()
+
+
+# ----------------------------------------------------------------------
+# Reports
+# ----------------------------------------------------------------------
+
+def load_events(run_dir: Path) -> pd.DataFrame:
+    """Spans and records of a run written by `Profiler.write`."""
+    import pandas as pd
+
+    with open(Path(run_dir) / "profile.jsonl") as f:
+        events = [json.loads(line) for line in f]
+    return pd.DataFrame([e for e in events if e["type"] != "run"])
+
+
+def summarize(events: pd.DataFrame) -> pd.DataFrame:
+    """Per path: calls, total and max seconds, peak RSS and rows (summed over calls)."""
+    import pandas as pd
+
+    if events.empty:
+        return pd.DataFrame(columns=["path", "calls", "total_s", "max_s", "peak_rss_mb", "rows"])
+    events = events.assign(
+        peak_rss_mb=events.get("peak_rss_mb", pd.Series(float("nan"), index=events.index)),
+        rows=events.get("rows", pd.Series(float("nan"), index=events.index)),
+    )
+    out = events.groupby("path", sort=False).agg(
+        calls=("dur_s", "size"), total_s=("dur_s", "sum"), max_s=("dur_s", "max"),
+        peak_rss_mb=("peak_rss_mb", "max"), rows=("rows", lambda r: r.sum(min_count=1)),
+    )
+    return out.reset_index()
+
+
+def compare(current: pd.DataFrame, baseline: pd.DataFrame, threshold: float = 0.10, min_seconds: float = 0.05) -> pd.DataFrame:
+    """
+    Join two `summarize` tables on path and flag regressions:
+    - time: total_s grew by more than `threshold` and by at least `min_seconds`
+    - memory: peak_rss_mb grew by more than `threshold`
+    Paths present in only one run are kept with NaNs (new or removed instrumentation). Paths
+    whose `rows` differ from the baseline's measured a different workload: they are flagged
+    `workload_changed` and never counted as regressions (re-record the baseline).
+    Sorted by added seconds, largest first.
+    """
+    out = current.merge(baseline, on="path", how="outer", suffixes=("", "_base"))
+    out["time_ratio"] = out["total_s"] / out["total_s_base"]
+    out["rss_ratio"] = out["peak_rss_mb"] / out["peak_rss_mb_base"]
+    out["workload_changed"] = out["rows"].notna() & out["rows_base"].notna() & (out["rows"] != out["rows_base"])
+    comparable = ~out["workload_changed"]
+    out["time_regression"] = comparable & (out["time_ratio"] > 1 + threshold) & (out["total_s"] - out["total_s_base"] >= min_seconds)
+    out["rss_regression"] = comparable & (out["rss_ratio"] > 1 + threshold)
+    out["regression"] = out["time_regression"] | out["rss_regression"]
+    cols = ["path", "calls", "total_s", "total_s_base", "time_ratio", "peak_rss_mb", "peak_rss_mb_base",
+            "rss_ratio", "rows", "rows_base", "workload_changed", "time_regression", "rss_regression", "regression"]
+    return out[cols].sort_values("total_s", key=lambda s: -(s - out["total_s_base"]).fillna(0), kind="stable").reset_index(drop=True)
+
+
+def previous_run(profile_dir: Path, current: Path) -> Optional[Path]:
+    """Most recent other run directory in `profile_dir` (run directories sort by start time)."""
+    runs = sorted(p for p in Path(profile_dir).iterdir() if (p / "profile.jsonl").exists() and p != Path(current))
+    return runs[-1] if runs else None
+
+
+def regression_report(run_dir: Path, baseline_dir: Path, threshold: float = 0.10, min_seconds: float = 0.05) -> pd.DataFrame:
+    """`compare` two run directories and write `regressions.csv` into `run_dir`."""
+    report = compare(summarize(load_events(run_dir)), summarize(load_events(baseline_dir)), threshold, min_seconds)
+    report.to_csv(Path(run_dir) / "regressions.csv", index=False)
+    return report
+
+
+def format_report(report: pd.DataFrame, top: int = 10) -> str:
+    """Flagged paths first, then the largest contributors, as a plain-text table."""
+    import pandas as pd
+
+    shown = pd.concat([report[report["regression"]], report[~report["regression"]]]).head(top)
+    cols = ["path", "total_s", "total_s_base", "time_ratio", "peak_rss_mb", "peak_rss_mb_base", "regression"]
+    text = shown[cols].to_string(index=False, float_format=lambda v: f"{v:.3f}")
+    changed = report.loc[report["workload_changed"], "path"].tolist()
+    if changed:
+        text += f"\n{len(changed)} path(s) measured different rows than the baseline (not compared): {', '.join(changed)}"
+    return text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a profiled run or compare two runs.")
+    parser.add_argument("run", help="run directory (contains profile.jsonl)")
+    parser.add_argument("baseline", nargs="?", help="baseline run directory; default: summary only")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative growth flagged as a regression")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="ignore time changes smaller than this")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if args.baseline is None:
+        summary = summarize(load_events(args.run)).sort_values("total_s", ascending=False)
+        print(summary.head(args.top).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+        return 0
+    report = regression_report(args.run, args.baseline, args.threshold, args.min_seconds)
+    print(format_report(report, args.top))
+    return 1 if report["regression"].any() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+import copy
+from pathlib import Path
+
+import pytest
+import yaml
+
+from src.benchmarks.synthetic import MarketSpec, write_market
+from src.pipeline.step_02_unify_dataset import run as unify
+
+CONFIG = Path(__file__).resolve().parents[1] / "config" / "config.yaml"
+
+
+def make_config(root: Path, **storage) -> dict:
+    """`config.yaml` with every path under `root` (created)."""
+    with open(CONFIG) as f:
+        cfg = yaml.safe_load(f)
+    cfg["paths"] = {k: str(root / k) for k in cfg["paths"]}
+    for p in cfg["paths"].values():
+        Path(p).mkdir(parents=True, exist_ok=True)
+    cfg["cache"] = {"enabled": False}
+    cfg["storage"] = {**cfg.get("storage", {}), **storage}
+    return cfg
+
+
+@pytest.fixture(scope="session")
+def market_cfg(tmp_path_factory) -> dict:
+    """A small synthetic market (late listings, halts, missing quotes) unified by step 02."""
+    cfg = make_config(tmp_path_factory.mktemp("market"))
+    write_market(MarketSpec(tickers=12, days=400), cfg["paths"]["raw_dir"], cfg["data"]["main_file"], cfg["data"]["meta_file"])
+    unify(cfg)
+    return cfg
+
+
+@pytest.fixture
+def cfg(market_cfg, tmp_path) -> dict:
+    """`market_cfg` with fresh output folders, sharing its `unified_long`."""
+    cfg = copy.deepcopy(market_cfg)
+    for key in ("processed_dir", "reports_dir", "figures_dir", "backtests_dir"):
+        cfg["paths"][key] = str(tmp_path / key)
+        Path(cfg["paths"][key]).mkdir(parents=True)
+    return cfg
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.simulation.bootstrap import KPI_NAMES, block_paths, bootstrap_kpis, path_kpis, ticker_paths
+from src.simulation.panel import build_market
+from src.simulation.registry import ROW_PARTS, STRATEGIES
+from src.utils_metrics import compute_kpis
+from tests.test_strategies import random_panel
+
+ROUNDING = {"CAGR": 6, "Sharpe": 4, "MaxDrawdown": 6, "TotalReturn": 6}
+
+
+def _returns(seed: int, days: int = 300) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    r = rng.normal(0.0005, 0.02, days)
+    r[rng.random(days) < 0.1] = np.nan
+    r[:5] = np.nan
+    return r
+
+
+def test_path_kpis_equal_compute_kpis():
+    paths = np.vstack([_returns(seed) for seed in range(5)])
+    kpis = path_kpis(paths)
+    for i, r in enumerate(paths):
+        expected = compute_kpis(pd.DataFrame({"strategy_ret": r}))
+        assert {k: round(float(kpis[k][i]), ROUNDING[k]) for k in KPI_NAMES} == expected
+
+
+def test_bootstrap_does_not_depend_on_workers():
+    make = block_paths(_returns(0), block=10)
+    serial = bootstrap_kpis(make, n_paths=250, seed=3, chunk_paths=40, workers=1)
+    parallel = bootstrap_kpis(make, n_paths=250, seed=3, chunk_paths=40, workers=4)
+    assert len(serial) == 250
+    pd.testing.assert_frame_equal(serial, parallel, check_exact=True)
+    assert not serial.equals(bootstrap_kpis(make, n_paths=250, seed=4, chunk_paths=40, workers=1))
+
+
+def test_block_paths_are_circular_blocks_of_the_input():
+    returns = np.arange(100, dtype=float) / 1000
+    block = 7
+    paths = block_paths(returns, block)(np.random.default_rng(0), 20)
+    assert paths.shape == (20, 100)
+    assert np.isin(paths, returns).all()
+
+    # Within each block, consecutive days of the input (wrapping around its end)
+    idx = np.rint(paths * 1000).astype(int)
+    steps = np.diff(idx, axis=1) % len(returns)
+    inside = np.arange(1, 100) % block != 0
+    assert (steps[:, inside] == 1).all()
+
+
+class _EachTickerOnce:
+    """Stands in for the generator: every ticker drawn exactly once, in every path."""
+
+    def multinomial(self, n, pvals, size):
+        return np.ones((size, len(pvals)), dtype=np.int64)
+
+
+@pytest.mark.parametrize("name", sorted(ROW_PARTS))
+def test_ticker_paths_with_every_ticker_once_reproduce_the_strategy(name):
+    market = build_market(random_panel(5, tickers=10, days=80, nan_market=0.03), "prob")
+    sim = {
+        "thresholds": {"buy_prob": 0.6, "short_prob": 0.6},
+        "costs": {"fee_bps": 5.0},
+        "capital": {"max_concurrent_positions": 3},
+    }
+    daily = STRATEGIES[name](market, sim)
+    paths = ticker_paths(market.order, *ROW_PARTS[name](market, sim))(_EachTickerOnce(), 3)
+    for path in paths:
+        np.testing.assert_allclose(path, daily["strategy_ret"], rtol=1e-12, atol=1e-15)
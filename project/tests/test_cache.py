@@ -0,0 +1,111 @@
+import importlib
+from pathlib import Path
+
+import pytest
+import yaml
+
+from src.benchmarks.synthetic import MarketSpec, write_market
+from src.pipeline import run_all
+from src.pipeline.cache import code_digest, config_subset
+from tests.conftest import make_config
+
+
+def _package(root: Path, name: str, modules: dict) -> Path:
+    """Write an importable package `name` with `modules` ({module: source}) under `root`."""
+    pkg = root / name
+    pkg.mkdir(parents=True, exist_ok=True)
+    (pkg / "__init__.py").write_text("")
+    for mod, source in modules.items():
+        (pkg / f"{mod}.py").write_text(source)
+    importlib.invalidate_caches()
+    return pkg
+
+
+def test_config_subset_picks_dotted_keys():
+    cfg = {"data": {"date_col": "Date", "tickers": ["A"]}, "features": {"select": "all"}}
+    assert config_subset(cfg, ["data.date_col", "features", "split.train_end", "data.date_col.x"]) == {
+        "data.date_col": "Date", "features": {"select": "all"}, "split.train_end": None, "data.date_col.x": None,
+    }
+
+
+def test_code_digest_follows_package_imports(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    pkg = _package(tmp_path, "cachepkg", {
+        "step": "import json\nfrom cachepkg.helpers import f\n",
+        "helpers": "from cachepkg import deep\ndef f():\n    return 1\n",
+        "deep": "X = 1\n",
+        "unused": "Y = 1\n",
+    })
+    digest = lambda: code_digest("cachepkg.step", package="cachepkg")
+    before = digest()
+    (pkg / "unused.py").write_text("Y = 2\n")
+    assert digest() == before
+    (pkg / "deep.py").write_text("X = 2\n")
+    assert digest() != before
+
+
+def test_strategy_plugins_are_part_of_step_06_code(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    pkg = _package(tmp_path, "myplugins", {
+        "strategies": "from myplugins.util import k\ndef flat(market, sim):\n    return None\n",
+        "util": "k = 1\n",
+    })
+    cfg = make_config(tmp_path / "run")
+    cfg["simulation"]["strategies"] = ["long_only_threshold", "myplugins.strategies:flat"]
+    step6 = {s["n"]: s for s in run_all.pipeline_steps(cfg)}[6]
+    assert step6["plugins"] == ["myplugins.strategies"]
+
+    digest = lambda: code_digest(step6["module"], plugins=step6["plugins"])
+    before = digest()
+    assert before != code_digest(step6["module"])
+    (pkg / "util.py").write_text("k = 2\n")
+    assert digest() != before
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    """A config file over a small synthetic market, with the step cache on; runs steps 02-03."""
+    cfg = make_config(tmp_path)
+    cfg["cache"] = {"enabled": True, "path": str(tmp_path / "cache.json")}
+    write_market(MarketSpec(tickers=5, days=300), cfg["paths"]["raw_dir"], cfg["data"]["main_file"], cfg["data"]["meta_file"])
+    cfg_path = tmp_path / "config.yaml"
+
+    def run(cfg) -> set:
+        """Names of the steps that ran."""
+        cfg_path.write_text(yaml.safe_dump(cfg))
+        ran = []
+        real = run_all.load_step
+        monkeypatch.setattr(run_all, "load_step", lambda n: (ran.append(n), real(n))[1])
+        run_all.main(str(cfg_path), only=[2, 3])
+        return set(ran)
+
+    return cfg, run
+
+
+def test_steps_skipped_until_inputs_code_or_config_change(pipeline, monkeypatch):
+    cfg, run = pipeline
+    assert run(cfg) == {2, 3}
+    assert run(cfg) == set()
+
+    # Config subsection of step 03 only
+    cfg["features"]["technical"] = ["sma_10"]
+    assert run(cfg) == {3}
+    assert run(cfg) == set()
+    # A config key no cached step depends on
+    cfg["simulation"]["costs"]["fee_bps"] = 7
+    assert run(cfg) == set()
+
+    # Input: a new raw file reruns step 02, and step 03 because unified_long changed
+    raw = Path(cfg["paths"]["raw_dir"]) / cfg["data"]["main_file"]
+    raw.write_text("\n".join(raw.read_text().splitlines()[:-5]) + "\n")
+    assert run(cfg) == {2, 3}
+
+    # Code: step 03's digest changes
+    real = run_all.code_digest
+    monkeypatch.setattr(run_all, "code_digest", lambda m, **kw: real(m, **kw) + ("x" if m.endswith("step_03_feature_engineering") else ""))
+    assert run(cfg) == {3}
+    assert run(cfg) == set()
+
+    # Outputs differ from what the step recorded: it reruns
+    (Path(cfg["paths"]["processed_dir"]) / "feature_state.joblib").touch()
+    assert run(cfg) == {3}
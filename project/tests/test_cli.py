@@ -0,0 +1,44 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.cli import COMMANDS, PASSTHROUGH, main
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _loaded(code: str, modules) -> list:
+    """Which of `modules` a fresh interpreter has loaded after running `code`."""
+    probe = f"{code}\nimport sys\nprint(' '.join(m for m in {list(modules)!r} if m in sys.modules))"
+    res = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True, check=True)
+    return res.stdout.split()
+
+
+def test_cli_and_step_table_import_no_heavy_modules():
+    assert _loaded("import src.cli, src.pipeline.run_all", ["pandas", "sklearn", "xgboost", "joblib", "pyarrow"]) == []
+    # Steps that do not train never load the model libraries
+    steps = "import src.pipeline.step_01_download, src.pipeline.step_06_simulate"
+    assert _loaded(steps, ["sklearn", "xgboost", "joblib"]) == []
+
+
+@pytest.mark.parametrize("command", list(COMMANDS))
+def test_help_for_every_command(command, capsys):
+    with pytest.raises(SystemExit) as exit_:
+        main([command, "--help"])
+    assert exit_.value.code == 0
+    out = capsys.readouterr().out
+    assert f"python -m src.cli {command}" in out and COMMANDS[command][2] in out
+
+    # Pass-through commands hand everything after `--` to the tool's own parser
+    if command in PASSTHROUGH:
+        with pytest.raises(SystemExit) as exit_:
+            main([command, "--", "--help"])
+        assert exit_.value.code == 0
+        assert "usage:" in capsys.readouterr().out
+
+
+def test_top_level_help_lists_every_command():
+    res = subprocess.run([sys.executable, "-m", "src.cli", "--help"], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert all(name in res.stdout for name in COMMANDS)
@@ -0,0 +1,60 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.features.cross_section as cs
+from src.features.cross_section import CS_LOOKBACK, add_cross_section_features, cross_section_rows, date_blocks, rank_pct
+
+
+def _market(seed: int, tickers: int = 9, days: int = 120) -> pd.DataFrame:
+    """Long frame with halts (NaN price runs longer than the lookback), late listings and peer groups."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2021-01-01", periods=days)
+    df = pd.DataFrame({
+        "Date": np.repeat(dates, tickers),
+        "ticker": np.tile([f"T{i}" for i in range(tickers)], days),
+        "price": 20 * np.exp(rng.normal(0, 0.02, (days, tickers)).cumsum(axis=0)).ravel(),
+        "Listing Exchange": np.tile(list("NQNQNQNQNQ")[:tickers], days),
+        "ETF": np.tile(list("YNNNYNNNYN")[:tickers], days),
+    })
+    t, d = df["ticker"], df["Date"]
+    df.loc[(t == "T1") & (d >= dates[40]) & (d < dates[90]), "price"] = np.nan
+    df.loc[rng.random(len(df)) < 0.05, "price"] = np.nan
+    df = df[~((t == "T2") & (d < dates[100]))]
+    return df.sample(frac=1.0, random_state=seed)
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("window", [(100, 120), (60, 75), (0, 120)])
+def test_cross_section_rows_equal_full_frame(seed, window):
+    df = _market(seed)
+    dates = pd.bdate_range("2021-01-01", periods=120)
+    rows = df.index[(df["Date"] >= dates[window[0]]) & (df["Date"] < dates[min(window[1], 119)] + pd.Timedelta(days=1))]
+    expected = add_cross_section_features(df).loc[rows]
+    pd.testing.assert_frame_equal(cross_section_rows(df, rows), expected, check_exact=True)
+
+
+def test_cross_section_rows_reads_only_the_lookback(monkeypatch):
+    df = _market(0)
+    rows = df.index[df["Date"] == df["Date"].max()]
+    seen = []
+
+    def spy(part, *args, **kwargs):
+        seen.append(len(part))
+        return add_cross_section_features(part, *args, **kwargs)
+
+    monkeypatch.setattr(cs, "add_cross_section_features", spy)
+    cross_section_rows(df, rows)
+    # Every ticker quoted within the lookback: at most CS_LOOKBACK + 1 rows each, not the history
+    assert seen[0] <= df["ticker"].nunique() * (CS_LOOKBACK + 1)
+
+
+def test_rank_pct_all_nan_date_is_quiet():
+    values = np.array([np.nan, np.nan, 1.0, 2.0, 2.0])
+    day = np.array([0, 0, 1, 1, 1])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        out = rank_pct(values, day, date_blocks(day, 2))
+    np.testing.assert_array_equal(out, [np.nan, np.nan, 1 / 3, 5 / 6, 5 / 6])
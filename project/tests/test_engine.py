@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from src.features.basic import add_basic_features
+from src.features.engine import compute_features
+from src.features.technical import add_technical_features
+from src.utils_io import read_artifact
+
+
+def test_engine_equals_pandas_features(market_cfg):
+    date_col = market_cfg["data"]["date_col"]
+    df = read_artifact(market_cfg, "unified_long")
+    df["ticker"] = df["ticker"].astype(str)
+    # Halts and missing quotes leave NaN prices inside the histories
+    assert df.groupby("ticker")["price"].apply(lambda s: s.isna().any()).any()
+
+    expected = add_technical_features(add_basic_features(df, date_col), date_col)
+    got = compute_features(df, date_col)
+    assert list(got.columns) == list(expected.columns)
+    for c in expected.columns:
+        np.testing.assert_array_equal(got[c].isna().to_numpy(), expected[c].isna().to_numpy(), err_msg=c)
+    # Rolling sums differ from pandas' online algorithm in the last bits only
+    pd.testing.assert_frame_equal(got, expected, check_exact=False, rtol=1e-9, atol=1e-12)
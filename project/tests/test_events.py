@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.simulation.events import frame_bars, panel_bars, sim_sl_tp_events
+from src.simulation.panel import build_panel
+from src.simulation.strategies import sim_long_only_sl_tp, sim_long_only_sl_tp_fast
+from src.utils_metrics import StreamingKPIs
+from tests.test_strategies import random_panel
+
+KWARGS = dict(threshold=0.6, stop_loss=-0.03, take_profit=0.05, fee_bps=5.0, max_concurrent=3)
+
+
+def _assert_identical(expected: pd.DataFrame, got: pd.DataFrame):
+    pd.testing.assert_series_equal(expected["Date"], got["Date"], check_names=False)
+    np.testing.assert_array_equal(expected["strategy_ret"].to_numpy(), got["strategy_ret"].to_numpy())
+    np.testing.assert_array_equal(expected["equity"].to_numpy(), got["equity"].to_numpy())
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_daily_bars_equal_fast_engine(seed):
+    df = random_panel(seed, nan=0.0 if seed % 2 else 0.1, nan_market=0.01 if seed == 4 else 0.0)
+    panel = build_panel(df, "prob")
+    fast = sim_long_only_sl_tp_fast(df, "prob", panel=panel, **KWARGS)
+    _assert_identical(fast, sim_sl_tp_events(panel_bars(panel), n_tickers=len(panel.tickers), **KWARGS))
+    # Bars straight from the frame, with the book growing as tickers appear
+    _assert_identical(fast, sim_sl_tp_events(frame_bars(df, "prob"), **KWARGS))
+
+
+def test_daily_bars_tracker_equals_fast_engine():
+    df = random_panel(3)
+    fast_kpis, event_kpis = StreamingKPIs(), StreamingKPIs()
+    sim_long_only_sl_tp_fast(df, "prob", tracker=fast_kpis, **KWARGS)
+    sim_sl_tp_events(frame_bars(df, "prob"), tracker=event_kpis, **KWARGS)
+    np.testing.assert_equal(fast_kpis.kpis(), event_kpis.kpis())
+
+
+def test_intraday_stop_loss_and_take_profit_in_same_bar():
+    """
+    Minute bars: A and B are bought at 09:30. At 09:32 A crosses its take-profit and B its
+    stop-loss; both close in that bar (A first, in entry order), and C is bought with the cash.
+    """
+    f = 10.0 / 1e4
+    t = pd.date_range("2024-03-01 09:30", periods=4, freq="min")
+    nan = np.nan
+    df = pd.DataFrame({
+        "Date": np.repeat(t, 3),
+        "ticker": ["A", "B", "C"] * 4,
+        "price": [100, 50, 20, 102, 49.5, 20, 106, 48, 20.2, 105, 48, 20.4],
+        # return earned by holding through the bar
+        "target_return_1d": [nan, nan, nan, 0.02, -0.01, 0.0, 0.04, -0.025, 0.0, -0.01, 0.0, 0.01],
+        "prob": [0.9, 0.8, 0.1, 0.5, 0.5, 0.5, 0.5, 0.5, 0.95, nan, nan, nan],
+    })
+    kwargs = dict(threshold=0.6, stop_loss=-0.03, take_profit=0.05, fee_bps=10.0, max_concurrent=2)
+    res = sim_sl_tp_events(frame_bars(df, "prob"), **kwargs)
+
+    a, b = 5000 * (1 - f), 5000 * (1 - f)
+    bar1 = a * 1.02 + b * 0.99
+    cash = a * 1.02 * 1.04 * (1 - f) + b * 0.99 * 0.975 * (1 - f)  # +6.08% >= TP, -3.475% <= SL
+    c = cash * (1 - f)
+    expected = [10000 * (1 - f), bar1, c, c * 1.01]
+    np.testing.assert_allclose(res["equity"], expected, rtol=1e-13)
+    pd.testing.assert_series_equal(res["Date"], pd.Series(t), check_names=False)
+    # The row-wise reference reads minute timestamps as its dates: same bars, same result
+    _assert_identical(sim_long_only_sl_tp(df, "prob", **kwargs), res)
+
+
+def test_frame_bars_with_fixed_ticker_ids():
+    df = random_panel(2, tickers=5)
+    # More symbols than the frame has, in the same relative order (ids break ties in `prob`)
+    tickers = np.array(["A", "T00", "T01", "T02", "T03", "T04", "ZZZ"], dtype=object)
+    bars = list(frame_bars(df, "prob", tickers=tickers))
+    first = df[df["Date"] == df["Date"].min()].sort_values("ticker")
+    np.testing.assert_array_equal(tickers[bars[0].ticker], first["ticker"])
+    np.testing.assert_array_equal(bars[0].prob, first["prob"])
+    expected = sim_sl_tp_events(frame_bars(df, "prob"), **KWARGS)
+    _assert_identical(expected, sim_sl_tp_events(iter(bars), n_tickers=len(tickers), **KWARGS))
+    # A symbol missing from `tickers` is an error, not id -1
+    with pytest.raises(ValueError, match="T03"):
+        next(frame_bars(df, "prob", tickers=np.delete(tickers, 4)))
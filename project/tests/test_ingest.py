@@ -0,0 +1,98 @@
+import threading
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.benchmarks.synthetic import MarketSpec, write_market
+from src.ingest.fetch import ingest
+from src.ingest.mirror import make_handler, write_mirror
+from tests.conftest import make_config
+
+MID = "2020-06-30"
+
+
+@pytest.fixture(scope="module")
+def source(tmp_path_factory) -> dict:
+    """A synthetic market and its per-ticker mirror files."""
+    root = tmp_path_factory.mktemp("source")
+    files = write_market(MarketSpec(tickers=15, days=300, seed=7), root)
+    write_mirror(files["main"], root / "mirror")
+    return {**files, "mirror": root / "mirror"}
+
+
+@contextmanager
+def serve(directory: Path, meta: Path, fail_rate: float = 0.0):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(directory, meta, fail_rate))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _ingest_cfg(tmp_path: Path, url: str, **ingest_cfg) -> dict:
+    cfg = make_config(tmp_path)
+    cfg["ingest"] = {
+        **cfg["ingest"], "enabled": True, "source": url + "/prices/{ticker}?start={start}&end={end}",
+        "meta_source": url + "/meta", "start": "2015-01-01", "end": MID,
+        "concurrency": 4, "rate_per_s": 0, "retries": 8, "backoff_s": 0.001, "timeout_s": 5, **ingest_cfg,
+    }
+    return cfg
+
+
+def _wide(path: Path, until: str = None) -> pd.DataFrame:
+    df = pd.read_csv(path, parse_dates=["Date"], index_col="Date", float_precision="round_trip")
+    if until is not None:
+        df = df[df.index <= until]
+    return df.dropna(how="all")
+
+
+@pytest.mark.parametrize("via", ["http", "mirror"])
+def test_resume_extend_and_noop(source, tmp_path, via):
+    with serve(source["mirror"], source["meta"], fail_rate=0.2 if via == "http" else 0.0) as url:
+        # Every ticker of the price file (the meta file lists only some of them)
+        tickers = list(_wide(source["main"]).columns)
+        cfg = _ingest_cfg(tmp_path, url, tickers=tickers)
+        if via == "mirror":
+            cfg["ingest"]["source"] = str(source["mirror"])
+        main = Path(cfg["paths"]["raw_dir"]) / cfg["data"]["main_file"]
+
+        # Up to a partial date, then the full range: only the missing days are fetched
+        first = ingest(cfg)
+        assert first["fetched"] == len(tickers) and not first["failed"] and not first["unknown"]
+        pd.testing.assert_frame_equal(_wide(main), _wide(source["main"], MID))
+
+        cfg["ingest"]["end"] = "2020-12-31"
+        second = ingest(cfg)
+        assert second["fetched"] == len(tickers) and not second["failed"]
+        assert second["rows"] == _wide(source["main"]).notna().sum().sum() - first["rows"]
+        pd.testing.assert_frame_equal(_wide(main), _wide(source["main"]))
+        if via == "http":
+            assert second["retried"] > 0
+
+        # Nothing left to fetch: no request at all, main file untouched
+        mtime = main.stat().st_mtime_ns
+        third = ingest(cfg)
+        assert third["up_to_date"] == len(tickers) and third["requests"] == 0 and third["rows"] == 0
+        assert main.stat().st_mtime_ns == mtime
+
+
+def test_unknown_and_failed_tickers(source, tmp_path):
+    known = list(_wide(source["main"]).columns[:2])
+    with serve(source["mirror"], source["meta"]) as url:
+        cfg = _ingest_cfg(tmp_path / "unknown", url, tickers=known + ["NOPE"])
+        stats = ingest(cfg)
+    assert stats["unknown"] == ["NOPE"] and stats["fetched"] == 2 and not stats["failed"]
+
+    with serve(source["mirror"], source["meta"], fail_rate=1.0) as url:
+        cfg = _ingest_cfg(tmp_path / "failed", url, tickers=known, retries=2, meta_source=None)
+        Path(cfg["paths"]["raw_dir"], cfg["data"]["meta_file"]).write_bytes(source["meta"].read_bytes())
+        stats = ingest(cfg)
+    assert sorted(stats["failed"]) == sorted(known) and stats["fetched"] == 0
+    assert all("503" in err for err in stats["failed"].values())
+    assert stats["requests"] == 3 * len(known)
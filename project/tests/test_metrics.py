@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils_metrics import (
+    StreamingKPIs,
+    compute_kpis,
+    max_drawdown,
+    rolling_kpis,
+    rolling_max_drawdown,
+    rolling_sharpe,
+    sharpe_ratio,
+)
+
+
+def _returns(seed: int, days: int = 120, strategies: int = 3) -> pd.DataFrame:
+    """Daily returns per strategy: leading NaN days (nothing traded yet), NaNs inside, a flat stretch."""
+    rng = np.random.default_rng(seed)
+    r = rng.normal(0.0005, 0.02, (days, strategies))
+    r[rng.random(r.shape) < 0.1] = np.nan
+    r[:4] = np.nan
+    r[40:60, 0] = 0.0
+    return pd.DataFrame(r, columns=[f"s{i}" for i in range(strategies)])
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_streaming_kpis_equal_compute_kpis_at_every_day(seed):
+    returns = _returns(seed)["s0"]
+    stream = StreamingKPIs()
+    for n, ret in enumerate(returns, start=1):
+        online = stream.update(ret).kpis()
+        offline = compute_kpis(pd.DataFrame({"strategy_ret": returns.iloc[:n].to_numpy()}))
+        assert online == pytest.approx(offline, abs=1e-12), n
+
+
+def test_rolling_max_drawdown_equals_max_drawdown_of_each_slice():
+    returns = _returns(0)
+    window = 20
+    rolled = rolling_max_drawdown(returns, window, chunk=16)
+    equity = (1.0 + returns.fillna(0)).cumprod()
+    for i in range(len(returns)):
+        window_equity = equity.iloc[max(0, i - window + 1):i + 1]
+        for c in returns:
+            assert rolled[c].iloc[i] == pytest.approx(max_drawdown(window_equity[c]), abs=1e-12)
+
+
+def test_rolling_sharpe_and_kpis():
+    returns = _returns(1)
+    window = 15
+    sharpe = rolling_sharpe(returns, window)
+    assert sharpe.iloc[:window - 1].isna().all().all()
+    for i in range(window - 1, len(returns)):
+        for c in returns:
+            chunk = returns[c].iloc[i - window + 1:i + 1]
+            if chunk.isna().any():
+                # Windows need `window` finite days
+                assert np.isnan(sharpe[c].iloc[i])
+            else:
+                assert sharpe[c].iloc[i] == pytest.approx(sharpe_ratio(chunk), rel=1e-9, abs=1e-12)
+    # No variance in the flat stretch: 0, as sharpe_ratio
+    assert (sharpe["s0"].iloc[40 + window - 1:60] == 0.0).all()
+
+    kpis = rolling_kpis(returns, windows=(window, 30))
+    assert list(kpis.columns) == [f"{c}_{k}_{w}" for w in (window, 30) for k in ("sharpe", "maxdd") for c in returns]
+    pd.testing.assert_frame_equal(kpis.filter(like=f"_sharpe_{window}"), sharpe.add_suffix(f"_sharpe_{window}"))
+    pd.testing.assert_frame_equal(kpis.filter(like="_maxdd_30"), rolling_max_drawdown(returns, 30).add_suffix("_maxdd_30"))
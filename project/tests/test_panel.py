@@ -0,0 +1,34 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.step_02_unify_dataset import add_calendar_features, meta_lookup, wide_to_long
+from src.utils_io import META_COLS
+from src.utils_panel import CompactPanel
+
+
+def test_from_wide_equals_melt_calendar_and_meta_merge(market_cfg):
+    raw_dir = Path(market_cfg["paths"]["raw_dir"])
+    date_col = market_cfg["data"]["date_col"]
+    wide = pd.read_csv(raw_dir / market_cfg["data"]["main_file"])
+    meta = pd.read_csv(raw_dir / market_cfg["data"]["meta_file"])
+
+    # The pandas unify: melt, calendar columns, left merge of the meta file
+    expected = add_calendar_features(wide_to_long(wide, date_col), date_col).merge(
+        meta.rename(columns={"Symbol": "ticker"})[["ticker"] + META_COLS], on="ticker", how="left"
+    )
+    assert expected[META_COLS[0]].isna().any() and expected[META_COLS[0]].notna().any()
+
+    panel = CompactPanel.from_wide(wide, date_col, meta=meta_lookup(raw_dir / market_cfg["data"]["meta_file"]))
+    got = panel.to_frame()
+    assert list(got.columns) == list(expected.columns)
+    # Ticker-major in column order, each ticker's rows in date order: the melt order
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False, check_categorical=False)
+    assert isinstance(got["ticker"].dtype, pd.CategoricalDtype)
+    assert got["dow"].dtype == np.int32 and got["price"].dtype == np.float64
+
+    # Back through the frame encoding: same rows, in batches too
+    again = CompactPanel.from_frame(got, date_col)
+    pd.testing.assert_frame_equal(again.to_frame(), got)
+    pd.testing.assert_frame_equal(pd.concat(again.iter_frames(batch_rows=500), ignore_index=True), got)
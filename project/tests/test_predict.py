@@ -0,0 +1,39 @@
+from pathlib import Path
+
+import joblib
+import pandas as pd
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+
+from src.models.store import open_store
+from src.pipeline.step_02_unify_dataset import run as unify
+from src.pipeline.step_03_feature_engineering import run as build_features
+from src.pipeline.step_05_predict import run as predict
+from src.utils_io import read_artifact
+
+
+@pytest.mark.parametrize("partition_by", [["year"], ["ticker"]])
+def test_chunked_predictions_keep_feature_order(cfg, partition_by):
+    if partition_by != cfg["storage"]["partition_by"]:
+        cfg["storage"]["partition_by"] = partition_by
+        cfg["paths"]["interim_dir"] = cfg["paths"]["processed_dir"]
+        unify(cfg)
+    cfg["predict"] = {"batch_rows": 500}
+    build_features(cfg)
+    store = open_store(cfg)
+    model = DecisionTreeClassifier(max_depth=3, random_state=0).fit(store.frame(), store.y)
+    joblib.dump(model, Path(cfg["paths"]["processed_dir"]) / "DecisionTree.joblib")
+    predict(cfg)
+
+    features = read_artifact(cfg, "dataset_features")
+    preds = read_artifact(cfg, "predictions")
+    assert len(features) > 2 * cfg["predict"]["batch_rows"]
+    pd.testing.assert_frame_equal(preds[features.columns], features)
+    expected = model.predict_proba(features[store.feature_cols].astype("float32"))[:, 1]
+    pd.testing.assert_series_equal(preds["pred_DecisionTree"], pd.Series(expected, name="pred_DecisionTree"))
+
+
+def test_predict_without_models_fails(cfg):
+    build_features(cfg)
+    with pytest.raises(FileNotFoundError):
+        predict(cfg)
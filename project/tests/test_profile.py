@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from src.simulation.panel import build_market
+from src.simulation.registry import run_strategies
+from src.utils_profile import profiling, span, submit
+from tests.conftest import make_config
+from tests.test_strategies import random_panel
+
+
+def _paths(prof) -> set:
+    return {e["path"] for e in prof.events if e["type"] == "span"}
+
+
+def test_nested_and_threaded_span_paths():
+    def work(name):
+        with span(name):
+            with span("inner"):
+                pass
+
+    with profiling() as prof:
+        with span("outer"):
+            with span("mid"):
+                pass
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                for f in [submit(pool, work, "a"), submit(pool, work, "b")]:
+                    f.result()
+            with span("after"):
+                pass
+        with span("root"):
+            pass
+    assert _paths(prof) == {
+        "outer", "outer/mid", "outer/a", "outer/a/inner", "outer/b", "outer/b/inner", "outer/after", "root",
+    }
+    assert len({e["tid"] for e in prof.events}) > 1
+
+
+def test_strategy_spans_nest_under_the_step(tmp_path):
+    sim = make_config(tmp_path)["simulation"]
+    preds = random_panel(0).rename(columns={"prob": "pred_RandomForest"})
+    market = build_market(preds, "pred_RandomForest")
+    names = ["long_only_threshold", "long_short_threshold"]
+    with profiling() as prof:
+        with span("step_06"):
+            run_strategies(market, sim, names, workers=2)
+    assert {f"step_06/strategy:{n}" for n in names} <= _paths(prof)
+    assert not any(p.startswith("strategy:") for p in _paths(prof))
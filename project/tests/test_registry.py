@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.engine import compute_features, group_layout
+from src.features.registry import (
+    ALIASES,
+    FEATURES,
+    compute,
+    listed_features,
+    public_features,
+    resolve,
+    select,
+    warmup,
+)
+from src.utils_io import read_artifact
+
+
+def _longest_path(name: str) -> int:
+    f = FEATURES[name]
+    return f.window + max((_longest_path(i) for i in f.inputs), default=0)
+
+
+def _closure(name: str) -> set:
+    return {name}.union(*(_closure(i) for i in FEATURES[name].inputs))
+
+
+def test_resolve_pulls_in_dependencies_in_order():
+    assert resolve(["bb_width_20"]) == ["sma_20", "std_20", "bb_upper_20", "bb_lower_20", "bb_width_20"]
+    assert resolve(["macd_hist"]) == ["ema_12", "ema_26", "macd", "macd_signal", "macd_hist"]
+
+    for names in (["ret_x_mom10"], ["ret_1d_x_rsi_14", "pct_from_52w_low"], None):
+        order = resolve(names)
+        assert set(order) == set().union(*(_closure(n) for n in (names or public_features())))
+        assert len(order) == len(set(order))
+        for n in order:
+            assert all(order.index(i) < order.index(n) for i in FEATURES[n].inputs), n
+
+
+def test_unknown_features_raise():
+    with pytest.raises(ValueError, match="nope"):
+        resolve(["ret_1d", "nope"])
+    with pytest.raises(ValueError, match="nope"):
+        select(["nope"])
+
+
+def test_warmup_is_the_longest_lookback_chain():
+    # Per ticker, a feature is NaN on exactly its first `warmup` rows (prices without gaps)
+    lengths = np.array([300, 260])
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    pos = np.arange(lengths.sum()) - np.repeat(starts, lengths)
+    price = 100 * np.exp(np.random.default_rng(0).normal(0, 0.01, lengths.sum()).cumsum())
+    cols = compute(None, price, starts, lengths, pos)
+
+    for name in public_features():
+        assert warmup(name) == _longest_path(name), name
+        for s, n in zip(starts, lengths):
+            defined = ~np.isnan(cols[name][s:s + n])
+            assert not defined[:warmup(name)].any() and defined[warmup(name):].all(), name
+    assert warmup("ret_std_20") == 20 and warmup("bb_width_20") == 19
+    assert warmup("vol_20") == warmup("ret_std_20")
+
+
+def test_listed_features_equal_full_build(market_cfg):
+    date_col = market_cfg["data"]["date_col"]
+    df = read_artifact(market_cfg, "unified_long")
+    listed = ["ret_x_mom10", "bb_width_20", "macd_hist", "rsi_14"]
+    full = compute_features(df, date_col)
+    some = compute_features(df, date_col, features=listed)
+
+    assert list(some.columns) == list(df.columns) + select(listed)
+    pd.testing.assert_frame_equal(some[listed], full[listed], check_exact=True)
+
+    # Same layout the engine derives, evaluated directly
+    codes = pd.factorize(full["ticker"])[0]
+    cols = compute(listed, full["price"].to_numpy(dtype=float), *group_layout(codes))
+    for name in listed:
+        np.testing.assert_array_equal(cols[name], full[name].to_numpy())
+
+
+def test_listed_features_and_aliases():
+    cfg = {"features": {
+        "select": "listed", "basic": ["return_1d", "vol_5", "ret_1d"], "technical": ["rsi_14"], "calendar": ["dow"],
+    }}
+    assert listed_features(cfg) == (["ret_1d", "ret_std_5", "rsi_14"], ["dow"])
+    assert listed_features({"features": {**cfg["features"], "select": "all"}}) == (None, [])
+    assert listed_features({"features": {"select": "listed"}}) == (None, [])
+
+    # Every alias points at a registered public feature and selects it under its new name
+    for old, new in ALIASES.items():
+        assert new in public_features()
+        assert select([old]) == [new] and resolve([old]) == resolve([new]) and warmup(old) == warmup(new)
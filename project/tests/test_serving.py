@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from src.models.store import open_store
+from src.pipeline.step_03_feature_engineering import run as build_features
+from src.pipeline.step_05_predict import run as predict
+from src.serving.scorer import PACKED_MAX_ROWS, Scorer
+from src.serving.trees import PackedForest
+from src.utils_io import read_artifact
+
+try:
+    from xgboost import XGBClassifier
+except ImportError:
+    XGBClassifier = None
+
+
+@pytest.fixture
+def served(cfg) -> dict:
+    """Small DT, RF and early-stopped XGB models on the feature store, scored by step 05."""
+    build_features(cfg)
+    store = open_store(cfg)
+    half = len(store) // 2
+    X, y = store.frame(slice(0, half)), store.y[:half]
+    models = {
+        "DecisionTree": DecisionTreeClassifier(max_depth=4, random_state=0).fit(X, y),
+        "RandomForest": RandomForestClassifier(n_estimators=7, max_depth=4, random_state=0).fit(X, y),
+    }
+    if XGBClassifier is not None:
+        xgb = XGBClassifier(n_estimators=200, max_depth=3, learning_rate=0.3, early_stopping_rounds=3)
+        models["XGBClassifier"] = xgb.fit(X, y, eval_set=[(store.frame(slice(half, None)), store.y[half:])], verbose=False)
+        # Stopped early: scoring every tree would give different probabilities
+        assert xgb.best_iteration + 1 < xgb.get_booster().num_boosted_rounds()
+    for name, model in models.items():
+        joblib.dump(model, Path(cfg["paths"]["processed_dir"]) / f"{name}.joblib")
+    predict(cfg)
+    return models
+
+
+def test_scorer_matches_step_05(cfg, served):
+    date_col = cfg["data"]["date_col"]
+    preds = read_artifact(cfg, "predictions")
+    preds[date_col] = pd.to_datetime(preds[date_col])
+    cols = [f"pred_{name}" for name in served]
+
+    # Same feature rows, both sides of PACKED_MAX_ROWS (packed trees / the models themselves)
+    scorer = Scorer.from_config(cfg)
+    store = open_store(cfg)
+    for rows in (slice(0, PACKED_MAX_ROWS), slice(0, 4 * PACKED_MAX_ROWS)):
+        online = scorer._predict(np.asarray(store.X[rows]))
+        offline = preds.iloc[store.row[rows]]
+        for name in served:
+            np.testing.assert_allclose(online[name], offline[f"pred_{name}"], rtol=1e-6, atol=1e-7)
+
+    # Close-price ticks replayed over the last dates, on state built from the earlier history
+    replay = np.sort(preds[date_col].unique())[-3:]
+    scorer = Scorer.from_config(cfg, until=str(pd.Timestamp(replay[0]) - pd.Timedelta(days=1)))
+    hist = read_artifact(cfg, "unified_long", columns=[date_col, "ticker", "price"]).dropna(subset=["price"])
+    hist[date_col] = pd.to_datetime(hist[date_col])
+    scored = []
+    for d in replay:
+        day = hist[hist[date_col] == d]
+        ticks = [{"ticker": t, "date": str(pd.Timestamp(d).date()), "price": p} for t, p in zip(day["ticker"], day["price"])]
+        scored += [{"ticker": t, date_col: pd.Timestamp(d), **p} for t, p in scorer.score(ticks).items()]
+    online = pd.DataFrame(scored).dropna(subset=cols)
+    merged = preds.assign(ticker=preds["ticker"].astype(str)).merge(online, on=["ticker", date_col], suffixes=("", "_online"))
+    assert len(merged) == len(preds[preds[date_col].isin(replay)])
+    for c in cols:
+        np.testing.assert_allclose(merged[f"{c}_online"].astype(float), merged[c], rtol=1e-6, atol=1e-7)
+
+
+def test_packed_forest_matches_sklearn(cfg, served):
+    X = np.asarray(open_store(cfg).X)
+    for name in ("DecisionTree", "RandomForest"):
+        model = served[name]
+        expected = model.predict_proba(pd.DataFrame(X, columns=model.feature_names_in_))[:, 1]
+        np.testing.assert_allclose(PackedForest(model).predict_proba1(X), expected, rtol=1e-12, atol=1e-12)
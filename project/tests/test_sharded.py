@@ -0,0 +1,60 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+from src.benchmarks.synthetic import MarketSpec, write_market
+from src.models.store import build_store
+from src.pipeline.step_02_unify_dataset import run as unify
+from src.pipeline.step_03_feature_engineering import run as build_features
+from src.utils_io import read_artifact
+from tests.conftest import make_config
+
+
+def _build(cfg: dict, sharded: bool):
+    cfg = copy.deepcopy(cfg)
+    cfg["features"]["incremental"] = {"enabled": False}
+    cfg["features"]["sharded"] = {"enabled": sharded, "workers": 2, "shards_per_worker": 3}
+    build_features(cfg)
+    return read_artifact(cfg, "dataset_features"), build_store(cfg)
+
+
+def _assert_same(cfg: dict):
+    full, full_store = _build(cfg, sharded=False)
+    shard, shard_store = _build(cfg, sharded=True)
+
+    # Same rows in the same order, same values
+    pd.testing.assert_frame_equal(full, shard, check_exact=True)
+    # The matrix the models train on is identical
+    np.testing.assert_array_equal(np.asarray(full_store.X), np.asarray(shard_store.X))
+    np.testing.assert_array_equal(np.asarray(full_store.y), np.asarray(shard_store.y))
+    np.testing.assert_array_equal(
+        full_store.tickers[np.asarray(full_store.ticker)], shard_store.tickers[np.asarray(shard_store.ticker)]
+    )
+
+
+def test_sharded_equals_full_parquet(cfg):
+    _assert_same(cfg)
+
+
+def test_sharded_equals_full_partitioned_by_ticker(cfg):
+    cfg["storage"]["partition_by"] = ["ticker"]
+    cfg["paths"]["interim_dir"] = cfg["paths"]["processed_dir"]
+    unify(cfg)
+    _assert_same(cfg)
+
+
+def test_sharded_equals_full_csv(tmp_path):
+    cfg = make_config(tmp_path, format="csv")
+    write_market(MarketSpec(tickers=8, days=320, seed=3), cfg["paths"]["raw_dir"], cfg["data"]["main_file"], cfg["data"]["meta_file"])
+    unify(cfg)
+    _assert_same(cfg)
+
+
+def test_store_rows_sorted_by_date_then_ticker(cfg):
+    _, store = _build(cfg, sharded=True)
+    dates = np.asarray(store.dates)
+    names = store.tickers[np.asarray(store.ticker)].astype(str)
+    assert (np.diff(dates.astype(np.int64)) >= 0).all()
+    same_day = dates[1:] == dates[:-1]
+    assert (names[1:][same_day] > names[:-1][same_day]).all()
@@ -0,0 +1,32 @@
+from pathlib import Path
+
+import pandas as pd
+
+from src.pipeline.run_all import pipeline_steps
+from src.pipeline.step_06_simulate import run as simulate
+from src.utils_io import write_artifact
+from tests.conftest import make_config
+from tests.test_strategies import random_panel
+
+
+def _simulate(root: Path, date_col: str) -> pd.DataFrame:
+    cfg = make_config(root)
+    cfg["data"]["date_col"] = date_col
+    cfg["simulation"]["rolling"] = {"enabled": True, "windows": [10]}
+    cfg["simulation"]["sweep"] = {"enabled": True, "buy_prob": [0.55, 0.65], "stop_loss": [-0.03], "take_profit": [0.05]}
+    preds = random_panel(4).rename(columns={"Date": date_col, "prob": "pred_RandomForest"})
+    write_artifact(preds, cfg, "predictions")
+    simulate(cfg)
+    return {f: pd.read_csv(Path(cfg["paths"]["backtests_dir"]) / f) for f in ("summary.csv", "sweep.csv", "rolling.csv")}
+
+
+def test_simulate_reads_configured_date_col(tmp_path):
+    default = _simulate(tmp_path / "default", "Date")
+    renamed = _simulate(tmp_path / "renamed", "trade_date")
+    for name, frame in default.items():
+        pd.testing.assert_frame_equal(frame, renamed[name], check_exact=True, obj=name)
+
+
+def test_simulate_cache_key_covers_date_col(tmp_path):
+    steps = {s["n"]: s for s in pipeline_steps(make_config(tmp_path))}
+    assert "data.date_col" in steps[6]["config"]
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from src.models.store import open_store, store_dir
+from src.pipeline.step_03_feature_engineering import run as build_features
+from src.utils_io import read_artifact, write_artifact
+
+
+def _by_date_then_ticker(df: pd.DataFrame, date_col: str) -> pd.DataFrame:
+    out = df.assign(_t=df["ticker"].astype(str))
+    return out.sort_values([date_col, "_t"], kind="stable").drop(columns="_t").reset_index(drop=True)
+
+
+def test_store_rows_equal_artifact_rows(cfg):
+    date_col = cfg["data"]["date_col"]
+    build_features(cfg)
+    store = open_store(cfg, batch_rows=700)
+    df = read_artifact(cfg, "dataset_features")
+    assert not pd.to_datetime(df[date_col]).is_monotonic_increasing
+
+    # Store row i is artifact row `row[i]`, and the rows are in (date, ticker) order
+    expected = _by_date_then_ticker(df, date_col)
+    pd.testing.assert_frame_equal(df.iloc[store.row].reset_index(drop=True), expected)
+    np.testing.assert_array_equal(np.asarray(store.X), expected[store.feature_cols].to_numpy(np.float32))
+    np.testing.assert_array_equal(np.asarray(store.y), expected["target_up"].to_numpy())
+    np.testing.assert_array_equal(store.dates, pd.to_datetime(expected[date_col]).to_numpy("datetime64[ns]"))
+    np.testing.assert_array_equal(store.tickers[np.asarray(store.ticker)].astype(str), expected["ticker"].astype(str))
+
+    # Step 05 puts store-order results back in artifact order
+    np.testing.assert_array_equal(store.to_artifact_order(store.y), df["target_up"].to_numpy())
+
+    # Step 04's splits are the artifact rows of those dates
+    dates = pd.to_datetime(expected[date_col])
+    for after, until in [(None, "2020-06-30"), ("2020-06-30", "2020-09-30"), ("2020-09-30", None)]:
+        rows = store.date_slice(after=after, until=until)
+        keep = (dates > after if after else True) & (dates <= until if until else True)
+        pd.testing.assert_frame_equal(
+            store.frame(rows), expected.loc[keep, store.feature_cols].astype(np.float32).reset_index(drop=True),
+        )
+
+
+def test_store_rebuilt_when_artifact_or_features_change(cfg):
+    build_features(cfg)
+    store = open_store(cfg)
+    meta = store_dir(cfg) / "meta.json"
+    built = meta.stat().st_mtime_ns
+
+    # Unchanged artifact: the store is reused
+    assert open_store(cfg).feature_cols == store.feature_cols
+    assert meta.stat().st_mtime_ns == built
+
+    # Rewritten artifact: rebuilt from the new rows
+    df = read_artifact(cfg, "dataset_features")
+    write_artifact(df.iloc[:100], cfg, "dataset_features")
+    assert len(open_store(cfg)) == 100
+
+    # Different feature selection: rebuilt with the new columns
+    cfg["features"]["technical"] = ["sma_10", "rsi_14"]
+    build_features(cfg)
+    rebuilt = open_store(cfg)
+    assert "sma_10" in rebuilt.feature_cols and "ema_10" not in rebuilt.feature_cols
+    assert len(rebuilt) == len(read_artifact(cfg, "dataset_features"))
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.simulation.panel import build_panel
+from src.simulation.strategies import sim_long_only_sl_tp, sim_long_only_sl_tp_fast
+
+
+def random_panel(seed: int, tickers: int = 8, days: int = 60, missing: float = 0.15, nan: float = 0.05,
+                 nan_market: float = 0.0) -> pd.DataFrame:
+    """
+    Long (Date, ticker) frame in shuffled row order:
+    - probabilities rounded to 0.05, so a day's candidates often tie; a `nan` share of them NaN
+    - rows dropped at random (late listings, halts)
+    - NaN next-day return on each ticker's last row, as step 03 leaves it
+    - `nan_market`: share of NaN prices and returns anywhere (a held one makes equity NaN from then on)
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2020-01-01", periods=days)
+    df = pd.DataFrame({
+        "Date": np.repeat(dates, tickers),
+        "ticker": np.tile([f"T{i:02d}" for i in range(tickers)], days),
+    })
+    n = len(df)
+    df["price"] = 50 * np.exp(rng.normal(0, 0.02, n).cumsum() / tickers)
+    df["target_return_1d"] = rng.normal(0, 0.03, n)
+    df["prob"] = np.round(rng.uniform(0.3, 0.9, n) / 0.05) * 0.05
+    df.loc[rng.random(n) < nan, "prob"] = np.nan
+    for col in ("price", "target_return_1d"):
+        df.loc[rng.random(n) < nan_market, col] = np.nan
+    df = df[rng.random(n) >= missing]
+    df.loc[~df["ticker"].duplicated(keep="last"), "target_return_1d"] = np.nan
+    return df.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+
+
+def _assert_equal(ref: pd.DataFrame, fast: pd.DataFrame):
+    pd.testing.assert_series_equal(ref["Date"].reset_index(drop=True), fast["Date"], check_names=False)
+    # Same operations in the same order: bit-for-bit, NaNs in the same places
+    np.testing.assert_array_equal(ref["strategy_ret"].to_numpy(), fast["strategy_ret"].to_numpy())
+    np.testing.assert_array_equal(ref["equity"].to_numpy(), fast["equity"].to_numpy())
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_fast_matches_reference(seed):
+    df = random_panel(seed, nan=0.0 if seed % 2 else 0.1)
+    kwargs = dict(threshold=0.6, stop_loss=-0.03, take_profit=0.05, fee_bps=5.0, max_concurrent=3)
+    _assert_equal(sim_long_only_sl_tp(df, "prob", **kwargs), sim_long_only_sl_tp_fast(df, "prob", **kwargs))
+
+
+@pytest.mark.parametrize("threshold, max_concurrent", [(0.5, 1), (0.7, 5), (0.3, 8)])
+def test_fast_matches_reference_parameters(threshold, max_concurrent):
+    df = random_panel(11, tickers=10, days=50)
+    kwargs = dict(threshold=threshold, stop_loss=-0.02, take_profit=0.03, fee_bps=10.0, max_concurrent=max_concurrent)
+    ref = sim_long_only_sl_tp(df, "prob", **kwargs)
+    # A shared panel gives the same result as pivoting inside the call
+    _assert_equal(ref, sim_long_only_sl_tp_fast(df, "prob", panel=build_panel(df, "prob"), **kwargs))
+
+
+def test_fast_matches_reference_all_tied():
+    df = random_panel(5, tickers=6, days=40, nan=0.0)
+    df["prob"] = 0.75
+    kwargs = dict(threshold=0.6, max_concurrent=2)
+    _assert_equal(sim_long_only_sl_tp(df, "prob", **kwargs), sim_long_only_sl_tp_fast(df, "prob", **kwargs))
+
+
+def test_fast_matches_reference_nan_market():
+    df = random_panel(7, nan_market=0.01)
+    kwargs = dict(threshold=0.6, max_concurrent=3)
+    _assert_equal(sim_long_only_sl_tp(df, "prob", **kwargs), sim_long_only_sl_tp_fast(df, "prob", **kwargs))
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.pipeline.step_06_simulate import sweep
+from src.simulation.strategies import sim_long_only_sl_tp, sim_long_only_threshold, sim_long_short_threshold
+from src.utils_io import write_artifact
+from src.utils_metrics import compute_kpis
+from tests.conftest import make_config
+from tests.test_strategies import random_panel
+
+GRID = {
+    "buy_prob": [0.55, 0.7],
+    "short_prob": [0.6],
+    "stop_loss": [-0.02, -0.05],
+    "take_profit": [0.04],
+    "fee_bps": [0.0, 10.0],
+}
+
+
+def _direct(df: pd.DataFrame, row: pd.Series, max_concurrent: int) -> dict:
+    """KPIs of one standalone run of the strategy with the row's parameters."""
+    common = dict(fee_bps=row["fee_bps"], max_concurrent=max_concurrent)
+    if row["strategy"] == "long_only_threshold":
+        sim = sim_long_only_threshold(df, "prob", threshold=row["buy_prob"], **common)
+    elif row["strategy"] == "long_short_threshold":
+        sim = sim_long_short_threshold(df, "prob", buy_thr=row["buy_prob"], short_thr=row["short_prob"], **common)
+    else:
+        sim = sim_long_only_sl_tp(
+            df, "prob", threshold=row["buy_prob"], stop_loss=row["stop_loss"], take_profit=row["take_profit"], **common,
+        )
+    return compute_kpis(sim)
+
+
+def test_sweep_rows_equal_direct_runs(tmp_path):
+    cfg = make_config(tmp_path)
+    cfg["simulation"]["sweep"] = {"enabled": True, **GRID}
+    max_concurrent = cfg["simulation"]["capital"]["max_concurrent_positions"]
+    df = random_panel(6, tickers=10, days=80)
+    # Without the last date (no next-day returns), so SL/TP equity ends on a number
+    df = df[df["Date"] < df["Date"].max()].reset_index(drop=True)
+    write_artifact(df.rename(columns={"prob": "pred_RandomForest"}), cfg, "predictions")
+    sweep(cfg)
+
+    res = pd.read_csv(Path(cfg["paths"]["backtests_dir"]) / "sweep.csv")
+    assert res["strategy"].value_counts().to_dict() == {
+        "long_only_threshold": 4, "long_short_threshold": 4, "long_only_sl_tp": 8,
+    }
+    assert not res.duplicated(["strategy", "buy_prob", "short_prob", "stop_loss", "take_profit", "fee_bps"]).any()
+    for _, row in res.iterrows():
+        expected = _direct(df, row, max_concurrent)
+        assert row[list(expected)].to_dict() == pytest.approx(expected, abs=1e-12), row.to_dict()
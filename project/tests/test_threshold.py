@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.simulation.kernels import long_only_threshold_returns, long_short_threshold_returns
+from src.simulation.panel import build_day_order, build_market
+from src.simulation.strategies import (
+    sim_long_only_threshold,
+    sim_long_only_threshold_ref,
+    sim_long_short_threshold,
+    sim_long_short_threshold_ref,
+)
+from tests.test_strategies import random_panel
+
+
+def _assert_close(ref: pd.DataFrame, fast: pd.DataFrame):
+    pd.testing.assert_series_equal(ref["Date"], fast["Date"], check_names=False)
+    # The kernels sum per date with bincount, pandas with mean(): equal up to summation order
+    np.testing.assert_allclose(fast["strategy_ret"], ref["strategy_ret"], rtol=1e-12, atol=1e-15)
+    np.testing.assert_allclose(fast["equity"], ref["equity"], rtol=1e-12)
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("threshold, max_concurrent", [(0.6, 3), (0.4, 1), (0.8, 6)])
+def test_long_only_matches_reference(seed, threshold, max_concurrent):
+    df = random_panel(seed, nan_market=0.03)
+    kwargs = dict(threshold=threshold, fee_bps=5.0, max_concurrent=max_concurrent)
+    _assert_close(sim_long_only_threshold_ref(df, "prob", **kwargs), sim_long_only_threshold(df, "prob", **kwargs))
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("buy_thr, short_thr, max_concurrent", [(0.6, 0.6, 3), (0.5, 0.5, 1), (0.7, 0.55, 6)])
+def test_long_short_matches_reference(seed, buy_thr, short_thr, max_concurrent):
+    df = random_panel(seed, nan_market=0.03)
+    kwargs = dict(buy_thr=buy_thr, short_thr=short_thr, fee_bps=10.0, max_concurrent=max_concurrent)
+    _assert_close(sim_long_short_threshold_ref(df, "prob", **kwargs), sim_long_short_threshold(df, "prob", **kwargs))
+
+
+def test_grid_kernels_match_reference():
+    """Every (threshold, fee) slice of one vectorized call equals a reference run, on the market's order too."""
+    df = random_panel(9, tickers=10, days=50)
+    thresholds, fees, buys, shorts = [0.5, 0.65], [0.0, 7.5], [0.55, 0.7], [0.6, 0.75]
+    for order in (build_day_order(df, "prob"), build_market(df, "prob").order):
+        lo = long_only_threshold_returns(order, thresholds, fees, 4)
+        ls = long_short_threshold_returns(order, buys, shorts, fees, 4)
+        for j, fee in enumerate(fees):
+            for i, thr in enumerate(thresholds):
+                ref = sim_long_only_threshold_ref(df, "prob", threshold=thr, fee_bps=fee, max_concurrent=4)
+                np.testing.assert_allclose(lo[i, j], ref["strategy_ret"], rtol=1e-12, atol=1e-15)
+            for i, buy in enumerate(buys):
+                for k, short in enumerate(shorts):
+                    ref = sim_long_short_threshold_ref(df, "prob", buy_thr=buy, short_thr=short, fee_bps=fee, max_concurrent=4)
+                    np.testing.assert_allclose(ls[i, k, j], ref["strategy_ret"], rtol=1e-12, atol=1e-15)
@@ -0,0 +1,43 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pipeline.step_03_feature_engineering import run as build_features
+from src.pipeline.step_04_train import run as train
+from src.utils_io import read_artifact
+
+
+@pytest.mark.parametrize("val_end", ["2020-06-30", "2020-09-30"], ids=["empty_validation", "validation"])
+def test_search_and_xgb_train(cfg, val_end):
+    cfg["split"] = {"train_end": "2020-06-30", "val_end": val_end}
+    cfg["models"]["search"] = {
+        **cfg["models"]["search"],
+        "cv_splits": 2,
+        "spaces": {"DecisionTree": {"max_depth": [3]}, "RandomForest": {"n_estimators": [10], "max_depth": [3]}},
+        "xgb": {"n_estimators": 200, "early_stopping_rounds": 5},
+    }
+    build_features(cfg)
+    train(cfg)
+
+    for name in ("DecisionTree", "RandomForest", "XGBClassifier"):
+        assert (Path(cfg["paths"]["processed_dir"]) / f"{name}.joblib").exists()
+    report = pd.read_csv(Path(cfg["paths"]["reports_dir"]) / "search_report.csv")
+    best = report[report["is_best"]].set_index("model")
+    assert np.isfinite(best["test_auc"]).all()
+    if val_end == cfg["split"]["train_end"]:
+        # Nothing to stop on: all trees, no validation score
+        assert best.loc["XGBClassifier", "n_resources"] == 200
+        assert best["val_auc"].isna().all()
+        assert best["val_window"].isna().all()
+    else:
+        assert best.loc["XGBClassifier", "n_resources"] <= 200
+        assert np.isfinite(best["val_auc"]).all()
+        # DT/RF are scored on every validation date, XGB on those after its early-stopping half
+        dates = pd.to_datetime(read_artifact(cfg, "dataset_features")[cfg["data"]["date_col"]])
+        dates = dates[(dates > "2020-06-30") & (dates <= val_end)].sort_values().dt.strftime("%Y-%m-%d").unique()
+        full = f"{dates[0]}..{dates[-1]}"
+        assert best.loc["DecisionTree", "val_window"] == best.loc["RandomForest", "val_window"] == full
+        start, end = best.loc["XGBClassifier", "val_window"].split("..")
+        assert start in dates and dates[0] < start < end == dates[-1]
@@ -0,0 +1,27 @@
+import copy
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.pipeline.step_02_unify_dataset import run as unify
+from src.utils_io import read_artifact
+
+
+@pytest.mark.parametrize("streaming", [{"chunk_rows": 37}, {"chunk_cells": 100}])
+def test_streaming_equals_unified_long(market_cfg, tmp_path, streaming):
+    date_col = market_cfg["data"]["date_col"]
+    cfg = copy.deepcopy(market_cfg)
+    cfg["paths"]["interim_dir"] = str(tmp_path)
+    cfg["data"]["streaming"] = {"enabled": True, **streaming}
+    unify(cfg)
+    assert len(list(Path(tmp_path).rglob("*.parquet"))) > 10
+
+    expected = read_artifact(market_cfg, "unified_long")
+    got = read_artifact(cfg, "unified_long")
+    # Chunks are numbered: the stream reads back in chunk order, so every ticker in date order
+    assert got.groupby("ticker", observed=True)[date_col].is_monotonic_increasing.all()
+    key = ["ticker", date_col]
+    got = got.sort_values(key, kind="stable").reset_index(drop=True)
+    expected = expected.sort_values(key, kind="stable").reset_index(drop=True)
+    pd.testing.assert_frame_equal(got[expected.columns], expected, check_dtype=False)
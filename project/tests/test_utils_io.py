@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils_io import iter_artifact, read_artifact, write_artifact
+from tests.conftest import make_config
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "csv"])
+@pytest.mark.parametrize("batch_rows", [1, 7, 100, 1000])
+def test_iter_artifact_chunks_are_batch_rows(tmp_path, fmt, batch_rows):
+    cfg = make_config(tmp_path, format=fmt, partition_by=["year"])
+    dates = pd.bdate_range("2019-12-02", periods=30)
+    # Many small appended files of uneven size, across two year partitions
+    for i, n in enumerate([13, 1, 29, 40, 3, 64, 11]):
+        part = pd.DataFrame({"Date": dates[np.arange(n) % 30], "ticker": f"T{i}", "price": np.arange(n, dtype=float)})
+        write_artifact(part, cfg, "unified_long", append=i > 0)
+    total = len(read_artifact(cfg, "unified_long"))
+
+    sizes = [len(chunk) for chunk in iter_artifact(cfg, "unified_long", batch_rows=batch_rows)]
+    assert sum(sizes) == total
+    assert all(s == batch_rows for s in sizes[:-1])
+    assert 0 < sizes[-1] <= batch_rows
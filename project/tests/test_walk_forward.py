@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.store import open_store
+from src.models.walk_forward import HAS_XGB, _run_folds, fold_schedule, walk_forward
+from src.pipeline.step_03_feature_engineering import run as build_features
+from src.utils_io import read_artifact
+
+MODELS = {
+    "DecisionTree": {"max_depth": 3},
+    "RandomForest": {"n_estimators": 5, "max_depth": 3},
+    **({"XGBClassifier": {"n_estimators": 5, "max_depth": 2}} if HAS_XGB else {}),
+}
+
+
+@pytest.mark.parametrize("window", ["expanding", "rolling"])
+def test_folds_never_train_on_their_test_window(window):
+    dates = np.repeat(pd.bdate_range("2019-01-01", "2020-12-31").to_numpy(dtype="datetime64[ns]"), 3)
+    folds = fold_schedule(dates, start="2020-01-15", refit="MS", window=window, window_months=6, min_train_rows=1)
+    assert folds[0]["test_start"] == pd.Timestamp("2020-01-15") and len(folds) == 12
+
+    for f, nxt in zip(folds, folds[1:] + [None]):
+        assert dates[f["hi"] - 1] < np.datetime64(f["test_start"]) <= dates[f["hi"]]
+        if nxt is not None:
+            assert f["end"] == nxt["hi"] and dates[f["end"] - 1] < np.datetime64(nxt["test_start"])
+        if window == "rolling":
+            assert dates[f["lo"]] >= np.datetime64(f["test_start"] - pd.DateOffset(months=6))
+        else:
+            assert f["lo"] == 0
+    assert folds[-1]["end"] == len(dates)
+
+
+def _walk_forward(cfg: dict, workers: int, warm_start_trees: int):
+    wf_cfg = {
+        "start": "2020-03-01", "refit": "MS", "window": "expanding", "min_train_rows": 200,
+        "warm_start_trees": warm_start_trees, "workers": workers, "models": MODELS,
+    }
+    return walk_forward(read_artifact(cfg, "dataset_features"), open_store(cfg), cfg["data"]["date_col"], wf_cfg)
+
+
+@pytest.mark.parametrize("warm_start_trees", [0, 3])
+def test_stitched_predictions_cover_each_date_once(cfg, warm_start_trees):
+    date_col = cfg["data"]["date_col"]
+    build_features(cfg)
+    serial, serial_folds = _walk_forward(cfg, workers=1, warm_start_trees=warm_start_trees)
+    parallel, parallel_folds = _walk_forward(cfg, workers=3, warm_start_trees=warm_start_trees)
+
+    pd.testing.assert_frame_equal(serial, parallel, check_exact=True)
+    pd.testing.assert_frame_equal(serial_folds, parallel_folds, check_exact=True)
+
+    # Every out-of-sample row exactly once, every model scored it
+    df = read_artifact(cfg, "dataset_features")
+    expected = df[pd.to_datetime(df[date_col]) >= "2020-03-01"]
+    assert len(serial) == len(expected)
+    assert not serial.duplicated([date_col, "ticker"]).any()
+    keys = lambda d: set(zip(pd.to_datetime(d[date_col]), d["ticker"].astype(str)))
+    assert keys(serial) == keys(expected)
+    assert serial[[f"pred_{m}" for m in MODELS]].notna().all().all()
+    assert pd.to_datetime(serial[date_col]).is_monotonic_increasing
+
+    # One fold per model and month; the expanding window grows fold by fold
+    assert set(serial_folds["model"]) == set(MODELS)
+    assert (serial_folds.groupby("model")["fold"].count() == 10).all()
+    assert (serial_folds.groupby("model")["train_rows"].diff().dropna() > 0).all()
+
+
+@pytest.mark.parametrize("name", [m for m in ("RandomForest", "XGBClassifier") if m in MODELS])
+def test_warm_start_continues_from_the_previous_fold(cfg, name):
+    build_features(cfg)
+    store = open_store(cfg)
+    folds = fold_schedule(store.dates, start="2020-06-01", refit="MS", min_train_rows=200)[:3]
+    cold = _run_folds(name, MODELS[name], folds, str(store.path), 0)
+    warm = _run_folds(name, MODELS[name], folds, str(store.path), 3)
+
+    # The first fold is a fresh model either way; later ones add trees to the previous model
+    np.testing.assert_array_equal(cold[0]["proba"], warm[0]["proba"])
+    assert all(not np.array_equal(c["proba"], w["proba"]) for c, w in zip(cold[1:], warm[1:]))
+    assert [w["hi"] for w in warm] == [f["hi"] for f in folds]